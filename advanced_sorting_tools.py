@@ -1,134 +1,251 @@
-import json
-import subprocess
+import argparse
+import heapq
 import re
-from datetime import datetime
 from collections import defaultdict
+from operator import attrgetter, itemgetter
+
+from description_index import DescriptionIndex
+from parallel_analysis import cents, map_shards, merge_totals, to_dollars, use_pool
+import quickbooks_client
+from quickbooks_client import QuickBooksQueryError
+from transactions import PURCHASE_FIELDS, parse_purchases
+from vendor_normalization import normalize_vendor_names
+
+try:
+    from transaction_table import TransactionTable, spending_patterns
+except ImportError:  # NumPy is optional; the list-based functions work without it
+    TransactionTable = None
 
 def get_month_data(start_date, end_date):
     """Get month data from QuickBooks"""
-    cmd = [
-        'curl', '-X', 'POST', 'http://localhost:8080/api/v1/quickbooks/query',
-        '-H', 'Content-Type: application/json',
-        '-d', f'{{"query": "SELECT * FROM Purchase WHERE TxnDate >= \'{start_date}\' AND TxnDate <= \'{end_date}\' MAXRESULTS 1000"}}'
-    ]
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        else:
-            return []
-    except Exception as e:
-        return []
+    return quickbooks_client.get_month_data(start_date, end_date, fields=PURCHASE_FIELDS)
+
+excluded_vendors = ["Stockton Walbeck", "Dakota Walbeck", "Parker Walbeck", "Canyon Smith"]
+
+def included_table(table):
+    """The rows of a TransactionTable that are not from excluded vendors"""
+    return table.take(~table.vendor_mask(excluded_vendors))
 
 def process_transactions(data):
-    """Process and clean transaction data"""
-    excluded_vendors = ["Stockton Walbeck", "Dakota Walbeck", "Parker Walbeck", "Canyon Smith"]
-    transactions = []
-    
-    for item in data:
-        amount = float(item.get('totalAmt', 0))
-        date = item.get('txnDate', 'N/A')
-        description = item.get('privateNote', item.get('memo', 'No Description Available'))
-        
-        vendor = ""
-        if item.get('entityRef'):
-            vendor = item.get('entityRef', {}).get('name', '')
-        
+    """Process and clean transaction data (raw Purchase entities or a TransactionTable) into Transactions"""
+    if TransactionTable is not None and isinstance(data, TransactionTable):
+        # The exclusion filter runs on the table; only the kept rows become records
+        transactions = included_table(data).to_transactions()
+    else:
         # Skip excluded vendors
-        if vendor in excluded_vendors:
-            continue
-        
-        transactions.append({
-            'date': date[:10] if date != 'N/A' else 'N/A',
-            'amount': amount,
-            'description': description if description else 'No Description Available',
-            'vendor': vendor if vendor else 'No Vendor Listed'
-        })
+        transactions = [txn for txn in parse_purchases(data) if txn.vendor not in excluded_vendors]
+    
+    # Normalize vendors once at ingest so every analysis can group on a clean name
+    clean_vendors = normalize_vendor_names(
+        [t.description for t in transactions],
+        [t.vendor or None for t in transactions]
+    )
+    for txn, clean_vendor in zip(transactions, clean_vendors):
+        txn.normalized_vendor = clean_vendor
     
     return transactions
 
 # SORTING FUNCTIONS
 def sort_by_amount(transactions, reverse=True):
     """Sort by transaction amount"""
-    return sorted(transactions, key=lambda x: x['amount'], reverse=reverse)
+    if TransactionTable is not None and isinstance(transactions, TransactionTable):
+        return transactions.to_transactions(transactions.sort_by_amount(descending=reverse))
+    return sorted(transactions, key=attrgetter('amount'), reverse=reverse)
 
 def sort_by_date(transactions, reverse=True):
     """Sort by date (newest first by default)"""
-    return sorted(transactions, key=lambda x: x['date'], reverse=reverse)
+    return sorted(transactions, key=attrgetter('date'), reverse=reverse)
 
 def sort_by_vendor(transactions):
     """Sort alphabetically by vendor"""
-    return sorted(transactions, key=lambda x: x['vendor'])
+    return sorted(transactions, key=lambda x: x.display_vendor())
 
-def sort_by_description_keyword(transactions, keyword):
-    """Sort by transactions containing specific keyword"""
+def sort_by_description_keyword(transactions, keyword, index=None):
+    """Sort by transactions containing specific keyword (pass a DescriptionIndex to skip the scan)"""
+    if index is not None:
+        keyword_transactions, other_transactions = index.partition(keyword)
+        return keyword_transactions + other_transactions
     keyword_upper = keyword.upper()
-    keyword_transactions = [t for t in transactions if keyword_upper in t['description'].upper()]
-    other_transactions = [t for t in transactions if keyword_upper not in t['description'].upper()]
+    keyword_transactions = [t for t in transactions if keyword_upper in t.description.upper()]
+    other_transactions = [t for t in transactions if keyword_upper not in t.description.upper()]
     return keyword_transactions + other_transactions
 
+# TOP-K FUNCTIONS
+def top_k(items, k, key=None, reverse=True):
+    """The k largest (smallest with reverse=False) items in order, same as sorted(...)[:k].
+
+    Uses a k-sized heap, so it is O(n log k) and consumes items lazily.
+    """
+    if reverse:
+        return heapq.nlargest(k, items, key=key)
+    return heapq.nsmallest(k, items, key=key)
+
+def top_by_amount(transactions, k, reverse=True):
+    """The k largest (or smallest) transactions by amount"""
+    if TransactionTable is not None and isinstance(transactions, TransactionTable):
+        return transactions.to_transactions(transactions.top_k(k, descending=reverse))
+    return top_k(transactions, k, key=attrgetter('amount'), reverse=reverse)
+
+class _HeapEntry:
+    __slots__ = ('rank', 'item')
+
+    def __init__(self, rank, item):
+        self.rank = rank
+        self.item = item
+
+    def __lt__(self, other):
+        return self.rank < other.rank
+
+class _InvertedHeapEntry(_HeapEntry):
+    __slots__ = ()
+
+    def __lt__(self, other):
+        return other.rank < self.rank
+
+class TopK:
+    """Streaming top-K: push items one at a time while holding only k of them.
+
+    The heap root is the worst item kept, so each push is one comparison and
+    at most one O(log k) replacement. Ties rank by arrival order, matching
+    sorted(...)[:k] over everything pushed.
+    """
+
+    def __init__(self, k, key=None, reverse=True):
+        self.k = k
+        self.key = key
+        self.reverse = reverse
+        self.heap = []
+        self.seen = 0
+
+    def push(self, item):
+        value = self.key(item) if self.key is not None else item
+        if self.reverse:
+            entry = _HeapEntry((value, -self.seen), item)
+        else:
+            entry = _InvertedHeapEntry((value, self.seen), item)
+        self.seen += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif self.heap and self.heap[0] < entry:
+            heapq.heapreplace(self.heap, entry)
+
+    def extend(self, items):
+        for item in items:
+            self.push(item)
+        return self
+
+    def __len__(self):
+        return len(self.heap)
+
+    def results(self):
+        """Items kept so far, best first"""
+        return [entry.item for entry in sorted(self.heap, reverse=True)]
+
 # ANALYSIS FUNCTIONS
-def find_recurring_expenses(transactions):
-    """Identify potentially recurring expenses"""
+def find_recurring_expenses(transactions, limit=None):
+    """Identify potentially recurring expenses, optionally only the `limit` largest by total"""
     vendor_patterns = defaultdict(list)
     
     for txn in transactions:
-        # Group by vendor or by description patterns
-        key = txn['vendor'] if txn['vendor'] != 'No Vendor Listed' else txn['description'][:50]
+        # Group by normalized vendor, falling back to vendor or description patterns
+        key = txn.normalized_vendor
+        if not key:
+            key = txn.vendor or txn.display_description(50)
         vendor_patterns[key].append(txn)
     
-    recurring = {}
+    groups = []
     for vendor, txns in vendor_patterns.items():
         if len(txns) >= 2:  # Appears 2+ times
-            amounts = [t['amount'] for t in txns]
-            avg_amount = sum(amounts) / len(amounts)
-            recurring[vendor] = {
-                'count': len(txns),
-                'total': sum(amounts),
-                'average': avg_amount,
-                'transactions': sorted(txns, key=lambda x: x['date'])
-            }
+            amounts = [t.amount for t in txns]
+            groups.append((vendor, txns, sum(amounts)))
+    
+    # Only the groups that will be returned get their transactions date-sorted
+    if limit is None:
+        groups.sort(key=itemgetter(2), reverse=True)
+    else:
+        groups = top_k(groups, limit, key=itemgetter(2))
+    
+    recurring = {}
+    for vendor, txns, total in groups:
+        recurring[vendor] = {
+            'count': len(txns),
+            'total': total,
+            'average': total / len(txns),
+            'transactions': sorted(txns, key=attrgetter('date'))
+        }
     
-    return dict(sorted(recurring.items(), key=lambda x: x[1]['total'], reverse=True))
+    return recurring
 
 def find_large_transactions(transactions, threshold=1000):
     """Find transactions over a certain threshold"""
-    return [t for t in transactions if t['amount'] >= threshold]
+    if TransactionTable is not None and isinstance(transactions, TransactionTable):
+        return transactions.take(transactions.amount_mask(threshold)).to_transactions()
+    return [t for t in transactions if t.amount >= threshold]
 
-def analyze_spending_patterns(transactions):
-    """Analyze spending patterns and trends"""
-    monthly_totals = defaultdict(float)
-    daily_totals = defaultdict(float)
-    vendor_totals = defaultdict(float)
+def _shard_partials(shard, columns, workers):
+    """Per-shard partial results, from a process pool when the input is large enough"""
+    if use_pool(workers, len(columns[0])):
+        return map_shards(shard, columns, workers)
+    return [shard(0, *columns)]
+
+def _pattern_shard(offset, dates, amounts, vendors):
+    """Monthly, daily and vendor totals in cents for one shard"""
+    monthly_totals = {}
+    daily_totals = {}
+    vendor_totals = {}
     
-    for txn in transactions:
-        if txn['date'] != 'N/A':
-            month_key = txn['date'][:7]  # YYYY-MM
-            monthly_totals[month_key] += txn['amount']
-            daily_totals[txn['date']] += txn['amount']
+    for date, amount, vendor in zip(dates, amounts, vendors):
+        amount = cents(amount)
+        if date != 'N/A':
+            month_key = date[:7]  # YYYY-MM
+            monthly_totals[month_key] = monthly_totals.get(month_key, 0) + amount
+            daily_totals[date] = daily_totals.get(date, 0) + amount
         
-        vendor_totals[txn['vendor']] += txn['amount']
+        vendor_totals[vendor] = vendor_totals.get(vendor, 0) + amount
+    
+    return monthly_totals, daily_totals, vendor_totals
+
+def analyze_spending_patterns(transactions, workers=None):
+    """Analyze spending patterns and trends.
+
+    Totals are summed in cents, so sharding across `workers` processes
+    (0 for every core) gives exactly the serial result.
+    """
+    if TransactionTable is not None and isinstance(transactions, TransactionTable):
+        return spending_patterns(transactions)
+
+    columns = ([t.date for t in transactions], [t.amount for t in transactions], [t.display_vendor() for t in transactions])
+    monthly_totals, daily_totals, vendor_totals = (
+        to_dollars(merge_totals(totals)) for totals in zip(*_shard_partials(_pattern_shard, columns, workers)))
     
     return {
-        'monthly': dict(monthly_totals),
-        'daily': dict(daily_totals),
+        'monthly': monthly_totals,
+        'daily': daily_totals,
         'vendors': dict(sorted(vendor_totals.items(), key=lambda x: x[1], reverse=True))
     }
 
-def generate_sorting_report(month_name, start_date, end_date):
+def generate_sorting_report(month_name, start_date, end_date, workers=None):
     """Generate comprehensive sorting and analysis report"""
     print(f"\n🔄 ADVANCED SORTING & ANALYSIS - {month_name.upper()} 2025")
     print("=" * 80)
     
     # Get data
-    data = get_month_data(start_date, end_date)
+    try:
+        data = get_month_data(start_date, end_date)
+    except QuickBooksQueryError as e:
+        print(f"Query failed: {e}")
+        return
     if not data:
         print("No data available")
         return
     
     transactions = process_transactions(data)
-    total_amount = sum(t['amount'] for t in transactions)
+    total_amount = sum(t.amount for t in transactions)
+    # A table keeps the amount sorts and vendor totals vectorized; the rest work on the records
+    if TransactionTable is not None and isinstance(data, TransactionTable):
+        rows = included_table(data)
+    else:
+        rows = transactions
     
     print(f"Total Transactions: {len(transactions)}")
     print(f"Total Amount: ${total_amount:,.2f}")
@@ -136,25 +253,25 @@ def generate_sorting_report(month_name, start_date, end_date):
     
     # 1. TOP 10 BY AMOUNT
     print(f"\n💰 TOP 10 LARGEST TRANSACTIONS:")
-    top_10 = sort_by_amount(transactions)[:10]
+    top_10 = top_by_amount(rows, 10)
     for i, txn in enumerate(top_10, 1):
-        print(f"{i:2d}. ${txn['amount']:>8,.2f} | {txn['date']} | {txn['description'][:60]}...")
+        print(f"{i:2d}. ${txn.amount:>8,.2f} | {txn.date} | {txn.display_description(60)}...")
     
     # 2. RECURRING EXPENSES
     print(f"\n🔄 RECURRING EXPENSES (2+ occurrences):")
-    recurring = find_recurring_expenses(transactions)
-    for vendor, data in list(recurring.items())[:10]:
+    recurring = find_recurring_expenses(transactions, limit=10)
+    for vendor, data in recurring.items():
         print(f"• {vendor[:40]}...")
         print(f"  Count: {data['count']} | Total: ${data['total']:,.2f} | Avg: ${data['average']:,.2f}")
     
     # 3. LARGE TRANSACTIONS (>$1000)
-    large_txns = find_large_transactions(transactions, 1000)
+    large_txns = find_large_transactions(rows, 1000)
     print(f"\n🚨 LARGE TRANSACTIONS (>${1000:,}+): {len(large_txns)} found")
     for txn in large_txns[:5]:
-        print(f"• ${txn['amount']:,.2f} | {txn['date']} | {txn['description'][:50]}...")
+        print(f"• ${txn.amount:,.2f} | {txn.date} | {txn.display_description(50)}...")
     
     # 4. VENDOR ANALYSIS
-    patterns = analyze_spending_patterns(transactions)
+    patterns = analyze_spending_patterns(rows, workers)
     print(f"\n🏪 TOP VENDORS BY SPENDING:")
     for vendor, amount in list(patterns['vendors'].items())[:10]:
         percentage = (amount / total_amount * 100) if total_amount > 0 else 0
@@ -163,46 +280,53 @@ def generate_sorting_report(month_name, start_date, end_date):
     # 5. SORTING DEMONSTRATIONS
     print(f"\n📊 SORTING EXAMPLES:")
     
-    # Software-related expenses
-    software_txns = sort_by_description_keyword(transactions, "SOFTWARE")
-    software_total = sum(t['amount'] for t in software_txns if "SOFTWARE" in t['description'].upper())
-    print(f"• Software-related expenses: ${software_total:,.2f}")
-    
-    # HighLevel expenses
-    highlevel_txns = sort_by_description_keyword(transactions, "HIGHLEVEL")
-    highlevel_total = sum(t['amount'] for t in highlevel_txns if "HIGHLEVEL" in t['description'].upper())
-    print(f"• HighLevel expenses: ${highlevel_total:,.2f}")
-    
-    # PayPal transactions
-    paypal_txns = sort_by_description_keyword(transactions, "PAYPAL")
-    paypal_total = sum(t['amount'] for t in paypal_txns if "PAYPAL" in t['description'].upper())
-    print(f"• PayPal transactions: ${paypal_total:,.2f}")
+    # Keyword drill-downs are lookups in an index built once for this dataset
+    index = DescriptionIndex(transactions)
+    keyword_totals = index.totals(["SOFTWARE", "HIGHLEVEL", "PAYPAL"])
+    print(f"• Software-related expenses: ${keyword_totals['SOFTWARE']:,.2f}")
+    print(f"• HighLevel expenses: ${keyword_totals['HIGHLEVEL']:,.2f}")
+    print(f"• PayPal transactions: ${keyword_totals['PAYPAL']:,.2f}")
     
     return {
         'transactions': transactions,
         'recurring': recurring,
         'patterns': patterns,
-        'large_transactions': large_txns
+        'large_transactions': large_txns,
+        'index': index
     }
 
 # RULE SUGGESTIONS
-def suggest_categorization_rules(transactions):
+KEYWORD_PATTERN = re.compile(r'\b[A-Z]{3,}\b')
+
+def _rule_shard(offset, descriptions, amounts, vendors):
+    """Vendor and description keyword totals in cents for one shard"""
+    vendor_totals = {}
+    keyword_totals = {}
+    
+    for description, amount, vendor in zip(descriptions, amounts, vendors):
+        amount = cents(amount)
+        if vendor:
+            vendor_totals[vendor] = vendor_totals.get(vendor, 0) + amount
+        
+        # Extract keywords from descriptions
+        for word in KEYWORD_PATTERN.findall(description.upper()):
+            keyword_totals[word] = keyword_totals.get(word, 0) + amount
+    
+    return vendor_totals, keyword_totals
+
+def rule_patterns(transactions, workers=None):
+    """{'vendors', 'keywords'} spending totals the rule suggestions draw on, optionally in a process pool"""
+    columns = ([t.display_description() for t in transactions], [t.amount for t in transactions], [t.vendor for t in transactions])
+    vendors, keywords = (to_dollars(merge_totals(totals)) for totals in zip(*_shard_partials(_rule_shard, columns, workers)))
+    return {'vendors': vendors, 'keywords': keywords}
+
+def suggest_categorization_rules(transactions, workers=None):
     """Suggest automated categorization rules based on patterns"""
     print(f"\n🎯 SUGGESTED CATEGORIZATION RULES:")
     print("=" * 50)
     
     # Analyze common patterns
-    vendors = defaultdict(float)
-    keywords = defaultdict(float)
-    
-    for txn in transactions:
-        if txn['vendor'] != 'No Vendor Listed':
-            vendors[txn['vendor']] += txn['amount']
-        
-        # Extract keywords from descriptions
-        description_words = re.findall(r'\b[A-Z]{3,}\b', txn['description'].upper())
-        for word in description_words:
-            keywords[word] += txn['amount']
+    patterns = rule_patterns(transactions, workers)
     
     print("📋 AUTO-CATEGORIZATION RULES:")
     print("1. IF vendor contains 'HIGHLEVEL' → Software & SaaS")
@@ -212,16 +336,23 @@ def suggest_categorization_rules(transactions):
     print("5. IF amount > $5000 → Flag for Manual Review")
     
     print(f"\n🔍 TOP SPENDING PATTERNS TO MONITOR:")
-    for vendor, amount in sorted(vendors.items(), key=lambda x: x[1], reverse=True)[:5]:
+    for vendor, amount in top_k(patterns['vendors'].items(), 5, key=itemgetter(1)):
         if amount > 1000:
             print(f"• {vendor}: ${amount:,.2f}")
+    
+    return patterns
 
 # Run analysis for June
 if __name__ == "__main__":
-    june_analysis = generate_sorting_report("June", "2025-06-01", "2025-06-30")
+    parser = argparse.ArgumentParser(description="Sort and analyze one month of expenses")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for the pattern analysis (0 for every core; default serial)')
+    args = parser.parse_args()
+
+    june_analysis = generate_sorting_report("June", "2025-06-01", "2025-06-30", args.workers)
     
     if june_analysis:
-        suggest_categorization_rules(june_analysis['transactions'])
+        suggest_categorization_rules(june_analysis['transactions'], args.workers)
         
         print(f"\n\n🛠️  ADDITIONAL SORTING OPTIONS YOU CAN USE:")
         print("1. `sort_by_amount(transactions, reverse=False)` - Smallest to largest")
@@ -229,4 +360,6 @@ if __name__ == "__main__":
         print("3. `sort_by_vendor(transactions)` - Alphabetical by vendor")
         print("4. `sort_by_description_keyword(transactions, 'keyword')` - Filter by keyword")
         print("5. `find_large_transactions(transactions, 500)` - Custom threshold")
-        print("6. `find_recurring_expenses(transactions)` - Identify patterns")
\ No newline at end of file
+        print("6. `find_recurring_expenses(transactions)` - Identify patterns")
+        print("7. `top_by_amount(transactions, 20)` - Top N without sorting everything")
+        print("8. `june_analysis['index'].match_all(['PAYPAL', 'AFFILIATE'])` - Indexed keyword AND/OR queries")
\ No newline at end of file
@@ -0,0 +1,209 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from operator import attrgetter
+
+from advanced_sorting_tools import analyze_spending_patterns, find_recurring_expenses, rule_patterns, top_by_amount
+from categorize_expenses import analyze_expenses_by_category, categorize_many, categorize_transaction
+from description_index import DescriptionIndex
+from recurring_expenses import detect_recurring
+from report_pipeline import process_month_data
+from synthetic_data import generate_purchases
+from transactions import parse_purchases
+from vendor_normalization import normalize_vendor_names
+
+try:
+    from transaction_table import TransactionTable, month_summary
+except ImportError:  # NumPy is optional; the table stage is skipped without it
+    TransactionTable = None
+
+# Where results are written unless --output is given
+RESULTS_PATH = 'benchmark_results.json'
+
+# A stage this much slower than the baseline counts as a regression
+REGRESSION_THRESHOLD = 1.20
+
+RESULTS_VERSION = 1
+
+_SUFFIXES = {'k': 10 ** 3, 'm': 10 ** 6}
+
+
+def parse_scale(text):
+    """'10k' → 10000, '2.5M' → 2500000, '500' → 500"""
+    text = text.strip().lower()
+    if text[-1:] in _SUFFIXES:
+        return int(float(text[:-1]) * _SUFFIXES[text[-1]])
+    return int(text)
+
+
+def _purchases(ctx):
+    return generate_purchases(ctx['count'], seed=ctx['seed'])
+
+
+def _normalize(ctx):
+    transactions = ctx['transactions']
+    return normalize_vendor_names([t.description for t in transactions], [t.vendor or None for t in transactions])
+
+
+def _table(ctx):
+    table = TransactionTable.from_transactions(ctx['transactions'])
+    return month_summary(table, ['Stockton Walbeck', 'Dakota Walbeck', 'Parker Walbeck', 'Canyon Smith'])
+
+
+def _index_queries(ctx):
+    index = DescriptionIndex(ctx['transactions'])
+    return index.totals(['SOFTWARE', 'HIGHLEVEL', 'PAYPAL'])
+
+
+# (name, function of the context). Generation is listed first as the baseline
+# cost included in the stages that read raw Purchases.
+STAGES = [
+    ('generate', lambda ctx: deque(_purchases(ctx), maxlen=0)),
+    ('parse_purchases', lambda ctx: list(parse_purchases(_purchases(ctx)))),
+    ('process_month_data', lambda ctx: process_month_data(_purchases(ctx), 'Benchmark')),
+    ('categorize_transaction', lambda ctx: [categorize_transaction(t.description, t.amount) for t in ctx['transactions']]),
+    ('categorize_many', lambda ctx: categorize_many([t.description for t in ctx['transactions']])),
+    ('normalize_vendor_names', _normalize),
+    ('analyze_expenses_by_category', lambda ctx: analyze_expenses_by_category(_purchases(ctx), 'Benchmark')),
+    ('analyze_expenses_by_category_parallel',
+     lambda ctx: analyze_expenses_by_category(_purchases(ctx), 'Benchmark', workers=ctx['workers'])),
+    ('analyze_spending_patterns', lambda ctx: analyze_spending_patterns(ctx['transactions'])),
+    ('analyze_spending_patterns_parallel', lambda ctx: analyze_spending_patterns(ctx['transactions'], ctx['workers'])),
+    ('rule_patterns', lambda ctx: rule_patterns(ctx['transactions'])),
+    ('rule_patterns_parallel', lambda ctx: rule_patterns(ctx['transactions'], ctx['workers'])),
+    ('find_recurring_expenses', lambda ctx: find_recurring_expenses(ctx['transactions'])),
+    ('top_by_amount', lambda ctx: top_by_amount(ctx['transactions'], 10)),
+    ('detect_recurring', lambda ctx: detect_recurring(ctx['by_date'])),
+    ('description_index', _index_queries),
+    ('transaction_table', _table),
+]
+
+
+def build_context(count, seed, workers=0):
+    """Inputs shared by the stages, prepared outside the timed region"""
+    transactions = list(parse_purchases(generate_purchases(count, seed=seed)))
+    for txn, vendor in zip(transactions, normalize_vendor_names([t.description for t in transactions],
+                                                                 [t.vendor or None for t in transactions])):
+        txn.normalized_vendor = vendor
+    return {
+        'count': count,
+        'seed': seed,
+        'workers': workers,
+        'transactions': transactions,
+        'by_date': sorted(transactions, key=attrgetter('date')),
+    }
+
+
+def time_stage(function, ctx, repeat):
+    """Best wall-clock time over `repeat` runs"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(ctx)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(function, ctx):
+    """Peak bytes allocated by Python while the stage runs"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(ctx)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(scales, seed=0, repeat=3, memory=True, stages=None, workers=0):
+    """Benchmark every stage at every scale and return the results document"""
+    results = {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'workers': workers or os.cpu_count(),
+        'scales': {}
+    }
+    for count in scales:
+        print(f"\n⏱️  {count:,} synthetic Purchases")
+        print("=" * 80)
+        ctx = build_context(count, seed, workers)
+        scale_results = results['scales'][str(count)] = {}
+        for name, function in STAGES:
+            if stages and name not in stages:
+                continue
+            if name == 'transaction_table' and TransactionTable is None:
+                continue
+            seconds = time_stage(function, ctx, repeat)
+            entry = {'seconds': seconds, 'rows_per_second': count / seconds if seconds else None}
+            if memory:
+                entry['peak_memory_bytes'] = peak_memory(function, ctx)
+            scale_results[name] = entry
+            memory_text = f"{entry['peak_memory_bytes'] / 2 ** 20:>9.1f} MiB" if memory else ''
+            print(f"{name:<28} {seconds * 1000:>10.1f} ms {entry['rows_per_second'] or 0:>14,.0f} rows/s {memory_text}")
+        del ctx
+    return results
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Print time ratios against a baseline run and return the regressed (scale, stage) pairs"""
+    regressions = []
+    print(f"\n📊 COMPARISON (regression when slower than {threshold:.2f}x)")
+    print("=" * 80)
+    for scale, stages in current['scales'].items():
+        previous = baseline.get('scales', {}).get(scale)
+        if previous is None:
+            continue
+        for name, entry in stages.items():
+            if name not in previous:
+                continue
+            ratio = entry['seconds'] / previous[name]['seconds'] if previous[name]['seconds'] else float('inf')
+            flag = ''
+            if ratio > threshold:
+                flag = '  ⚠️  REGRESSION'
+                regressions.append((scale, name))
+            print(f"{int(scale):>10,} {name:<28} {previous[name]['seconds'] * 1000:>10.1f} ms → "
+                  f"{entry['seconds'] * 1000:>10.1f} ms ({ratio:5.2f}x){flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the expense analysis stages on synthetic Purchases")
+    parser.add_argument('--scales', default='10k,100k',
+                        help='Comma-separated dataset sizes, e.g. 10k,100k,1M,10M')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage (best is kept)')
+    parser.add_argument('--stage', dest='stages', action='append', choices=[name for name, _ in STAGES],
+                        help='Only run this stage; repeat for several')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Processes for the *_parallel stages (0 for every core)')
+    parser.add_argument('--output', default=RESULTS_PATH, help='Where to write the JSON results')
+    parser.add_argument('--compare', metavar='BASELINE', help='Results file of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Slowdown ratio that counts as a regression')
+    args = parser.parse_args()
+
+    results = run([parse_scale(scale) for scale in args.scales.split(',')], args.seed, args.repeat,
+                  memory=not args.no_memory, stages=args.stages, workers=args.workers)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
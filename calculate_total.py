@@ -1,32 +1,24 @@
-import json
+import sys
 
-# Read the JSON file
-with open('june_expenses.json', 'r') as f:
-    data = json.load(f)
+from json_stream import iter_json_array
+from transactions import parse_purchases
+
+# Stream the export (plain or gzip-compressed) one Purchase at a time
+export_path = sys.argv[1] if len(sys.argv) > 1 else 'june_expenses.json'
+data = iter_json_array(export_path)
 
 total = 0
 count = 0
-transactions = []
 
 print("June 2025 Expense Transactions:")
 print("=" * 60)
 
 # The data is directly an array of purchase transactions
-for item in data:
-    amount = float(item.get('totalAmt', 0))
-    date = item.get('txnDate', 'N/A')
-    memo = item.get('privateNote', item.get('memo', 'N/A'))
-    
-    # Get vendor name if available
-    vendor = ""
-    if item.get('entityRef'):
-        vendor = item.get('entityRef', {}).get('name', 'Unknown')
-    
-    total += amount
+for txn in parse_purchases(data):
+    total += txn.amount
     count += 1
     
-    print(f"Date: {date[:10]}, Amount: ${amount:.2f}, Vendor: {vendor}")
-    transactions.append({'date': date, 'amount': amount, 'memo': memo, 'vendor': vendor})
+    print(f"Date: {txn.date}, Amount: ${txn.amount:.2f}, Vendor: {txn.vendor}")
 
 print("=" * 60)
 print(f"TOTAL JUNE 2025 EXPENSES: ${total:.2f}")
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+# Where the description → category memo is persisted between runs
+CACHE_PATH = os.environ.get('CATEGORIZATION_CACHE_PATH', '.categorization_cache.json')
+
+# Least recently used entries are evicted beyond this size
+MAX_ENTRIES = 100000
+
+CACHE_VERSION = 1
+
+
+def rule_fingerprints(categories, default):
+    """Map every possible result to a fingerprint of the rules it depends on.
+
+    With first-match-wins, a description that landed in the k-th category
+    only depends on categories 0..k (the earlier ones did not match, the
+    k-th did), and the default depends on all of them. Hashing each prefix
+    of the rule list means an edit only invalidates results at or after the
+    edited category.
+    """
+    digest = hashlib.sha256()
+    fingerprints = {}
+    for name, rules in categories.items():
+        digest.update(json.dumps([name, rules.get('keywords', []), rules.get('patterns', [])]).encode('utf-8'))
+        fingerprints[name] = digest.hexdigest()[:16]
+    fingerprints[default] = digest.hexdigest()[:16]
+    return fingerprints
+
+
+class CategorizationCache:
+    """Bounded, persistent LRU memo of description → category"""
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    @classmethod
+    def load(cls, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        """Load a cache from disk, starting empty if missing or unreadable"""
+        cache = cls(path, max_entries)
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return cache
+        if saved.get('version') == CACHE_VERSION:
+            # Saved oldest first, so the LRU order survives a round trip
+            for description, category, fingerprint in saved.get('entries', [])[-max_entries:]:
+                cache.entries[description] = (category, fingerprint)
+        return cache
+
+    def save(self):
+        """Write the cache atomically"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': CACHE_VERSION,
+                'entries': [[description, category, fingerprint]
+                            for description, (category, fingerprint) in self.entries.items()]
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, description, fingerprints):
+        """Cached category for a description, or None on a miss or stale entry"""
+        entry = self.entries.get(description)
+        if entry is not None:
+            category, fingerprint = entry
+            if fingerprints.get(category) == fingerprint:
+                self.entries.move_to_end(description)
+                self.hits += 1
+                return category
+            # The rules this result depended on have changed
+            del self.entries[description]
+            self.invalidated += 1
+        self.misses += 1
+        return None
+
+    def store(self, description, category, fingerprints):
+        self.entries[description] = (category, fingerprints[category])
+        self.entries.move_to_end(description)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidated': self.invalidated,
+            'hit_rate': self.hit_rate()
+        }
@@ -1,7 +1,20 @@
-import json
-import subprocess
+import argparse
 import re
-from collections import defaultdict
+from functools import partial
+from operator import attrgetter
+
+from advanced_sorting_tools import TopK
+from categorization_cache import CategorizationCache, rule_fingerprints
+from parallel_analysis import cents, map_shards, use_pool
+import quickbooks_client
+from quickbooks_client import QuickBooksQueryError
+from transactions import PURCHASE_FIELDS, parse_purchases
+
+try:
+    import numpy as np
+    from transaction_table import TransactionTable
+except ImportError:  # NumPy is optional; raw Purchase entities work without it
+    TransactionTable = None
 
 # Categorization Rules
 EXPENSE_CATEGORIES = {
@@ -54,93 +67,201 @@ EXPENSE_CATEGORIES = {
     }
 }
 
-def categorize_transaction(description, amount):
+DEFAULT_CATEGORY = 'Other/Miscellaneous'
+
+class CategorizationEngine:
+    """Category rules compiled once, one regex per category, first match wins.
+
+    Each category's keywords (escaped literals) and patterns are joined into
+    a single alternation, so a description is searched once per category
+    instead of once per rule. Categories are tried in rule order and the
+    first that matches wins, exactly like the original keyword-then-pattern
+    loop.
+    """
+
+    def __init__(self, categories, default=DEFAULT_CATEGORY):
+        self.default = default
+        self.fingerprints = rule_fingerprints(categories, default)
+        self.rules = []
+        for category, rules in categories.items():
+            rule_sources = [re.escape(keyword) for keyword in rules.get('keywords', [])]
+            rule_sources += [f"(?:{pattern})" for pattern in rules.get('patterns', [])]
+            if rule_sources:
+                self.rules.append((category, re.compile('|'.join(rule_sources)).search))
+
+    def match(self, description):
+        """Run the compiled rules against a description"""
+        if not description:
+            return self.default
+        description_upper = description.upper()
+        for category, search in self.rules:
+            if search(description_upper):
+                return category
+        return self.default
+
+    def categorize(self, description, cache=None):
+        """Category for a single description, consulting a CategorizationCache if given"""
+        if cache is None or not description:
+            return self.match(description)
+        category = cache.lookup(description, self.fingerprints)
+        if category is None:
+            category = self.match(description)
+            cache.store(description, category, self.fingerprints)
+        return category
+
+    def categorize_many(self, descriptions, cache=None):
+        """Categories for a batch of descriptions, in input order"""
+        # Bank descriptions repeat heavily, so each distinct one is matched once per batch
+        seen = {}
+        results = []
+        for description in descriptions:
+            category = seen.get(description)
+            if category is None:
+                category = seen[description] = self.categorize(description, cache)
+            results.append(category)
+        return results
+
+_engine = CategorizationEngine(EXPENSE_CATEGORIES)
+
+def _use_engine(engine):
+    """Pool initializer: categorize with the parent's rules, including runtime edits"""
+    global _engine
+    _engine = engine
+
+def rebuild_engine():
+    """Recompile the engine after EXPENSE_CATEGORIES has been edited at runtime"""
+    global _engine
+    _engine = CategorizationEngine(EXPENSE_CATEGORIES)
+    return _engine
+
+def rules_fingerprint():
+    """Fingerprint of the whole rule set; changes whenever any category does"""
+    return _engine.fingerprints[_engine.default]
+
+def categorize_transaction(description, amount, cache=None):
     """Categorize a transaction based on description and amount"""
-    if not description:
-        return 'Other/Miscellaneous'
-        
-    description_upper = description.upper()
-    
-    for category, rules in EXPENSE_CATEGORIES.items():
-        # Check keywords
-        if any(keyword in description_upper for keyword in rules['keywords']):
-            return category
-            
-        # Check patterns
-        if any(re.search(pattern, description_upper) for pattern in rules['patterns']):
-            return category
-    
-    return 'Other/Miscellaneous'
+    return _engine.categorize(description, cache)
+
+def categorize_many(descriptions, cache=None):
+    """Categorize a batch of descriptions with the compiled engine"""
+    return _engine.categorize_many(descriptions, cache)
 
 def get_month_data_with_categories(start_date, end_date):
     """Get month data and categorize it"""
-    cmd = [
-        'curl', '-X', 'POST', 'http://localhost:8080/api/v1/quickbooks/query',
-        '-H', 'Content-Type: application/json',
-        '-d', f'{{"query": "SELECT * FROM Purchase WHERE TxnDate >= \'{start_date}\' AND TxnDate <= \'{end_date}\' MAXRESULTS 1000"}}'
-    ]
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            return json.loads(result.stdout)
+    return quickbooks_client.get_month_data(start_date, end_date, fields=PURCHASE_FIELDS)
+
+def _category_shard(offset, descriptions, amounts, vendors, excluded_vendors=(), cache=None):
+    """Categorize one shard of transactions and total it in cents.
+
+    Returns ({category: [cents, count, rows, top_rows]}, excluded_cents,
+    excluded_count) with rows numbered from `offset`.
+    """
+    categories = {}
+    tops = {}
+    excluded_total = 0
+    excluded_count = 0
+    included = []
+    for row, vendor in enumerate(vendors):
+        # Skip excluded vendors
+        if vendor in excluded_vendors:
+            excluded_total += cents(amounts[row])
+            excluded_count += 1
         else:
-            return []
-    except Exception as e:
-        print(f"Error: {e}")
-        return []
+            included.append(row)
+    
+    for row, category in zip(included, _engine.categorize_many([descriptions[row] for row in included], cache)):
+        entry = categories.get(category)
+        if entry is None:
+            entry = categories[category] = [0, 0, []]
+            tops[category] = TopK(3, key=lambda index: amounts[index - offset])
+        entry[0] += cents(amounts[row])
+        entry[1] += 1
+        entry[2].append(offset + row)
+        tops[category].push(offset + row)
+    for category, entry in categories.items():
+        entry.append(tops[category].results())
+    return categories, excluded_total, excluded_count
+
+def _analyze_table(table, excluded_vendors, cache=None):
+    """analyze_expenses_by_category on a TransactionTable, with vectorized exclusion and totals"""
+    excluded = table.vendor_mask(excluded_vendors)
+    included = table.take(~excluded).categorize(lambda descriptions: categorize_many(descriptions, cache))
+    
+    # Categories in order of their first transaction, as the row-by-row path adds them
+    codes, first_rows = np.unique(included.category_codes, return_index=True)
+    categories = {}
+    for code in codes[np.argsort(first_rows)]:
+        rows = np.flatnonzero(included.category_codes == code)
+        transactions = included.to_transactions(rows)
+        categories[included.categories.values[code]] = {
+            'total': int(included.amount_cents[rows].sum()) / 100,
+            'count': len(rows),
+            'transactions': transactions,
+            'top': TopK(3, key=attrgetter('amount')).extend(transactions)
+        }
+    
+    return categories, int(table.amount_cents[excluded].sum()) / 100, int(excluded.sum())
 
-def analyze_expenses_by_category(data, month_name):
-    """Analyze and categorize expenses"""
+def analyze_expenses_by_category(data, month_name, cache=None, workers=None):
+    """Analyze and categorize expenses (raw Purchase entities or a TransactionTable).
+
+    With workers > 1 (0 for every core) large inputs are categorized and
+    totalled in a process pool, one contiguous shard per worker; totals are
+    summed in cents, so the result is identical to the serial path. Workers
+    match with the compiled rules directly, so the cache is only used serially.
+    """
     excluded_vendors = ["Stockton Walbeck", "Dakota Walbeck", "Parker Walbeck", "Canyon Smith"]
     
-    categories = defaultdict(lambda: {'total': 0, 'count': 0, 'transactions': []})
+    if TransactionTable is not None and isinstance(data, TransactionTable):
+        return _analyze_table(data, excluded_vendors, cache)
+    
+    transactions = list(parse_purchases(data))
+    columns = ([t.description for t in transactions], [t.amount for t in transactions], [t.vendor for t in transactions])
+    shard = partial(_category_shard, excluded_vendors=frozenset(excluded_vendors))
+    if use_pool(workers, len(transactions)):
+        partials = map_shards(shard, columns, workers, initializer=_use_engine, initargs=(_engine,))
+    else:
+        partials = [shard(0, *columns, cache=cache)]
+    
+    # Shards are contiguous and merged in order, so categories, rows and ties keep their serial order
+    merged = {}
     excluded_total = 0
     excluded_count = 0
+    for shard_categories, shard_excluded_total, shard_excluded_count in partials:
+        excluded_total += shard_excluded_total
+        excluded_count += shard_excluded_count
+        for category, (total, count, rows, top) in shard_categories.items():
+            entry = merged.setdefault(category, [0, 0, [], []])
+            entry[0] += total
+            entry[1] += count
+            entry[2].extend(rows)
+            entry[3].extend(top)
     
-    for item in data:
-        amount = float(item.get('totalAmt', 0))
-        date = item.get('txnDate', 'N/A')[:10]
-        
-        # Get description
-        description = item.get('privateNote', item.get('memo', 'No Description Available'))
-        
-        # Get vendor for exclusion check
-        vendor = ""
-        if item.get('entityRef'):
-            vendor = item.get('entityRef', {}).get('name', '')
-        
-        # Skip excluded vendors
-        if vendor in excluded_vendors:
-            excluded_total += amount
-            excluded_count += 1
-            continue
-        
-        # Categorize transaction
-        category = categorize_transaction(description, amount)
-        
-        categories[category]['total'] += amount
-        categories[category]['count'] += 1
-        safe_description = description if description else 'No Description Available'
-        categories[category]['transactions'].append({
-            'date': date,
-            'amount': amount,
-            'description': safe_description[:100] + ('...' if len(safe_description) > 100 else ''),
-            'vendor': vendor if vendor else 'No Vendor'
-        })
-    
-    return dict(categories), excluded_total, excluded_count
-
-def generate_category_report(month_name, start_date, end_date):
+    categories = {}
+    for category, (total, count, rows, top) in merged.items():
+        categories[category] = {
+            'total': total / 100,
+            'count': count,
+            'transactions': [transactions[row] for row in rows],
+            'top': TopK(3, key=attrgetter('amount')).extend(transactions[row] for row in sorted(top))
+        }
+    
+    return categories, excluded_total / 100, excluded_count
+
+def generate_category_report(month_name, start_date, end_date, cache=None, workers=None):
     """Generate a categorized expense report for a month"""
     print(f"\nProcessing {month_name} 2025 with smart categorization...")
     
-    data = get_month_data_with_categories(start_date, end_date)
+    try:
+        data = get_month_data_with_categories(start_date, end_date)
+    except QuickBooksQueryError as e:
+        print(f"Query failed for {month_name}: {e}")
+        return None
     if not data:
         print(f"No data available for {month_name}")
         return None
     
-    categories, excluded_total, excluded_count = analyze_expenses_by_category(data, month_name)
+    categories, excluded_total, excluded_count = analyze_expenses_by_category(data, month_name, cache, workers)
     
     # Sort categories by total spending
     sorted_categories = sorted(categories.items(), key=lambda x: x[1]['total'], reverse=True)
@@ -161,9 +282,10 @@ def generate_category_report(month_name, start_date, end_date):
         print(f"   Average: ${data['total']/data['count']:,.2f}" if data['count'] > 0 else "   Average: $0.00")
         
         # Show top 3 transactions for this category
-        top_transactions = sorted(data['transactions'], key=lambda x: x['amount'], reverse=True)[:3]
+        top_transactions = data['top'].results()
         for i, txn in enumerate(top_transactions, 1):
-            print(f"   {i}. ${txn['amount']:,.2f} - {txn['description']}")
+            description = txn.display_description()
+            print(f"   {i}. ${txn.amount:,.2f} - {description[:100]}{'...' if len(description) > 100 else ''}")
     
     return {
         'month': month_name,
@@ -175,14 +297,27 @@ def generate_category_report(month_name, start_date, end_date):
 
 # Demonstration: Analyze June 2025
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Categorize one month of expenses")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for categorization (0 for every core; default serial)')
+    args = parser.parse_args()
+
     print("🔍 SMART EXPENSE CATEGORIZATION SYSTEM")
     print("=" * 60)
     print("\n📋 Available Categories:")
     for category, rules in EXPENSE_CATEGORIES.items():
         print(f"• {category}: {rules['description']}")
     
+    # Repeat runs categorize mostly from the persisted cache
+    cache = CategorizationCache.load()
+
     # Analyze June as an example
-    june_analysis = generate_category_report("June", "2025-06-01", "2025-06-30")
+    june_analysis = generate_category_report("June", "2025-06-01", "2025-06-30", cache, args.workers)
+
+    cache.save()
+    stats = cache.stats()
+    print(f"\n🗂️  Categorization cache: {stats['hit_rate']:.1%} hit rate "
+          f"({stats['hits']} hits, {stats['misses']} misses, {stats['invalidated']} invalidated, {stats['entries']} entries)")
     
     print(f"\n\n💡 SORTING OPTIONS AVAILABLE:")
     print("1. By Amount (Highest to Lowest) - Current default")
@@ -0,0 +1,126 @@
+import re
+from bisect import bisect_right
+from collections import defaultdict
+
+TOKEN = re.compile(r'\w+')
+
+
+class DescriptionIndex:
+    """Inverted index from uppercase description tokens to transactions.
+
+    Built once per dataset. A keyword lookup finds the indexed tokens that
+    contain each of its tokens, intersects their postings and confirms the
+    few candidates with a substring check, so results are exactly those of
+    `keyword.upper() in description.upper()` without scanning every row.
+    Keyword tokens with a separator on both sides must be whole tokens and
+    are looked up directly. The others may be part of a token; they are
+    found with str.find over the sorted vocabulary joined into one string,
+    so no per-token Python loop runs. Each distinct description is indexed
+    once.
+    """
+
+    def __init__(self, transactions):
+        self.transactions = list(transactions)
+        self.descriptions = []                # distinct uppercase descriptions
+        self.rows = []                        # transaction positions per description
+        self.postings = defaultdict(list)     # token -> description ids
+        self._description_ids = {}
+        self._token_matches = {}
+
+        for position, txn in enumerate(self.transactions):
+            description_id = self._description_ids.get(txn.description)
+            if description_id is None:
+                description_id = self._description_ids[txn.description] = len(self.descriptions)
+                upper = txn.description.upper()
+                self.descriptions.append(upper)
+                self.rows.append([])
+                for token in set(TOKEN.findall(upper)):
+                    self.postings[token].append(description_id)
+            self.rows[description_id].append(position)
+
+        # Tokens hold no newlines, so a match in the joined text never spans two of them
+        self.vocabulary = sorted(self.postings)
+        self._vocabulary_text = '\n'.join(self.vocabulary)
+        self._token_starts = []
+        offset = 0
+        for token in self.vocabulary:
+            self._token_starts.append(offset)
+            offset += len(token) + 1
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def _tokens_containing(self, token):
+        """Indexed tokens that contain `token`"""
+        tokens = []
+        found = self._vocabulary_text.find(token)
+        while found != -1:
+            index = bisect_right(self._token_starts, found) - 1
+            tokens.append(self.vocabulary[index])
+            if index + 1 == len(self.vocabulary):
+                break
+            found = self._vocabulary_text.find(token, self._token_starts[index + 1])
+        return tokens
+
+    def _descriptions_containing(self, token):
+        """Ids of descriptions with an indexed token that contains `token`"""
+        matches = self._token_matches.get(token)
+        if matches is None:
+            matches = set()
+            for indexed in self._tokens_containing(token):
+                matches.update(self.postings[indexed])
+            self._token_matches[token] = matches
+        return matches
+
+    def _descriptions_with(self, keyword, match):
+        """Ids of descriptions that can hold one token of a keyword"""
+        if 0 < match.start() and match.end() < len(keyword):
+            # Separators on both sides: the keyword token is a whole indexed token
+            return set(self.postings.get(match.group(), ()))
+        return self._descriptions_containing(match.group())
+
+    def _matching_descriptions(self, keyword):
+        keyword = keyword.upper()
+        matches = list(TOKEN.finditer(keyword))
+        if not matches:
+            # Nothing to look up (e.g. punctuation only), so check every description
+            candidates = range(len(self.descriptions))
+        else:
+            candidates = set.intersection(*(self._descriptions_with(keyword, match) for match in matches))
+        return {i for i in candidates if keyword in self.descriptions[i]}
+
+    def positions(self, keyword):
+        """Sorted positions of the transactions whose description contains keyword"""
+        return self._positions_for(self._matching_descriptions(keyword))
+
+    def _positions_for(self, description_ids):
+        return sorted(position for i in description_ids for position in self.rows[i])
+
+    def match_all(self, keywords):
+        """Transactions containing every keyword, in input order"""
+        matches = [self._matching_descriptions(keyword) for keyword in keywords]
+        description_ids = set.intersection(*matches) if matches else set()
+        return [self.transactions[p] for p in self._positions_for(description_ids)]
+
+    def match_any(self, keywords):
+        """Transactions containing at least one keyword, in input order"""
+        description_ids = set().union(*(self._matching_descriptions(keyword) for keyword in keywords))
+        return [self.transactions[p] for p in self._positions_for(description_ids)]
+
+    def filter(self, keyword):
+        """Transactions containing keyword, in input order"""
+        return [self.transactions[p] for p in self.positions(keyword)]
+
+    def total(self, keyword):
+        """Summed amount of the transactions containing keyword"""
+        return sum(self.transactions[p].amount for p in self.positions(keyword))
+
+    def totals(self, keywords):
+        return {keyword: self.total(keyword) for keyword in keywords}
+
+    def partition(self, keyword):
+        """(matching, other) transactions, each in input order"""
+        positions = self.positions(keyword)
+        matching = set(positions)
+        return ([self.transactions[p] for p in positions],
+                [txn for p, txn in enumerate(self.transactions) if p not in matching])
@@ -1,8 +1,12 @@
-import json
+import sys
+from operator import attrgetter
 
-# Read the JSON file
-with open('june_expenses.json', 'r') as f:
-    data = json.load(f)
+from json_stream import iter_json_array
+from transactions import parse_purchases
+
+# Stream the export (plain or gzip-compressed) one Purchase at a time
+export_path = sys.argv[1] if len(sys.argv) > 1 else 'june_expenses.json'
+data = iter_json_array(export_path)
 
 # People to exclude
 excluded_vendors = [
@@ -22,41 +26,20 @@ print("Processing June 2025 Expense Transactions with Bank Descriptions...")
 print("=" * 80)
 
 # Process all transactions
-for item in data:
-    amount = float(item.get('totalAmt', 0))
-    date = item.get('txnDate', 'N/A')
-    
-    # Get the actual bank transaction description from privateNote
-    bank_description = item.get('privateNote')
-    if not bank_description:
-        bank_description = item.get('memo')
-    if not bank_description:
-        bank_description = 'No Description Available'
-    
-    # Get vendor name if available (for exclusion check)
-    vendor = ""
-    if item.get('entityRef'):
-        vendor = item.get('entityRef', {}).get('name', '')
-    
+for txn in parse_purchases(data):
     # Check if this vendor should be excluded
-    if vendor in excluded_vendors:
-        excluded_total += amount
+    if txn.vendor in excluded_vendors:
+        excluded_total += txn.amount
         excluded_count += 1
         continue
     
     # Include this transaction
-    total += amount
+    total += txn.amount
     count += 1
-    
-    transactions.append({
-        'date': date[:10] if date != 'N/A' else 'N/A',
-        'amount': amount,
-        'vendor': vendor if vendor else 'No Vendor Listed',
-        'description': bank_description[:200] if len(bank_description) > 200 else bank_description
-    })
+    transactions.append(txn)
 
 # Sort transactions by amount (highest to lowest)
-transactions.sort(key=lambda x: x['amount'], reverse=True)
+transactions.sort(key=attrgetter('amount'), reverse=True)
 
 # Write to file
 with open('june_2025_bank_transactions_sorted.txt', 'w') as f:
@@ -70,7 +53,7 @@ with open('june_2025_bank_transactions_sorted.txt', 'w') as f:
     f.write("=" * 100 + "\n\n")
     
     for i, txn in enumerate(transactions, 1):
-        f.write(f"{i:3d}. ${txn['amount']:>9,.2f} | {txn['date']} | {txn['description']}\n")
+        f.write(f"{i:3d}. ${txn.amount:>9,.2f} | {txn.date} | {txn.display_description(200)}\n")
         f.write("     " + "-" * 120 + "\n")
 
 # Display summary and top transactions
@@ -83,8 +66,9 @@ print()
 print("Top 15 Bank Transaction Descriptions (after filtering):")
 print("=" * 80)
 for i, txn in enumerate(transactions[:15], 1):
-    description_preview = txn['description'][:70] + "..." if len(txn['description']) > 70 else txn['description']
-    print(f"{i:2d}. ${txn['amount']:>9,.2f} | {txn['date']} | {description_preview}")
+    description = txn.display_description(200)
+    description_preview = description[:70] + "..." if len(description) > 70 else description
+    print(f"{i:2d}. ${txn.amount:>9,.2f} | {txn.date} | {description_preview}")
 
 print()
 print("Full list with bank descriptions saved to: june_2025_bank_transactions_sorted.txt")
\ No newline at end of file
@@ -1,8 +1,12 @@
-import json
+import sys
+from operator import attrgetter
 
-# Read the JSON file
-with open('june_expenses.json', 'r') as f:
-    data = json.load(f)
+from json_stream import iter_json_array
+from transactions import parse_purchases
+
+# Stream the export (plain or gzip-compressed) one Purchase at a time
+export_path = sys.argv[1] if len(sys.argv) > 1 else 'june_expenses.json'
+data = iter_json_array(export_path)
 
 # People to exclude
 excluded_vendors = [
@@ -22,35 +26,20 @@ print("Processing June 2025 Expense Transactions...")
 print("=" * 60)
 
 # Process all transactions
-for item in data:
-    amount = float(item.get('totalAmt', 0))
-    date = item.get('txnDate', 'N/A')
-    memo = item.get('privateNote', item.get('memo', 'N/A'))
-    
-    # Get vendor name if available
-    vendor = ""
-    if item.get('entityRef'):
-        vendor = item.get('entityRef', {}).get('name', 'Unknown')
-    
+for txn in parse_purchases(data):
     # Check if this vendor should be excluded
-    if vendor in excluded_vendors:
-        excluded_total += amount
+    if txn.vendor in excluded_vendors:
+        excluded_total += txn.amount
         excluded_count += 1
         continue
     
     # Include this transaction
-    total += amount
+    total += txn.amount
     count += 1
-    
-    transactions.append({
-        'date': date[:10] if date != 'N/A' else 'N/A',
-        'amount': amount,
-        'vendor': vendor if vendor else 'No Vendor',
-        'memo': memo[:100] if memo and memo != 'N/A' else 'No Memo'
-    })
+    transactions.append(txn)
 
 # Sort transactions by amount (highest to lowest)
-transactions.sort(key=lambda x: x['amount'], reverse=True)
+transactions.sort(key=attrgetter('amount'), reverse=True)
 
 # Write to file
 with open('june_2025_expenses_filtered_sorted.txt', 'w') as f:
@@ -64,7 +53,7 @@ with open('june_2025_expenses_filtered_sorted.txt', 'w') as f:
     f.write("=" * 80 + "\n\n")
     
     for i, txn in enumerate(transactions, 1):
-        line = f"{i:3d}. ${txn['amount']:>8,.2f} | {txn['date']} | {txn['vendor'][:30]:<30} | {txn['memo'][:40]}\n"
+        line = f"{i:3d}. ${txn.amount:>8,.2f} | {txn.date} | {txn.display_vendor('No Vendor')[:30]:<30} | {(txn.description or 'No Memo')[:40]}\n"
         f.write(line)
 
 # Display summary
@@ -79,7 +68,7 @@ print()
 print("Top 10 Expenses (after filtering):")
 print("-" * 60)
 for i, txn in enumerate(transactions[:10], 1):
-    print(f"{i:2d}. ${txn['amount']:>8,.2f} | {txn['date']} | {txn['vendor'][:25]}")
+    print(f"{i:2d}. ${txn.amount:>8,.2f} | {txn.date} | {txn.display_vendor('No Vendor')[:25]}")
 
 print()
 print("Full sorted list saved to: june_2025_expenses_filtered_sorted.txt")
\ No newline at end of file
@@ -0,0 +1,91 @@
+import gzip
+import io
+import json
+
+# Characters read from the export per refill of the parse buffer
+CHUNK_SIZE = 1 << 16
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+_WHITESPACE = ' \t\n\r'
+
+
+def open_export(path):
+    """Open an export as text, transparently decompressing gzip files"""
+    raw = open(path, 'rb')
+    if raw.peek(2)[:2] == GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=raw), encoding='utf-8')
+    return io.TextIOWrapper(raw, encoding='utf-8')
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE):
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Only the current element and one chunk of text are held in memory, so
+    memory use stays flat regardless of export size.
+    """
+    decoder = json.JSONDecoder()
+    with open_export(path) as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise ValueError(f"{path} does not contain a top-level JSON array")
+        pos += 1
+
+        expect_value = True
+        empty = True
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"{path} ended before the JSON array was closed")
+            char = buffer[pos]
+            if not expect_value:
+                # Between elements only a separator or the closing bracket may follow
+                if char == ']':
+                    return
+                if char != ',':
+                    raise ValueError(f"{path}: expected ',' or ']' after an array element, found {char!r}")
+                pos += 1
+                expect_value = True
+                continue
+            if char == ']':
+                if empty:
+                    return
+                raise ValueError(f"{path}: trailing comma before ']'")
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if end == len(buffer) and not eof:
+                # A scalar cut at the chunk boundary can still decode; re-read to be sure
+                fill()
+                continue
+
+            pos = end
+            expect_value = False
+            empty = False
+            yield item
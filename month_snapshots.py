@@ -0,0 +1,58 @@
+import json
+import os
+
+# Where per-month report aggregates are persisted between runs
+SNAPSHOT_PATH = os.environ.get('MONTH_SNAPSHOT_PATH', '.month_snapshots.json')
+
+SNAPSHOT_VERSION = 1
+
+
+class MonthSnapshots:
+    """Per-month aggregates, each stored with the fingerprint of the inputs it came from.
+
+    Report files are tracked separately: each path records the fingerprint it
+    was last written with, since different runs write different sinks (sorted,
+    complete, json) for the same month from one shared snapshot file.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self.months = {}
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_PATH):
+        """Load snapshots from disk, starting empty if missing or unreadable"""
+        snapshots = cls(path)
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return snapshots
+        if saved.get('version') == SNAPSHOT_VERSION:
+            snapshots.months = saved.get('months', {})
+        return snapshots
+
+    def save(self):
+        """Write the snapshots atomically"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': SNAPSHOT_VERSION, 'months': self.months}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key, fingerprint):
+        """Saved aggregates for a month, or None if missing or computed from other inputs"""
+        snapshot = self.months.get(key)
+        if snapshot is None or snapshot['fingerprint'] != fingerprint:
+            return None
+        return snapshot['summary']
+
+    def files_current(self, key, fingerprint, paths):
+        """Whether every path exists and was last written from inputs with this fingerprint"""
+        written = self.months.get(key, {}).get('files', {})
+        return all(written.get(path) == fingerprint and os.path.exists(path) for path in paths)
+
+    def put(self, key, fingerprint, summary, paths=()):
+        """Record a month's aggregates and the report files just written from them"""
+        written = dict(self.months.get(key, {}).get('files', {}))
+        written.update((path, fingerprint) for path in paths)
+        self.months[key] = {'fingerprint': fingerprint, 'summary': summary, 'files': written}
@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this many transactions starting a pool costs more than it saves
+MIN_PARALLEL_ROWS = int(os.environ.get('ANALYSIS_MIN_PARALLEL_ROWS', '20000'))
+
+
+def cents(amount):
+    """Integer cents of a dollar amount; sums of these are exact in any order"""
+    return round(amount * 100)
+
+
+def resolve_workers(workers):
+    """Process count for a workers argument: None or 1 is serial, 0 means every core"""
+    if workers == 0:
+        return os.cpu_count() or 1
+    return max(1, workers or 1)
+
+
+def use_pool(workers, rows):
+    """Whether `rows` transactions are worth sharding across `workers` processes"""
+    return resolve_workers(workers) > 1 and rows >= MIN_PARALLEL_ROWS
+
+
+def shard_bounds(rows, shards):
+    """Contiguous (start, stop) row ranges of near-equal size"""
+    shards = max(1, min(shards, rows))
+    return [(rows * shard // shards, rows * (shard + 1) // shards) for shard in range(shards)]
+
+
+def map_shards(function, columns, workers, initializer=None, initargs=()):
+    """Run function(offset, *column_slices) over contiguous shards in a process pool.
+
+    Columns are plain lists (strings, floats), which pickle far faster than
+    Transaction objects. Results come back in shard order, so merging them
+    in sequence sees every key in the same order a single pass would.
+    """
+    workers = resolve_workers(workers)
+    bounds = shard_bounds(len(columns[0]), workers)
+    with ProcessPoolExecutor(max_workers=len(bounds), initializer=initializer, initargs=initargs) as pool:
+        futures = [pool.submit(function, start, *(column[start:stop] for column in columns))
+                   for start, stop in bounds]
+        return [future.result() for future in futures]
+
+
+def merge_totals(partials):
+    """Add {key: cents} partials together, keeping first-seen key order"""
+    merged = {}
+    for partial in partials:
+        for key, value in partial.items():
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def to_dollars(totals):
+    """{key: cents} → {key: dollars}"""
+    return {key: value / 100 for key, value in totals.items()}
@@ -0,0 +1,269 @@
+import argparse
+import bisect
+import calendar
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import quickbooks_client
+from quickbooks_client import PAGE_SIZE, QuickBooksQueryError
+
+# Ranges counted per /batch request while planning (the server's default cap)
+COUNT_BATCH_SIZE = 50
+
+# Split windows aim for this share of a page, leaving room for entities added before the fetch
+FILL = 0.9
+
+
+def parse_date(value):
+    """date from a date or a YYYY-MM-DD string"""
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def period_label(start, end):
+    """'2025' for a single year, '2024-2025' across years"""
+    start, end = parse_date(start), parse_date(end)
+    return str(start.year) if start.year == end.year else f"{start.year}-{end.year}"
+
+
+def month_periods(start, end):
+    """Calendar months covering start..end, clipped to the range.
+
+    Each is {'name', 'label', 'start', 'end'} with ISO dates. Names are the
+    bare month name within a single year and carry the year otherwise, so
+    they stay unique; labels always carry the year.
+    """
+    start, end = parse_date(start), parse_date(end)
+    if end < start:
+        raise ValueError(f"Period ends before it starts: {start}..{end}")
+    single_year = start.year == end.year
+    periods = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        first = max(date(year, month, 1), start)
+        last = min(date(year, month, calendar.monthrange(year, month)[1]), end)
+        label = f"{calendar.month_name[month]} {year}"
+        periods.append({
+            "name": calendar.month_name[month] if single_year else label,
+            "label": label,
+            "start": first.isoformat(),
+            "end": last.isoformat()
+        })
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return periods
+
+
+def split_window(window, parts=2):
+    """Split a (start, end) window of ISO dates into `parts` runs of whole days (bisect by default)"""
+    start, end = parse_date(window[0]), parse_date(window[1])
+    days = (end - start).days + 1
+    parts = max(1, min(parts, days))
+    pieces = []
+    for part in range(parts):
+        first = start + timedelta(days=days * part // parts)
+        last = start + timedelta(days=days * (part + 1) // parts - 1)
+        pieces.append((first.isoformat(), last.isoformat()))
+    return tuple(pieces)
+
+
+def count_windows(windows):
+    """{window: Purchase count} from the server, COUNT_BATCH_SIZE windows per round trip"""
+    counts = {}
+    for offset in range(0, len(windows), COUNT_BATCH_SIZE):
+        counts.update(quickbooks_client.count_purchases(windows[offset:offset + COUNT_BATCH_SIZE]))
+    return counts
+
+
+def merge_windows(windows, counts, cap=PAGE_SIZE):
+    """Join adjacent windows while their combined count still fits in one page"""
+    merged = []
+    for window in windows:
+        if merged:
+            (start, end), expected = merged[-1]
+            adjacent = parse_date(end) + timedelta(days=1) == parse_date(window[0])
+            if adjacent and expected + counts[window] < cap:
+                merged[-1] = ((start, window[1]), expected + counts[window])
+                continue
+        merged.append((window, counts[window]))
+    return [(start, end, expected) for (start, end), expected in merged]
+
+
+def plan_windows(ranges, cap=PAGE_SIZE, count=count_windows):
+    """Query windows covering the given ranges, each expected to fit in one page.
+
+    Ranges are counted in one round trip; any range whose count reaches the
+    page cap is split (bisected, or cut into as many parts as its count
+    needs at FILL of a page) and the parts counted again, until every window
+    fits or is a single day (which is then paged). Adjacent sparse windows
+    are merged. Returns [(start, end, expected_count)] in date order.
+    """
+    windows = sorted(tuple(window) for window in ranges)
+    counts = dict(count(windows))
+    dense = [window for window in windows if counts[window] >= cap and window[0] < window[1]]
+    while dense:
+        splits = {window: split_window(window, max(2, math.ceil(counts[window] / (cap * FILL)))) for window in dense}
+        counts.update(count([part for parts in splits.values() for part in parts]))
+        windows = [part for window in windows for part in splits.get(window, (window,))]
+        dense = [part for parts in splits.values() for part in parts if counts[part] >= cap and part[0] < part[1]]
+    return merge_windows(windows, counts, cap)
+
+
+def plan_or_fallback(periods, cap=PAGE_SIZE):
+    """plan_windows over the periods, or one window per period if the server cannot count"""
+    ranges = [(period['start'], period['end']) for period in periods]
+    try:
+        return plan_windows(ranges, cap)
+    except QuickBooksQueryError as e:
+        print(f"  Period planning unavailable ({e}); querying each period separately")
+        return [(start, end, None) for start, end in ranges]
+
+
+class PeriodStream:
+    """Entities of one period read from its windows in turn.
+
+    Sources are PagedQuery objects, for windows that lie inside the period,
+    or lists, for its share of a window merged across several periods. The
+    next source is fetched while the current one is consumed, so the stream
+    behaves like iter_month_data; `stats` sums the counters of its queries.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+
+    @property
+    def stats(self):
+        totals = {}
+        for source in self.sources:
+            for key, value in getattr(source, 'stats', {}).items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def prefetch(self):
+        """Fetch the first page of the first query now, e.g. from a worker thread"""
+        for source in self.sources:
+            if isinstance(source, quickbooks_client.PagedQuery):
+                source.prefetch()
+                break
+        return self
+
+    def __iter__(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            for position, source in enumerate(self.sources):
+                following = [later for later in self.sources[position + 1:] if isinstance(later, quickbooks_client.PagedQuery)]
+                upcoming = executor.submit(following[0].prefetch) if following else None
+                yield from source
+                if upcoming is not None:
+                    upcoming.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_periods(periods, order_by=None, fields=None, max_workers=4, batch=False, stats=None, cap=PAGE_SIZE):
+    """Fetch the Purchases of several non-overlapping periods through planned query windows.
+
+    Yields (index, period, data, error) like fetch_months_concurrently.
+    Within a period, entities keep the order a single query with order_by
+    would give. Each period's data is a PeriodStream over its windows, with
+    the transfer counters of those windows as its stats. Windows merged
+    across sparse periods hold at most a page; they are split between their
+    periods and their counters, like those of a /batch request (batch=True),
+    accumulate in stats.
+    """
+    if not periods:
+        return
+    stats = {} if stats is None else stats
+    order = sorted(range(len(periods)), key=lambda index: periods[index]['start'])
+    starts = [periods[index]['start'] for index in order]
+
+    def owner(day):
+        position = bisect.bisect_right(starts, day) - 1
+        if position >= 0 and day <= periods[order[position]]['end']:
+            return order[position]
+        return None
+
+    def split_by_owner(items):
+        shares = {}
+        for item in items:
+            index = owner((item.get('txnDate') or '')[:10])
+            if index is not None:
+                shares.setdefault(index, []).append(item)
+        return shares
+
+    windows = [{'start': start, 'end': end, 'expected': expected}
+               for start, end, expected in plan_or_fallback([periods[i] for i in order], cap)]
+    descending = (order_by or '').upper().endswith('DESC')
+    period_windows = {index: [] for index in range(len(periods))}
+    shared = set()
+    for position, window in enumerate(windows):
+        owners = [index for index in range(len(periods))
+                  if periods[index]['start'] <= window['end'] and periods[index]['end'] >= window['start']]
+        for index in owners:
+            period_windows[index].append(position)
+        if len(owners) > 1:
+            shared.add(position)
+    for positions in period_windows.values():
+        positions.sort(reverse=descending)
+
+    if batch:
+        # One round trip returns every window whole, so each is split between its periods
+        shares = {}
+        failed = {}
+        for position, window, data, error in quickbooks_client.fetch_months_batched(windows, order_by, stats, fields):
+            if error is None:
+                shares[position] = split_by_owner(data)
+            else:
+                failed[position] = error
+        for index, period in enumerate(periods):
+            errors = [failed[position] for position in period_windows[index] if position in failed]
+            if errors:
+                yield index, period, None, errors[0]
+            else:
+                yield index, period, PeriodStream([shares[position].get(index, []) for position in period_windows[index]]), None
+        return
+
+    def window_query(position):
+        window = windows[position]
+        # The planned count lets paging tell a server page cap from the last page
+        return quickbooks_client.iter_month_data(window['start'], window['end'], order_by, fields=fields,
+                                                 total=window['expected'])
+
+    shared_queries = {position: window_query(position) for position in shared}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as shared_pool, \
+            ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        shared_shares = {position: shared_pool.submit(split_by_owner, query)
+                         for position, query in shared_queries.items()}
+
+        def open_period(index):
+            sources = [shared_shares[position].result().get(index, []) if position in shared else window_query(position)
+                       for position in period_windows[index]]
+            return PeriodStream(sources).prefetch()
+
+        try:
+            futures = {executor.submit(open_period, index): index for index in range(len(periods))}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield index, periods[index], future.result(), None
+                except QuickBooksQueryError as e:
+                    yield index, periods[index], None, e
+        finally:
+            for query in shared_queries.values():
+                for key, value in query.stats.items():
+                    stats[key] = stats.get(key, 0) + value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the query windows planned for a period")
+    parser.add_argument('--start', default='2025-01-01', help='First TxnDate (YYYY-MM-DD)')
+    parser.add_argument('--end', default='2025-12-31', help='Last TxnDate (YYYY-MM-DD)')
+    parser.add_argument('--cap', type=int, default=PAGE_SIZE, help='Entities one query page may return')
+    args = parser.parse_args()
+
+    periods = month_periods(args.start, args.end)
+    windows = plan_or_fallback(periods, args.cap)
+    print(f"\n🗓️  {len(periods)} months {args.start} → {args.end}: {len(windows)} query windows")
+    print("=" * 80)
+    for start, end, expected in windows:
+        days = (parse_date(end) - parse_date(start)).days + 1
+        print(f"{start} → {end} {days:>5} days {expected if expected is not None else '?':>8} Purchases")
@@ -0,0 +1,147 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Month key for work done once per run rather than per month
+RUN = '(run)'
+
+
+class NullMetrics:
+    """Instrumentation that records nothing; the default when metrics are off"""
+
+    enabled = False
+
+    def stage(self, month, name):
+        return nullcontext()
+
+    def record(self, month, name, **values):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class PipelineMetrics:
+    """Per-month, per-stage wall time, rows, bytes and peak memory.
+
+    A stage's peak memory is the tracemalloc peak above what was already
+    allocated when it started. Stages are flat (not nested) so each peak is
+    its own, but tracing is process-wide, so with concurrent fetches it also
+    counts pages downloaded by background threads during the stage. Tracing
+    slows allocation-heavy code; pass memory=False for undistorted timings.
+    """
+
+    enabled = True
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.months = {}
+        self.created_at = datetime.now().isoformat(timespec='seconds')
+        self.started = time.perf_counter()
+        self.elapsed = None
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _entry(self, month, name):
+        stages = self.months.setdefault(month, {})
+        return stages.setdefault(name, {'seconds': 0.0})
+
+    @contextmanager
+    def stage(self, month, name):
+        """Time a block as one stage of a month (repeated stages accumulate)"""
+        if self.memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self._entry(month, name)
+            entry['seconds'] += time.perf_counter() - start
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                entry['peak_memory_bytes'] = max(entry.get('peak_memory_bytes', 0), peak)
+
+    def record(self, month, name, **values):
+        """Add counters such as rows=, bytes= or seconds= to a stage"""
+        entry = self._entry(month, name)
+        for key, value in values.items():
+            entry[key] = entry.get(key, 0) + value
+
+    def close(self):
+        if self.elapsed is None:
+            self.elapsed = time.perf_counter() - self.started
+            if self.memory and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def stage_totals(self):
+        """{stage: summed counters over all months}, peak memory as the maximum"""
+        totals = {}
+        for stages in self.months.values():
+            for name, entry in stages.items():
+                total = totals.setdefault(name, {})
+                for key, value in entry.items():
+                    if key == 'peak_memory_bytes':
+                        total[key] = max(total.get(key, 0), value)
+                    else:
+                        total[key] = total.get(key, 0) + value
+        return totals
+
+    def to_dict(self):
+        self.close()
+        return {
+            'created_at': self.created_at,
+            'total_seconds': self.elapsed,
+            'stages': self.stage_totals(),
+            'months': self.months
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_summary(self):
+        """Table of stages by total time"""
+        self.close()
+        totals = self.stage_totals()
+        print("\n" + "=" * 80)
+        print(f"PIPELINE METRICS ({self.elapsed:.2f}s wall)")
+        print("=" * 80)
+        print(f"{'Stage':<24} {'Seconds':>9} {'Share':>7} {'Rows':>9} {'MB in':>8} {'Peak MiB':>9}")
+        for name, total in sorted(totals.items(), key=lambda item: item[1]['seconds'], reverse=True):
+            share = total['seconds'] / self.elapsed * 100 if self.elapsed else 0
+            rows = f"{total['rows']:,}" if 'rows' in total else '-'
+            received = f"{total['bytes'] / 1e6:.2f}" if 'bytes' in total else '-'
+            peak = f"{total['peak_memory_bytes'] / 2 ** 20:.1f}" if 'peak_memory_bytes' in total else '-'
+            print(f"{name:<24} {total['seconds']:>9.3f} {share:>6.1f}% {rows:>9} {received:>8} {peak:>9}")
+        print("Fetch and decode run in worker threads, so shares can add up past 100%.")
+
+
+def add_arguments(parser):
+    """Add the opt-in metrics flags to a report script's argument parser"""
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='Record per-month, per-stage timing and memory to this JSON file')
+    parser.add_argument('--metrics-summary', action='store_true',
+                        help='Print a per-stage summary table at the end of the run')
+    parser.add_argument('--no-metrics-memory', action='store_true',
+                        help='Skip tracemalloc, which slows the run, and record timings only')
+
+
+def from_args(args):
+    """PipelineMetrics if the flags ask for them, else None"""
+    if args.metrics or args.metrics_summary:
+        return PipelineMetrics(memory=not args.no_metrics_memory)
+    return None
+
+
+def finish(metrics, args):
+    """Write and print the metrics requested by the flags"""
+    if metrics is None:
+        return
+    if args.metrics:
+        metrics.save(args.metrics)
+        print(f"\nMetrics saved to: {args.metrics}")
+    if args.metrics_summary:
+        metrics.print_summary()
@@ -0,0 +1,422 @@
+import gzip
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from quickbooks_fixtures import RECORD_DIR, FixtureRecorder, aggregate_key
+
+# Base URL of the Spring Boot QuickBooks API (override for remote servers)
+API_URL = os.environ.get('QUICKBOOKS_API_URL', 'http://localhost:8080/api/v1/quickbooks')
+
+# QuickBooks caps a single query page at 1000 entities
+PAGE_SIZE = 1000
+
+# Servers that cap pages below MAXRESULTS (e.g. the stand-in's --page-limit) need
+# the cap set here unless a counted walk detects it (see PagedQuery)
+PAGE_LIMIT = int(os.environ['QUICKBOOKS_PAGE_LIMIT']) if os.environ.get('QUICKBOOKS_PAGE_LIMIT') else None
+
+# Ask the server for gzip-compressed responses (QUICKBOOKS_GZIP=0 turns it off)
+COMPRESS = os.environ.get('QUICKBOOKS_GZIP', '1') != '0'
+
+# Errors that mean a pooled keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class QuickBooksQueryError(Exception):
+    """Raised when the query API is unreachable or rejects a query"""
+
+
+class QuickBooksClient:
+    """Keep-alive HTTP client with a pool of reusable connections.
+
+    With record_dir set (QUICKBOOKS_RECORD_DIR), every successful query,
+    /batch result, count and aggregate is saved with its response as a
+    fixture for quickbooks_standin.py to replay; field projection is then
+    skipped so fixtures hold complete entities.
+    With compress, responses are requested gzip-encoded. page_limit is the
+    most entities the server returns per page, when below MAXRESULTS.
+    """
+
+    def __init__(self, base_url=API_URL, pool_size=8, timeout=120, record_dir=RECORD_DIR, compress=COMPRESS,
+                 page_limit=PAGE_LIMIT):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self.recorder = FixtureRecorder(record_dir) if record_dir else None
+        self.compress = compress
+        self.page_limit = page_limit
+
+    def _new_connection(self):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        """Take an idle connection from the pool, or open a new one"""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(self, conn):
+        """Return a connection to the pool, closing it if the pool is full"""
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _send(self, conn, method, path, body, headers):
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read(), response.getheader('Connection', ''), response.getheader('Content-Encoding', '')
+
+    def request(self, method, path, payload=None, stats=None):
+        """Send a request and return the decoded JSON body.
+
+        If a stats dict is given, requests, bytes (as received), json_bytes
+        (after decompression), request_seconds and decode_seconds are added
+        to it.
+        """
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if self.compress:
+            headers['Accept-Encoding'] = 'gzip'
+        url = self.base_path + path
+
+        started = time.perf_counter()
+        conn, reused = self._acquire()
+        try:
+            try:
+                status, raw, connection_header, encoding = self._send(conn, method, url, body, headers)
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a fresh one
+                conn.close()
+                conn = self._new_connection()
+                status, raw, connection_header, encoding = self._send(conn, method, url, body, headers)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise QuickBooksQueryError(f"Request to {url} failed: {e}") from e
+
+        if connection_header.lower() == 'close':
+            conn.close()
+        else:
+            self._release(conn)
+
+        received = time.perf_counter()
+        try:
+            text = gzip.decompress(raw) if encoding.lower() == 'gzip' else raw
+            data = json.loads(text) if text else None
+        except (ValueError, OSError, EOFError) as e:
+            raise QuickBooksQueryError(f"Invalid JSON from {url} (HTTP {status})") from e
+        if stats is not None:
+            stats['requests'] = stats.get('requests', 0) + 1
+            stats['bytes'] = stats.get('bytes', 0) + len(raw)
+            stats['json_bytes'] = stats.get('json_bytes', 0) + len(text)
+            stats['request_seconds'] = stats.get('request_seconds', 0.0) + received - started
+            stats['decode_seconds'] = stats.get('decode_seconds', 0.0) + time.perf_counter() - received
+
+        if status >= 400:
+            message = data.get('error') if isinstance(data, dict) else None
+            raise QuickBooksQueryError(message or f"HTTP {status} from {url}")
+        return data
+
+    def query(self, sql, stats=None, fields=None, cache=True):
+        """Execute a QuickBooks query and return the list of entities.
+
+        With fields (e.g. transactions.PURCHASE_FIELDS) the server returns
+        only those properties of each entity. cache=False asks the server for
+        a fresh read instead of a result it cached earlier.
+        """
+        payload = {'query': sql}
+        if not cache:
+            payload['cache'] = False
+        if fields and self.recorder is None:
+            # Comma-separated, so servers without projection ignore it
+            payload['fields'] = ','.join(fields)
+        data = self.request('POST', '/query', payload, stats)
+        if data is None:
+            data = []
+        if self.recorder is not None:
+            self.recorder.record(sql, data)
+        return data
+
+    def batch_query(self, queries, paginate=True, stats=None, fields=None):
+        """Run several queries in one /batch round trip.
+
+        queries is {id: sql}; the server runs them concurrently and, with
+        paginate, follows every page of each. Returns ({id: entities},
+        {id: error message}). fields projects every result as in query().
+        """
+        payload = {
+            'queries': [{'id': str(key), 'query': sql} for key, sql in queries.items()],
+            'paginate': paginate
+        }
+        if fields and self.recorder is None:
+            payload['fields'] = ','.join(fields)
+        data = self.request('POST', '/batch', payload, stats)
+        results = data.get('results') or {}
+        errors = data.get('errors') or {}
+        if self.recorder is not None:
+            for key, sql in queries.items():
+                if str(key) in results:
+                    self.recorder.record(sql, results[str(key)], 'pages' if paginate else 'query')
+        return ({key: results[str(key)] for key in queries if str(key) in results},
+                {key: errors[str(key)] for key in queries if str(key) in errors})
+
+    def batch_count(self, queries, stats=None):
+        """Entity counts for several SELECT COUNT(*) queries in one /batch round trip.
+
+        queries is {id: sql}; returns ({id: count}, {id: error message}).
+        """
+        payload = {'queries': [{'id': str(key), 'query': sql, 'count': True} for key, sql in queries.items()]}
+        data = self.request('POST', '/batch', payload, stats)
+        results = data.get('results') or {}
+        errors = data.get('errors') or {}
+        counts = {}
+        for key in queries:
+            result = results.get(str(key))
+            if isinstance(result, dict) and 'totalCount' in result:
+                counts[key] = int(result['totalCount'])
+                if self.recorder is not None:
+                    self.recorder.record(queries[key], counts[key], 'count')
+            elif str(key) not in errors:
+                errors[str(key)] = 'Server did not return a count'
+        return counts, {key: errors[str(key)] for key in queries if str(key) in errors}
+
+    def aggregate(self, start_date, end_date, group_by=('month',), excluded_vendors=(), categories=None,
+                  default_category=None, stats=None):
+        """Purchase totals and counts for a date range, summed by the server.
+
+        Returns {'total', 'count', 'excludedTotal', 'excludedCount', 'groups'}
+        where each group is {'key': {field: value}, 'total', 'count', 'min',
+        'max'}. Grouping by 'category' needs the category rules.
+        """
+        payload = {
+            'startDate': start_date,
+            'endDate': end_date,
+            'groupBy': list(group_by),
+            'excludedVendors': list(excluded_vendors)
+        }
+        if categories is not None:
+            payload['categories'] = categories
+        if default_category is not None:
+            payload['defaultCategory'] = default_category
+        data = self.request('POST', '/aggregate', payload, stats)
+        if self.recorder is not None:
+            self.recorder.record(aggregate_key(payload), data, 'aggregate')
+        return data
+
+    def close(self):
+        """Close all idle pooled connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class PagedQuery:
+    """Iterable over every page of a query using STARTPOSITION/MAXRESULTS.
+
+    Entities are yielded one at a time; while the caller processes a page the
+    next one is already being fetched in the background. Paging stops at the
+    first page shorter than a full page, which is page_size or the client's
+    page_limit if the server caps pages lower. With total, the expected
+    entity count (e.g. from the period planner), a short page before total
+    is reached reveals such a cap: paging continues and the client
+    remembers it. Transfer counters for all pages accumulate in `stats`.
+
+    Pages bypass the server's query cache: each page is cached under its own
+    STARTPOSITION, so cached pages of different ages could skip or repeat
+    rows, and a repeated incremental sync would see stale results.
+    """
+
+    def __init__(self, client, sql, page_size=PAGE_SIZE, fields=None, total=None):
+        self.client = client
+        self.sql = sql
+        self.page_size = page_size
+        self.fields = fields
+        self.total = total
+        self.stats = {}
+        self._first_page = None
+
+    def _fetch(self, start_position):
+        return self.client.query(f"{self.sql} STARTPOSITION {start_position} MAXRESULTS {self.page_size}", self.stats, self.fields,
+                                 cache=False)
+
+    def _has_more(self, page, fetched):
+        """Whether another page may follow this one"""
+        if len(page) >= min(self.page_size, self.client.page_limit or self.page_size):
+            return True
+        if self.total is not None and fetched < self.total:
+            # Short, yet the count says more remain: the server caps pages at this size
+            self.client.page_limit = len(page)
+            return True
+        return False
+
+    def prefetch(self):
+        """Fetch the first page now, e.g. from a worker thread"""
+        if self._first_page is None:
+            self._first_page = self._fetch(1)
+        return self
+
+    def __iter__(self):
+        page = self.prefetch()._first_page
+        self._first_page = None
+        fetched = 0
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            while page:
+                fetched += len(page)
+                if not self._has_more(page, fetched):
+                    yield from page
+                    return
+                next_page = executor.submit(self._fetch, fetched + 1)
+                yield from page
+                page = next_page.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide shared client"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = QuickBooksClient()
+    return _default_client
+
+
+def purchase_query(start_date, end_date, order_by=None):
+    """Build the Purchase query for a date range"""
+    query = f"SELECT * FROM Purchase WHERE TxnDate >= '{start_date}' AND TxnDate <= '{end_date}'"
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    return query
+
+
+def purchase_count_query(start_date, end_date):
+    """Build the Purchase COUNT(*) query for a date range"""
+    return f"SELECT COUNT(*) FROM Purchase WHERE TxnDate >= '{start_date}' AND TxnDate <= '{end_date}'"
+
+
+def query(sql, fields=None):
+    """Execute a query with the shared client"""
+    return get_client().query(sql, fields=fields)
+
+
+def aggregate_purchases(start_date, end_date, group_by=('month',), excluded_vendors=(), categories=None,
+                        default_category=None):
+    """Server-side Purchase totals for a date range with the shared client"""
+    return get_client().aggregate(start_date, end_date, group_by, excluded_vendors, categories, default_category)
+
+
+def get_months_data(ranges, order_by=None, fields=None):
+    """Fetch every Purchase for several (start_date, end_date) ranges in one batch request.
+
+    Returns {(start_date, end_date): entities}; raises QuickBooksQueryError
+    if any range failed.
+    """
+    ranges = [tuple(date_range) for date_range in ranges]
+    queries = {str(index): purchase_query(start, end, order_by) for index, (start, end) in enumerate(ranges)}
+    results, errors = get_client().batch_query(queries, fields=fields)
+    if errors:
+        failed = '; '.join(f"{ranges[int(key)][0]}..{ranges[int(key)][1]}: {message}" for key, message in errors.items())
+        raise QuickBooksQueryError(f"Batch query failed for {failed}")
+    return {ranges[int(key)]: results[key] for key in queries}
+
+
+def count_purchases(ranges):
+    """Purchase counts for several (start_date, end_date) ranges in one batch request.
+
+    Returns {(start_date, end_date): count}; raises QuickBooksQueryError if
+    any range could not be counted.
+    """
+    ranges = [tuple(date_range) for date_range in ranges]
+    queries = {str(index): purchase_count_query(start, end) for index, (start, end) in enumerate(ranges)}
+    counts, errors = get_client().batch_count(queries)
+    if errors:
+        failed = '; '.join(f"{ranges[int(key)][0]}..{ranges[int(key)][1]}: {message}" for key, message in errors.items())
+        raise QuickBooksQueryError(f"Count failed for {failed}")
+    return {ranges[int(key)]: counts[key] for key in queries}
+
+
+def iter_query(sql, page_size=PAGE_SIZE, fields=None, total=None):
+    """Stream every entity matching a query, page by page (total: its expected count, if known)"""
+    return PagedQuery(get_client(), sql, page_size, fields, total)
+
+
+def iter_month_data(start_date, end_date, order_by=None, page_size=PAGE_SIZE, fields=None, total=None):
+    """Stream all Purchase entities for a date range without a result cap"""
+    return iter_query(purchase_query(start_date, end_date, order_by), page_size, fields, total)
+
+
+def get_month_data(start_date, end_date, order_by=None, page_size=PAGE_SIZE, fields=None):
+    """Fetch all Purchase entities for a date range as a list"""
+    return list(iter_month_data(start_date, end_date, order_by, page_size, fields))
+
+
+def fetch_months_batched(months, order_by=None, stats=None, fields=None):
+    """Fetch every month in a single /batch request.
+
+    Yields (index, month, data, error) like fetch_months_concurrently, in
+    input order once the whole batch has arrived.
+    """
+    queries = {str(index): purchase_query(month['start'], month['end'], order_by) for index, month in enumerate(months)}
+    try:
+        results, errors = get_client().batch_query(queries, stats=stats, fields=fields)
+    except QuickBooksQueryError as e:
+        for index, month in enumerate(months):
+            yield index, month, None, e
+        return
+    for index, month in enumerate(months):
+        key = str(index)
+        if key in results:
+            yield index, month, results[key], None
+        else:
+            yield index, month, None, QuickBooksQueryError(errors.get(key, 'Missing from batch response'))
+
+
+def fetch_months_concurrently(months, fetch_month, max_workers=4):
+    """Fetch months with up to max_workers queries in flight.
+
+    Yields (index, month, data, error) in completion order so callers can
+    process each month as soon as it arrives; index is the month's position
+    in the input list for restoring calendar order.
+    """
+    if max_workers <= 1:
+        for index, month in enumerate(months):
+            try:
+                yield index, month, fetch_month(month), None
+            except QuickBooksQueryError as e:
+                yield index, month, None, e
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_month, month): (index, month) for index, month in enumerate(months)}
+        for future in as_completed(futures):
+            index, month = futures[future]
+            try:
+                yield index, month, future.result(), None
+            except QuickBooksQueryError as e:
+                yield index, month, None, e
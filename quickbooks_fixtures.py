@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+import re
+
+# Directory query → response pairs are recorded to when set (see QuickBooksClient)
+RECORD_DIR = os.environ.get('QUICKBOOKS_RECORD_DIR')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(sql):
+    """Collapse whitespace so formatting differences map to the same fixture"""
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def aggregate_key(request):
+    """The same /aggregate request always serializes to the same fixture key"""
+    return json.dumps(request, sort_keys=True)
+
+
+def fixture_name(sql, kind='query'):
+    key = normalize_query(sql) if kind == 'query' else f"{kind} {normalize_query(sql)}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:24] + '.json'
+
+
+class FixtureRecorder:
+    """Writes each exchange and its response as one JSON file in a directory.
+
+    kind tells the exchanges apart: 'query' is one /query page, 'pages' every
+    page of a query walked by /batch, 'count' a SELECT COUNT(*) total and
+    'aggregate' an /aggregate request (keyed by aggregate_key).
+    """
+
+    def __init__(self, directory=RECORD_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, sql, response, kind='query'):
+        path = os.path.join(self.directory, fixture_name(sql, kind))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'kind': kind, 'query': normalize_query(sql), 'response': response}, f)
+        os.replace(tmp_path, path)
+
+
+def load_fixtures(directory):
+    """{(kind, normalized query): recorded response} for every fixture in a directory"""
+    fixtures = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name), 'r') as f:
+                fixture = json.load(f)
+            fixtures[fixture.get('kind', 'query'), normalize_query(fixture['query'])] = fixture['response']
+    return fixtures
@@ -0,0 +1,497 @@
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from categorize_expenses import DEFAULT_CATEGORY, CategorizationEngine
+from quickbooks_fixtures import aggregate_key, load_fixtures, normalize_query
+from synthetic_data import generate_purchases
+from transaction_store import normalize_timestamp
+from transactions import NO_VENDOR, parse_purchase
+
+# Same prefix as the Spring Boot controller
+BASE_PATH = '/api/v1/quickbooks'
+
+# QuickBooks returns 100 entities when MAXRESULTS is omitted and never more than 1000
+DEFAULT_PAGE_SIZE = 100
+PAGE_LIMIT = 1000
+
+# Responses at least this large are gzipped for clients that accept it, like server.compression
+COMPRESS_MIN_SIZE = 1024
+
+# /batch defaults, as in BatchQueryService
+BATCH_PARALLELISM = 4
+BATCH_MAX_QUERIES = 50
+
+QUERY_PATTERN = re.compile(
+    r"^SELECT \* FROM (?P<entity>\w+)"
+    r"(?: WHERE (?P<where>.+?))?"
+    r"(?: ORDER ?BY (?P<order>[\w.]+)(?: (?P<direction>ASC|DESC))?)?"
+    r"(?: STARTPOSITION (?P<start>\d+))?"
+    r"(?: MAXRESULTS (?P<max>\d+))?$",
+    re.I
+)
+PAGE_PATTERN = re.compile(r"^(?P<sql>.+) STARTPOSITION (?P<start>\d+) MAXRESULTS (?P<max>\d+)$", re.I)
+COUNT_PATTERN = re.compile(r"^SELECT COUNT\(\*\) FROM (?P<entity>\w+)(?: WHERE (?P<where>.+?))?$", re.I)
+CONDITION_PATTERN = re.compile(r"^([\w.]+)\s*(>=|<=|=|>|<)\s*'([^']*)'$")
+AND_PATTERN = re.compile(r'\s+AND\s+', re.I)
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Queryable fields: how to read them from an entity and how to parse a literal
+FIELDS = {
+    'txndate': (lambda item: (item.get('txnDate') or '')[:10], lambda value: value[:10]),
+    'metadata.lastupdatedtime': (lambda item: normalize_timestamp((item.get('metaData') or {}).get('lastUpdatedTime')) or '',
+                                 normalize_timestamp),
+    'id': (lambda item: int(item['id']), int),
+}
+OPERATORS = {
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '=': lambda a, b: a == b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+}
+
+# /aggregate group-by keys, as in PurchaseAggregationService
+GROUP_KEYS = {
+    'month': lambda item, txn, category: txn.date[:7],
+    'date': lambda item, txn, category: txn.date,
+    'vendor': lambda item, txn, category: txn.vendor or NO_VENDOR,
+    'category': lambda item, txn, category: category,
+    'paymentType': lambda item, txn, category: item.get('paymentType') or '',
+    'account': lambda item, txn, category: (item.get('accountRef') or {}).get('name') or '',
+}
+
+CENT = Decimal('0.01')
+
+
+class UnsupportedQuery(ValueError):
+    """The stand-in cannot answer this query"""
+
+
+def parse_fields(value):
+    """Field list from a list or comma-separated string; None means no projection"""
+    if not value:
+        return None
+    fields = [field.strip() for field in (value if isinstance(value, list) else str(value).split(','))]
+    return [field for field in fields if field] or None
+
+
+def project(entities, fields):
+    """Keep only the given (dotted) properties of each entity, as EntityProjection does"""
+    if not fields:
+        return entities
+    paths = [field.split('.') for field in fields]
+    projected = []
+    for entity in entities:
+        target = {}
+        for path in paths:
+            source, node = entity, target
+            for depth, name in enumerate(path):
+                value = source.get(name) if isinstance(source, dict) else None
+                if value is None:
+                    break
+                if depth == len(path) - 1:
+                    node[name] = value
+                elif isinstance(value, dict):
+                    node = node.setdefault(name, {})
+                    source = value
+                else:
+                    break
+        projected.append(target)
+    return projected
+
+
+def _money(value):
+    return float((value or Decimal(0)).quantize(CENT, ROUND_HALF_UP))
+
+
+def aggregate_purchases(items, request):
+    """Answer an /aggregate request over Purchase entities the way the server does"""
+    for field in ('startDate', 'endDate'):
+        if not DATE_PATTERN.match(str(request.get(field) or '')):
+            raise UnsupportedQuery(f"{field} must be a date in YYYY-MM-DD format")
+    group_by = list(request.get('groupBy') or [])
+    for key in group_by:
+        if key not in GROUP_KEYS:
+            raise UnsupportedQuery(f"Unsupported groupBy key: {key} (expected one of {list(GROUP_KEYS)})")
+    engine = None
+    if isinstance(request.get('categories'), dict):
+        engine = CategorizationEngine(request['categories'], request.get('defaultCategory') or DEFAULT_CATEGORY)
+    elif 'category' in group_by:
+        raise UnsupportedQuery('Grouping by category requires the categories rules')
+
+    excluded_vendors = set(request.get('excludedVendors') or [])
+    totals = {True: [Decimal(0), 0], False: [Decimal(0), 0]}
+    groups = {}
+    for item in items:
+        txn = parse_purchase(item)
+        amount = Decimal(str(item.get('totalAmt') or 0))
+        included = txn.vendor not in excluded_vendors
+        totals[included][0] += amount
+        totals[included][1] += 1
+        if not included or not group_by:
+            continue
+        category = engine.match(txn.description) if engine is not None else None
+        key = tuple(GROUP_KEYS[field](item, txn, category) for field in group_by)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = [Decimal(0), 0, amount, amount]
+        group[0] += amount
+        group[1] += 1
+        group[2] = min(group[2], amount)
+        group[3] = max(group[3], amount)
+
+    return {
+        'total': _money(totals[True][0]),
+        'count': totals[True][1],
+        'excludedTotal': _money(totals[False][0]),
+        'excludedCount': totals[False][1],
+        'groups': [{'key': dict(zip(group_by, key)), 'total': _money(total), 'count': count,
+                    'min': _money(low), 'max': _money(high)}
+                   for key, (total, count, low, high) in sorted(groups.items())],
+        'startDate': request['startDate'],
+        'endDate': request['endDate'],
+        'groupBy': group_by
+    }
+
+
+class SyntheticSource:
+    """Answers Purchase queries from an in-memory list of entities.
+
+    Filtered and ordered results are cached per query, so paging through
+    a result with STARTPOSITION only slices the cached list.
+    """
+
+    def __init__(self, items, page_limit=PAGE_LIMIT, default_page_size=DEFAULT_PAGE_SIZE, cache_size=32):
+        self.items = list(items)
+        self.page_limit = page_limit
+        self.default_page_size = default_page_size
+        self.cache_size = cache_size
+        self._columns = {}
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, items):
+        """Add entities, e.g. Purchases entered between two syncs"""
+        with self._lock:
+            self.items.extend(items)
+            self._columns = {}
+            self._results.clear()
+
+    def column(self, field):
+        """Values of a field for every entity, computed on first use"""
+        values = self._columns.get(field)
+        if values is None:
+            getter = FIELDS[field][0]
+            values = self._columns[field] = [getter(item) for item in self.items]
+        return values
+
+    def _select(self, where, order, direction):
+        positions = range(len(self.items))
+        for condition in AND_PATTERN.split(where) if where else []:
+            match = CONDITION_PATTERN.match(condition.strip())
+            if not match or match.group(1).lower() not in FIELDS:
+                raise UnsupportedQuery(f"Unsupported condition: {condition}")
+            field = match.group(1).lower()
+            value = FIELDS[field][1](match.group(3))
+            column, compare = self.column(field), OPERATORS[match.group(2)]
+            positions = [i for i in positions if compare(column[i], value)]
+        positions = list(positions)
+        if order:
+            field = order.lower()
+            if field not in FIELDS:
+                raise UnsupportedQuery(f"Unsupported ORDER BY field: {order}")
+            column = self.column(field)
+            positions.sort(key=column.__getitem__, reverse=(direction or '').upper() == 'DESC')
+        return positions
+
+    def query(self, sql):
+        match = QUERY_PATTERN.match(normalize_query(sql))
+        if not match:
+            raise UnsupportedQuery(f"Unsupported query: {sql}")
+        if match.group('entity').lower() != 'purchase':
+            return []
+
+        positions = self._positions(match.group('where'), match.group('order'), match.group('direction'))
+        start = int(match.group('start') or 1) - 1
+        size = min(int(match.group('max') or self.default_page_size), self.page_limit)
+        return [self.items[i] for i in positions[start:start + size]]
+
+    def count(self, sql):
+        """Answer a SELECT COUNT(*) query"""
+        match = COUNT_PATTERN.match(normalize_query(sql))
+        if not match:
+            raise UnsupportedQuery(f"Unsupported count query: {sql}")
+        if match.group('entity').lower() != 'purchase':
+            return 0
+        return len(self._positions(match.group('where'), None, None))
+
+    def _positions(self, where, order, direction):
+        """Matching entity positions, cached per filter and order"""
+        key = (where, order, direction)
+        with self._lock:
+            positions = self._results.get(key)
+            if positions is not None:
+                self._results.move_to_end(key)
+        if positions is None:
+            positions = self._select(*key)
+            with self._lock:
+                self._results[key] = positions
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return positions
+
+    def aggregate(self, request):
+        """Answer an /aggregate request from the entities in its date range"""
+        items = []  # aggregate_purchases rejects requests without valid dates
+        if all(DATE_PATTERN.match(str(request.get(field) or '')) for field in ('startDate', 'endDate')):
+            where = f"TxnDate >= '{request['startDate']}' AND TxnDate <= '{request['endDate']}'"
+            items = (self.items[i] for i in self._select(where, None, None))
+        return aggregate_purchases(items, request)
+
+
+class ReplaySource:
+    """Answers queries with recorded responses, optionally falling back to another source.
+
+    Pages of a query recorded as a whole /batch walk are sliced from it, so
+    a replayed walk can use any page size.
+    """
+
+    def __init__(self, directory, fallback=None):
+        self.fixtures = load_fixtures(directory)
+        self.fallback = fallback
+
+    def query(self, sql):
+        sql = normalize_query(sql)
+        response = self.fixtures.get(('query', sql))
+        if response is not None:
+            return response
+        match = PAGE_PATTERN.match(sql)
+        walk = self.fixtures.get(('pages', match.group('sql'))) if match else None
+        if walk is not None:
+            start = int(match.group('start')) - 1
+            return walk[start:start + int(match.group('max'))]
+        if self.fallback is not None:
+            return self.fallback.query(sql)
+        raise UnsupportedQuery(f"No recorded response for query: {sql}")
+
+    def count(self, sql):
+        count = self.fixtures.get(('count', normalize_query(sql)))
+        if count is not None:
+            return count
+        if self.fallback is not None:
+            return self.fallback.count(sql)
+        raise UnsupportedQuery(f"No recorded count for query: {normalize_query(sql)}")
+
+    def aggregate(self, request):
+        response = self.fixtures.get(('aggregate', normalize_query(aggregate_key(request))))
+        if response is not None:
+            return response
+        if self.fallback is not None:
+            return self.fallback.aggregate(request)
+        raise UnsupportedQuery('No recorded response for this /aggregate request')
+
+
+class StandInServer:
+    """Local stand-in for the /api/v1/quickbooks endpoints of the Spring Boot app"""
+
+    def __init__(self, source, host='127.0.0.1', port=8080, latency=0.0, jitter=0.0, verbose=False,
+                 batch_parallelism=BATCH_PARALLELISM):
+        self.source = source
+        self.batch_parallelism = batch_parallelism
+        self.latency = latency
+        self.jitter = jitter
+        self.verbose = verbose
+        self.requests = 0
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH}"
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def run_query(self, sql, paginate=False, fields=None, count=False):
+        """One query with the simulated QuickBooks latency, optionally following every page"""
+        if count:
+            self.delay()
+            return {'totalCount': self.source.count(sql)}
+        if not paginate:
+            self.delay()
+            return project(self.source.query(sql), fields)
+        # Pages may be capped below MAXRESULTS (--page-limit), so only an empty page ends the walk
+        entities = []
+        start_position = 1
+        while True:
+            self.delay()
+            page = self.source.query(f"{sql} STARTPOSITION {start_position} MAXRESULTS {PAGE_LIMIT}")
+            if not page:
+                return project(entities, fields)
+            entities.extend(page)
+            start_position += len(page)
+
+    def batch(self, request):
+        """Answer a /batch request the way BatchQueryService does"""
+        queries = request.get('queries')
+        if not isinstance(queries, list) or not queries:
+            raise UnsupportedQuery('queries must be a non-empty list')
+        if len(queries) > BATCH_MAX_QUERIES:
+            raise UnsupportedQuery(f"A batch may hold at most {BATCH_MAX_QUERIES} queries, got {len(queries)}")
+        fields = parse_fields(request.get('fields'))
+        items = []
+        for index, entry in enumerate(queries):
+            if isinstance(entry, dict):
+                items.append((str(entry.get('id', index)), entry['query'], bool(entry.get('paginate', request.get('paginate'))),
+                              parse_fields(entry['fields']) if 'fields' in entry else fields, bool(entry.get('count'))))
+            else:
+                items.append((str(index), str(entry), bool(request.get('paginate')), fields, False))
+        if len({item[0] for item in items}) != len(items):
+            raise UnsupportedQuery('Duplicate batch id')
+
+        started = time.perf_counter()
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.batch_parallelism) as executor:
+            futures = [(key, executor.submit(self.run_query, sql, paginate, item_fields, count))
+                       for key, sql, paginate, item_fields, count in items]
+            for key, future in futures:
+                try:
+                    results[key] = future.result()
+                except (ValueError, KeyError, TypeError) as e:
+                    errors[key] = f"Failed to execute query: {e}"
+        return {'results': results, 'errors': errors, 'elapsedMs': int((time.perf_counter() - started) * 1000)}
+
+    def start(self):
+        """Serve from a background thread; returns the API base URL"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _handler_for(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            if len(body) >= COMPRESS_MIN_SIZE and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                body = gzip.compress(body, compresslevel=6)
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _token_status(self):
+            now = datetime.now()
+            return {
+                'isExpired': False,
+                'expiryTime': (now + timedelta(hours=1)).isoformat(),
+                'currentTime': now.isoformat(),
+                'minutesUntilExpiry': 60,
+                'status': 'Active'
+            }
+
+        def do_GET(self):
+            if self.path == f"{BASE_PATH}/token/status":
+                self._send_json(200, self._token_status())
+            else:
+                self._send_json(404, {'error': f"Not found: {self.path}"})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            if self.path == f"{BASE_PATH}/token/refresh":
+                status = self._token_status()
+                self._send_json(200, {'message': 'Token refresh completed successfully',
+                                      'newExpiryTime': status['expiryTime'], 'currentTime': status['currentTime']})
+                return
+            if self.path == f"{BASE_PATH}/batch":
+                server.requests += 1
+                try:
+                    self._send_json(200, server.batch(json.loads(body)))
+                except (ValueError, KeyError, TypeError) as e:
+                    self._send_json(400, {'error': f"Failed to execute batch: {e}"})
+                return
+            if self.path == f"{BASE_PATH}/aggregate":
+                server.requests += 1
+                server.delay()
+                try:
+                    self._send_json(200, server.source.aggregate(json.loads(body)))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    self._send_json(400, {'error': f"Failed to aggregate purchases: {e}"})
+                return
+            if self.path != f"{BASE_PATH}/query":
+                self._send_json(404, {'error': f"Not found: {self.path}"})
+                return
+
+            server.requests += 1
+            try:
+                request = json.loads(body)
+                self._send_json(200, server.run_query(request['query'], fields=parse_fields(request.get('fields'))))
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {'error': f"Failed to execute query: {e}"})
+
+        def log_message(self, format, *args):
+            if server.verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded or synthetic QuickBooks query responses locally")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--replay', metavar='DIR', help='Fixture directory recorded with QUICKBOOKS_RECORD_DIR')
+    parser.add_argument('--synthetic', type=int, metavar='COUNT', default=None,
+                        help='Serve COUNT synthetic Purchases (default 3000 when not replaying)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every query')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many extra random seconds per query')
+    parser.add_argument('--page-limit', type=int, default=PAGE_LIMIT, help='Largest page a query may return (set QUICKBOOKS_PAGE_LIMIT to match for clients)')
+    parser.add_argument('--default-page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help='Page size when a query has no MAXRESULTS')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    synthetic = None
+    if args.synthetic is not None or not args.replay:
+        synthetic = SyntheticSource(generate_purchases(args.synthetic or 3000, seed=args.seed),
+                                    args.page_limit, args.default_page_size)
+    source = ReplaySource(args.replay, fallback=synthetic) if args.replay else synthetic
+
+    server = StandInServer(source, args.host, args.port, args.latency, args.jitter, args.verbose)
+    print(f"QuickBooks stand-in serving {'fixtures from ' + args.replay if args.replay else 'synthetic data'} at {server.url}")
+    print(f"Set QUICKBOOKS_API_URL={server.url} to point the tools at it")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
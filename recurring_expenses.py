@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+from datetime import date
+
+from quickbooks_client import QuickBooksQueryError
+from transaction_store import TransactionStore
+from transactions import parse_purchases
+from vendor_normalization import get_normalizer
+
+# Where detector state is persisted so later runs only feed new transactions
+STATE_PATH = os.environ.get('RECURRING_STATE_PATH', '.recurring_state.json')
+
+STATE_VERSION = 1
+
+# (name, period in days, tolerance in days) an interval must fall within
+CADENCES = [
+    ('weekly', 7, 2),
+    ('biweekly', 14, 3),
+    ('monthly', 30.44, 4),
+    ('quarterly', 91.31, 10),
+    ('annual', 365.25, 20),
+]
+
+# Share of a group's intervals that must agree on one cadence
+MIN_CADENCE_SHARE = 0.6
+
+# A charge differing from the expected amount by more than this share is a change
+AMOUNT_TOLERANCE = 0.10
+
+excluded_vendors = ["Stockton Walbeck", "Dakota Walbeck", "Parker Walbeck", "Canyon Smith"]
+
+
+def classify_interval(days):
+    """Index into CADENCES of the cadence an interval fits, or None"""
+    for index, (_, period, tolerance) in enumerate(CADENCES):
+        if abs(days - period) <= tolerance:
+            return index
+    return None
+
+
+class VendorStats:
+    """Constant-size running statistics for one vendor's charges.
+
+    Amounts and intervals between charge dates are tracked with Welford's
+    running mean/variance and a per-cadence interval histogram, so the cost
+    per vendor does not grow with the length of the history.
+    """
+
+    __slots__ = ('count', 'total', 'amount_mean', 'amount_m2', 'first_day', 'last_day',
+                 'last_amount', 'amount_changed', 'intervals', 'interval_mean', 'cadence_hits')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.amount_mean = 0.0
+        self.amount_m2 = 0.0
+        self.first_day = None
+        self.last_day = None
+        self.last_amount = None
+        self.amount_changed = False
+        self.intervals = 0
+        self.interval_mean = 0.0
+        self.cadence_hits = [0] * len(CADENCES)
+
+    def add(self, day, amount):
+        """Record one charge; day is a date ordinal no earlier than the last one"""
+        if self.count:
+            expected = self.amount_mean
+            self.amount_changed = abs(amount - expected) > AMOUNT_TOLERANCE * abs(expected)
+            interval = day - self.last_day
+            if interval > 0:
+                # Same-day charges are split payments, not a new period
+                self.intervals += 1
+                self.interval_mean += (interval - self.interval_mean) / self.intervals
+                cadence = classify_interval(interval)
+                if cadence is not None:
+                    self.cadence_hits[cadence] += 1
+        else:
+            self.first_day = day
+
+        self.count += 1
+        self.total += amount
+        delta = amount - self.amount_mean
+        self.amount_mean += delta / self.count
+        self.amount_m2 += delta * (amount - self.amount_mean)
+        self.last_day = day
+        self.last_amount = amount
+
+    def amount_stddev(self):
+        return (self.amount_m2 / self.count) ** 0.5 if self.count else 0.0
+
+    def cadence(self):
+        """(name, period, tolerance) of the dominant cadence, or None if the charges are irregular"""
+        if not self.intervals:
+            return None
+        best = max(range(len(CADENCES)), key=self.cadence_hits.__getitem__)
+        hits = self.cadence_hits[best]
+        name = CADENCES[best][0]
+        # An annual charge repeats rarely, so one matching interval is enough
+        needed = 1 if name == 'annual' else 2
+        if hits < needed or hits / self.intervals < MIN_CADENCE_SHARE:
+            return None
+        return CADENCES[best]
+
+    def to_list(self):
+        return [self.count, self.total, self.amount_mean, self.amount_m2, self.first_day, self.last_day,
+                self.last_amount, self.amount_changed, self.intervals, self.interval_mean, self.cadence_hits]
+
+    @classmethod
+    def from_list(cls, values):
+        stats = cls()
+        (stats.count, stats.total, stats.amount_mean, stats.amount_m2, stats.first_day, stats.last_day,
+         stats.last_amount, stats.amount_changed, stats.intervals, stats.interval_mean, cadence_hits) = values
+        stats.cadence_hits = list(cadence_hits) + [0] * (len(CADENCES) - len(cadence_hits))
+        return stats
+
+
+class RecurringDetector:
+    """Single-pass recurring-charge detector over normalized vendor keys.
+
+    Feed transactions in date order. Only the per-vendor statistics and a
+    date watermark are kept, so the state can be saved and later runs only
+    need the transactions after the watermark. Transactions without an id
+    cannot be recognized again, so they are never skipped as already seen.
+    """
+
+    def __init__(self):
+        self.vendors = {}
+        self.watermark = None        # ordinal of the latest date fed
+        self.watermark_ids = set()   # ids already fed on the watermark date
+        self.store_watermark = None  # store LastUpdatedTime covered by the last run
+        self._vendor_keys = {}
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        """Load saved state, starting empty if missing, unreadable or outdated"""
+        detector = cls()
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return detector
+        if saved.get('version') == STATE_VERSION and saved.get('cadences') == [c[0] for c in CADENCES]:
+            detector.vendors = {vendor: VendorStats.from_list(values) for vendor, values in saved['vendors'].items()}
+            detector.watermark = saved.get('watermark')
+            detector.watermark_ids = set(saved.get('watermark_ids', []))
+            detector.store_watermark = saved.get('store_watermark')
+        return detector
+
+    def save(self, path=STATE_PATH):
+        """Write the state atomically"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': STATE_VERSION,
+                'cadences': [c[0] for c in CADENCES],
+                'watermark': self.watermark,
+                'watermark_ids': list(self.watermark_ids),
+                'store_watermark': self.store_watermark,
+                'vendors': {vendor: stats.to_list() for vendor, stats in self.vendors.items()}
+            }, f)
+        os.replace(tmp_path, path)
+
+    def vendor_key(self, txn):
+        """Normalized vendor name, computed once per distinct description/vendor pair"""
+        if txn.normalized_vendor:
+            return txn.normalized_vendor
+        pair = (txn.description, txn.vendor)
+        key = self._vendor_keys.get(pair)
+        if key is None:
+            key = self._vendor_keys[pair] = get_normalizer().normalize(txn.description, txn.vendor or None)
+        return key
+
+    def add(self, txn):
+        """Feed one Transaction; returns False if it was skipped as already seen or out of order"""
+        if txn.date == 'N/A':
+            return False
+        day = date.fromisoformat(txn.date).toordinal()
+        if self.watermark is not None:
+            if day < self.watermark or (day == self.watermark and txn.id and txn.id in self.watermark_ids):
+                return False
+        if day != self.watermark:
+            self.watermark = day
+            self.watermark_ids = set()
+        if txn.id:
+            self.watermark_ids.add(txn.id)
+
+        key = self.vendor_key(txn)
+        stats = self.vendors.get(key)
+        if stats is None:
+            stats = self.vendors[key] = VendorStats()
+        stats.add(day, txn.amount)
+        return True
+
+    def extend(self, transactions):
+        added = 0
+        for txn in transactions:
+            added += self.add(txn)
+        return added
+
+    def recurring(self, as_of=None):
+        """Recurring vendors, largest total first, with cadence, expected amount and flags"""
+        as_of = as_of.toordinal() if as_of is not None else self.watermark
+        results = []
+        for vendor, stats in self.vendors.items():
+            cadence = stats.cadence()
+            if cadence is None:
+                continue
+            name, period, tolerance = cadence
+            results.append({
+                'vendor': vendor,
+                'cadence': name,
+                'count': stats.count,
+                'total': stats.total,
+                'expected_amount': stats.amount_mean,
+                'amount_stddev': stats.amount_stddev(),
+                'average_interval': stats.interval_mean,
+                'last_amount': stats.last_amount,
+                'first_date': date.fromordinal(stats.first_day).isoformat(),
+                'last_date': date.fromordinal(stats.last_day).isoformat(),
+                'next_expected': date.fromordinal(stats.last_day + round(period)).isoformat(),
+                # Periods that have fully elapsed (plus tolerance) since the last charge
+                'missed': max(0, int((as_of - stats.last_day - tolerance) // period)),
+                'amount_changed': stats.amount_changed,
+            })
+        results.sort(key=lambda r: r['total'], reverse=True)
+        return results
+
+
+def detect_recurring(transactions, as_of=None):
+    """Recurring charges in date-ordered transactions (one pass, no saved state)"""
+    detector = RecurringDetector()
+    detector.extend(transactions)
+    return detector.recurring(as_of)
+
+
+def main(store, state_path=STATE_PATH, start='2000-01-01', rebuild=False, as_of=None, limit=20):
+    detector = RecurringDetector() if rebuild else RecurringDetector.load(state_path)
+
+    try:
+        synced = store.sync()
+        print(f"Synced {synced} changed transactions into {store.path}")
+    except QuickBooksQueryError as e:
+        print(f"  ✗ Sync failed, using stored data: {e}")
+
+    # The detector only moves forward in time, so backdated or edited charges need a full re-read
+    if detector.watermark is not None:
+        watermark_date = date.fromordinal(detector.watermark).isoformat()
+        changed = store.count_changed(watermark_date, detector.store_watermark) if detector.store_watermark else 0
+        if changed:
+            print(f"  ⚠️  {changed} transactions dated before {watermark_date} changed since the last run; "
+                  f"rebuilding from the stored history")
+            detector = RecurringDetector()
+        else:
+            start = max(start, watermark_date)
+
+    end = (as_of or date.today()).isoformat()
+    transactions = (txn for txn in parse_purchases(store.iter_month_data(start, end))
+                    if txn.vendor not in excluded_vendors)
+    added = detector.extend(transactions)
+    detector.store_watermark = store.watermark()
+    detector.save(state_path)
+    print(f"Fed {added} new transactions since {start}; tracking {len(detector.vendors)} vendors")
+
+    recurring = detector.recurring(as_of)
+    print(f"\n🔄 RECURRING CHARGES ({len(recurring)} found)")
+    print("=" * 100)
+    for r in recurring[:limit]:
+        flags = []
+        if r['missed']:
+            flags.append(f"MISSED {r['missed']}")
+        if r['amount_changed']:
+            flags.append(f"CHANGED ${r['expected_amount']:,.2f} → ${r['last_amount']:,.2f}")
+        print(f"• {r['vendor'][:35]:<35} {r['cadence']:<9} ~${r['expected_amount']:>9,.2f} "
+              f"x{r['count']:<4} last {r['last_date']} next {r['next_expected']}"
+              f"{'  ⚠️  ' + ', '.join(flags) if flags else ''}")
+    return recurring
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detect recurring charges across the stored transaction history")
+    parser.add_argument('--rebuild', action='store_true', help='Ignore saved state and re-read the whole history')
+    parser.add_argument('--state', default=STATE_PATH, help='Detector state path')
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None,
+                        help='Date to check for missed charges (default: latest transaction)')
+    parser.add_argument('--limit', type=int, default=20, help='Number of recurring vendors to show')
+    args = parser.parse_args()
+
+    with TransactionStore() as store:
+        main(store, args.state, rebuild=args.rebuild, as_of=args.as_of, limit=args.limit)
@@ -0,0 +1,292 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import date
+
+from transactions import Transaction
+
+try:
+    import numpy as np
+    from transaction_table import StringPool, TransactionTable
+except ImportError:  # NumPy is optional; records are still available without it
+    np = None
+
+# Default root of the report archive
+ARCHIVE_DIR = '2025-expenses'
+
+# Output files are written through a buffer of this many bytes
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Columnar file layout (little-endian, every section 8-byte aligned):
+#   header: magic, version, rows, vendor count, description count
+#   amount_cents int64[rows], days int32[rows] (since 1970-01-01, MISSING_DAY for N/A),
+#   vendor_codes int32[rows], description_codes int32[rows],
+#   then the id, vendor and description string tables, each as
+#   uint32 offsets[count + 1] followed by the UTF-8 bytes
+COLUMNAR_MAGIC = b'QBCOL\x00\x00\x00'
+COLUMNAR_VERSION = 1
+COLUMNAR_SUFFIX = '_transactions.qbcol'
+JSONL_SUFFIX = '_transactions.jsonl'
+HEADER = struct.Struct('<8sIIII')
+MISSING_DAY = -2 ** 31
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def open_buffered(path, binary=False):
+    """Open an output file with a large write buffer"""
+    if binary:
+        return open(path, 'wb', buffering=WRITE_BUFFER_SIZE)
+    return open(path, 'w', buffering=WRITE_BUFFER_SIZE)
+
+
+def _padding(length):
+    return b'\x00' * (-length % 8)
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _string_table(strings):
+    offsets = array('I', [0])
+    blobs = []
+    for value in strings:
+        blob = ('' if value is None else str(value)).encode('utf-8')
+        blobs.append(blob)
+        offsets.append(offsets[-1] + len(blob))
+    data = _little_endian(offsets) + b''.join(blobs)
+    return data + _padding(len(data))
+
+
+def _day_of(value):
+    if not value or value == 'N/A':
+        return MISSING_DAY
+    return date.fromisoformat(value).toordinal() - EPOCH_ORDINAL
+
+
+def write_jsonl(path, transactions):
+    """Write transactions as JSON Lines"""
+    with open_buffered(path) as f:
+        f.writelines(json.dumps({
+            'id': txn.id,
+            'date': txn.date,
+            'amount': txn.amount,
+            'description': txn.description,
+            'vendor': txn.vendor
+        }) + "\n" for txn in transactions)
+
+
+def iter_jsonl(path):
+    """Yield the Transaction records of a JSON Lines file"""
+    with open(path, 'r') as f:
+        for line in f:
+            item = json.loads(line)
+            yield Transaction(item['id'], item['date'], item['amount'], sys.intern(item['description']),
+                              sys.intern(item['vendor']))
+
+
+def write_columnar(path, transactions):
+    """Write transactions in the columnar binary format"""
+    vendors, vendor_codes = {}, array('i')
+    descriptions, description_codes = {}, array('i')
+    amounts, days, ids = array('q'), array('i'), []
+    for txn in transactions:
+        ids.append(txn.id)
+        amounts.append(round(txn.amount * 100))
+        days.append(_day_of(txn.date))
+        vendor_codes.append(vendors.setdefault(txn.vendor, len(vendors)))
+        description_codes.append(descriptions.setdefault(txn.description, len(descriptions)))
+
+    with open_buffered(path, binary=True) as f:
+        f.write(HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, len(amounts), len(vendors), len(descriptions)))
+        f.write(_padding(HEADER.size))
+        for column in (amounts, days, vendor_codes, description_codes):
+            data = _little_endian(column)
+            f.write(data + _padding(len(data)))
+        for strings in (ids, list(vendors), list(descriptions)):
+            f.write(_string_table(strings))
+
+
+class _StringTable:
+    """Lazily decoded strings of a columnar file"""
+
+    def __init__(self, buffer, offset, count):
+        self.count = count
+        self.offsets = _column(buffer, offset, 'I', count + 1)
+        self.start = offset + 4 * (count + 1)
+        self.buffer = buffer
+        self.end = self.start + self.offsets[count]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return str(self.buffer[self.start + self.offsets[index]:self.start + self.offsets[index + 1]], 'utf-8')
+
+    def values(self):
+        return [sys.intern(self[i]) for i in range(self.count)]
+
+
+def _column(buffer, offset, typecode, count):
+    """Zero-copy typed view of a column (copied and swapped on big-endian hosts)"""
+    size = array(typecode).itemsize * count
+    view = buffer[offset:offset + size]
+    if sys.byteorder == 'little':
+        return view.cast(typecode)
+    values = array(typecode, view)
+    values.byteswap()
+    return values
+
+
+def _aligned(offset):
+    return offset + (-offset % 8)
+
+
+class ColumnarMonth:
+    """A memory-mapped columnar file with random access to its rows.
+
+    Columns are views into the mapping, so opening a month costs a header
+    read and any single row can be fetched without touching the others.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, version, rows, vendor_count, description_count = HEADER.unpack_from(buffer)
+        if magic != COLUMNAR_MAGIC or version != COLUMNAR_VERSION:
+            buffer.release()
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {COLUMNAR_VERSION} columnar report")
+
+        self.rows = rows
+        offset = _aligned(HEADER.size)
+        self.amount_cents = _column(buffer, offset, 'q', rows)
+        offset = _aligned(offset + 8 * rows)
+        self.days = _column(buffer, offset, 'i', rows)
+        offset = _aligned(offset + 4 * rows)
+        self.vendor_codes = _column(buffer, offset, 'i', rows)
+        offset = _aligned(offset + 4 * rows)
+        self.description_codes = _column(buffer, offset, 'i', rows)
+        offset = _aligned(offset + 4 * rows)
+        self.ids = _StringTable(buffer, offset, rows)
+        self.vendors = _StringTable(buffer, _aligned(self.ids.end), vendor_count)
+        self.descriptions = _StringTable(buffer, _aligned(self.vendors.end), description_count)
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for column in (self.amount_cents, self.days, self.vendor_codes, self.description_codes,
+                       self.ids.offsets, self.vendors.offsets, self.descriptions.offsets):
+            if isinstance(column, memoryview):
+                column.release()
+        self.ids.buffer.release()
+        self._mmap.close()
+
+    def date(self, index):
+        day = self.days[index]
+        return 'N/A' if day == MISSING_DAY else date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+    def transaction(self, index):
+        """Transaction record for one row"""
+        return Transaction(
+            self.ids[index] or None,
+            self.date(index),
+            self.amount_cents[index] / 100,
+            self.descriptions[self.description_codes[index]],
+            self.vendors[self.vendor_codes[index]]
+        )
+
+    def __iter__(self):
+        for index in range(self.rows):
+            yield self.transaction(index)
+
+    def total(self):
+        return sum(self.amount_cents) / 100
+
+    def to_table(self):
+        """TransactionTable over copies of the columns (requires NumPy)"""
+        if np is None:
+            raise RuntimeError("NumPy is required for TransactionTable")
+        days = np.asarray(self.days, dtype=np.int64)
+        dates = days.astype('datetime64[D]')
+        dates[days == MISSING_DAY] = np.datetime64('NaT')
+        return TransactionTable(
+            np.array(self.amount_cents, dtype=np.int64),
+            dates,
+            np.array(self.vendor_codes, dtype=np.int32),
+            np.array(self.description_codes, dtype=np.int32),
+            _pool(self.vendors.values()),
+            _pool(self.descriptions.values()),
+            ids=np.array([self.ids[i] or None for i in range(self.rows)], dtype=object)
+        )
+
+
+def _pool(values):
+    pool = StringPool()
+    for value in values:
+        pool.code(value)
+    return pool
+
+
+class ReportArchive:
+    """Reads the machine-readable month files of the report archive"""
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+
+    def month_path(self, month_name, suffix=COLUMNAR_SUFFIX):
+        return os.path.join(self.root, month_name, f"{month_name.lower()}{suffix}")
+
+    def months(self):
+        """Month names with a columnar file, in calendar order"""
+        found = [name for name in os.listdir(self.root) if os.path.exists(self.month_path(name))]
+        return sorted(found, key=_month_key)
+
+    def open_month(self, month_name):
+        """Memory-mapped columnar file for one month"""
+        return ColumnarMonth(self.month_path(month_name))
+
+    def iter_month(self, month_name):
+        """Transaction records for one month, from the columnar file or else the JSONL file"""
+        path = self.month_path(month_name)
+        if os.path.exists(path):
+            with self.open_month(month_name) as month:
+                yield from month
+        else:
+            yield from iter_jsonl(self.month_path(month_name, JSONL_SUFFIX))
+
+    def load_table(self, month_names=None):
+        """One TransactionTable across months (all archived months by default)"""
+        tables = []
+        for name in month_names or self.months():
+            with self.open_month(name) as month:
+                tables.append(month.to_table())
+        return TransactionTable.concat(tables)
+
+
+_MONTH_ORDER = {name: index for index, name in enumerate([
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+])}
+
+
+def _month_key(name):
+    """Calendar order for 'March' and, in multi-year archives, 'March 2025'"""
+    month, _, year = name.rpartition(' ')
+    if month and year.isdigit():
+        return int(year), _MONTH_ORDER.get(month, len(_MONTH_ORDER))
+    return 0, _MONTH_ORDER.get(name, len(_MONTH_ORDER))
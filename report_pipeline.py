@@ -0,0 +1,536 @@
+import argparse
+import hashlib
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from functools import partial
+from operator import attrgetter, itemgetter
+
+from categorize_expenses import categorize_many, rules_fingerprint
+from month_snapshots import MonthSnapshots
+from period_planner import fetch_periods, month_periods, period_label
+import pipeline_metrics
+from pipeline_metrics import NULL_METRICS, RUN
+import quickbooks_client
+from quickbooks_client import QuickBooksQueryError
+from report_archive import COLUMNAR_SUFFIX, JSONL_SUFFIX, open_buffered, write_columnar, write_jsonl
+from transaction_store import TransactionStore
+from transactions import PURCHASE_FIELDS, parse_purchases
+
+try:
+    from transaction_table import TransactionTable, month_summary
+except ImportError:  # NumPy is optional; the dict-based path below works without it
+    TransactionTable = None
+
+# Reporting period (see configure_period)
+PERIOD_START = '2025-01-01'
+PERIOD_END = '2025-12-31'
+PERIOD_LABEL = period_label(PERIOD_START, PERIOD_END)
+
+# Where every sink writes its files
+REPORT_DIR = f"{PERIOD_LABEL}-expenses"
+
+# Month configurations
+months = month_periods(PERIOD_START, PERIOD_END)
+
+# People to exclude
+excluded_vendors = [
+    "Stockton Walbeck",
+    "Dakota Walbeck",
+    "Parker Walbeck",
+    "Canyon Smith"
+]
+
+def configure_period(start, end):
+    """Report on start..end instead of 2025: rebuilds the months, labels and REPORT_DIR"""
+    global PERIOD_START, PERIOD_END, PERIOD_LABEL, REPORT_DIR, months
+    PERIOD_START, PERIOD_END = str(start), str(end)
+    PERIOD_LABEL = period_label(start, end)
+    REPORT_DIR = f"{PERIOD_LABEL}-expenses"
+    months = month_periods(start, end)
+
+def add_period_arguments(parser):
+    """--start/--end flags for the report scripts"""
+    parser.add_argument('--start', default=PERIOD_START, help='First TxnDate of the reporting period (YYYY-MM-DD)')
+    parser.add_argument('--end', default=PERIOD_END, help='Last TxnDate of the reporting period (YYYY-MM-DD)')
+
+def get_month_data(start_date, end_date):
+    """Stream all month transactions page by page, newest first"""
+    return quickbooks_client.iter_month_data(start_date, end_date, order_by='TxnDate DESC', fields=PURCHASE_FIELDS)
+
+def process_month_data(data, month_name, metrics=NULL_METRICS):
+    """Process and filter month data (raw Purchase entities or a TransactionTable)"""
+    if TransactionTable is not None and isinstance(data, TransactionTable):
+        with metrics.stage(month_name, 'filter'):
+            return month_summary(data, excluded_vendors)
+
+    total = 0
+    count = 0
+    transactions = []
+    excluded_total = 0
+    excluded_count = 0
+
+    # Streamed pages are parsed as they arrive, so this also covers waiting on the next page
+    with metrics.stage(month_name, 'filter'):
+        for txn in parse_purchases(data):
+            # Check if this vendor should be excluded
+            if txn.vendor in excluded_vendors:
+                excluded_total += txn.amount
+                excluded_count += 1
+                continue
+
+            # Include this transaction
+            total += txn.amount
+            count += 1
+            transactions.append(txn)
+    metrics.record(month_name, 'filter', rows=count + excluded_count)
+
+    # Sort transactions by amount (highest to lowest)
+    with metrics.stage(month_name, 'sort'):
+        transactions.sort(key=attrgetter('amount'), reverse=True)
+
+    return {
+        'transactions': transactions,
+        'total': total,
+        'count': count,
+        'excluded_total': excluded_total,
+        'excluded_count': excluded_count
+    }
+
+def category_totals(transactions):
+    """{category: total} for the included transactions, largest first"""
+    totals = defaultdict(float)
+    for txn, category in zip(transactions, categorize_many([txn.description for txn in transactions])):
+        totals[category] += txn.amount
+    return dict(sorted(totals.items(), key=itemgetter(1), reverse=True))
+
+def annual_categories(summary_data):
+    """{category: total} summed over all months, largest first"""
+    totals = defaultdict(float)
+    for summary in summary_data:
+        for category, total in summary['categories'].items():
+            totals[category] += total
+    return dict(sorted(totals.items(), key=itemgetter(1), reverse=True))
+
+def annual_totals(summary_data):
+    """(total, count, excluded_total, excluded_count) over all months"""
+    return (
+        sum(summary['total'] for summary in summary_data),
+        sum(summary['count'] for summary in summary_data),
+        sum(summary['excluded_total'] for summary in summary_data),
+        sum(summary['excluded_count'] for summary in summary_data)
+    )
+
+
+# Output sinks. Each month is fetched and processed once, then handed to
+# every sink's write_month; finish runs once with the summaries in calendar
+# order. Both return the path written, or None. month_files lists what
+# write_month would produce, so unchanged months can be skipped; name labels
+# the sink in pipeline metrics.
+
+class MonthReportSink:
+    """Text report per month, one transaction per line sorted by amount"""
+
+    def __init__(self, suffix, heading):
+        self.suffix = suffix
+        self.heading = heading
+        self.name = f"{suffix}_text"
+
+    def month_files(self, month):
+        return [f"{REPORT_DIR}/{month['name']}/{month['name'].lower()}_bank_transactions_{self.suffix}.txt"]
+
+    def write_month(self, month, month_data):
+        filename = self.month_files(month)[0]
+
+        with open_buffered(filename) as f:
+            f.write(f"{month['label'].upper()} BANK TRANSACTIONS - {self.heading}\n")
+            f.write("=" * 100 + "\n")
+            f.write(f"Excluded vendors: {', '.join(excluded_vendors)}\n")
+            f.write(f"Excluded amount: ${month_data['excluded_total']:,.2f} ({month_data['excluded_count']} transactions)\n")
+            f.write("=" * 100 + "\n\n")
+
+            if month_data['transactions']:
+                separator = "     " + "-" * 120 + "\n"
+                f.writelines(f"{i:3d}. ${txn.amount:>9,.2f} | {txn.date} | {txn.display_description(200)}\n{separator}"
+                             for i, txn in enumerate(month_data['transactions'], 1))
+            else:
+                f.write("No transactions found for this month.\n")
+
+        return filename
+
+    def finish(self, summary_data):
+        return None
+
+
+class AnnualSummarySink:
+    """Text annual summary of the monthly totals"""
+
+    def __init__(self, filename, title, width=50, notes=()):
+        self.name = filename
+        self.filename = filename
+        self.title = title
+        self.width = width
+        self.notes = notes
+
+    def month_files(self, month):
+        return []
+
+    def write_month(self, month, month_data):
+        return None
+
+    def finish(self, summary_data):
+        annual_total, annual_count, annual_excluded_total, annual_excluded_count = annual_totals(summary_data)
+        path = f"{REPORT_DIR}/{self.filename}"
+
+        with open(path, 'w') as f:
+            f.write(f"{self.title}\n")
+            f.write("=" * self.width + "\n\n")
+            f.write(f"Excluded vendors: {', '.join(excluded_vendors)}\n\n")
+            if self.notes:
+                f.write("\n".join(self.notes) + "\n\n")
+
+            for summary in summary_data:
+                f.write(f"{summary['month']:<12}: ${summary['total']:>10,.2f} ({summary['count']:>3d} transactions)\n")
+                if summary['excluded_total'] > 0:
+                    f.write(f"{'  Excluded':<12}: ${summary['excluded_total']:>10,.2f} ({summary['excluded_count']:>3d} transactions)\n")
+
+            f.write("=" * self.width + "\n")
+            f.write(f"{'TOTAL':<12}: ${annual_total:>10,.2f} ({annual_count:>3d} transactions)\n")
+            f.write(f"{'EXCLUDED':<12}: ${annual_excluded_total:>10,.2f} ({annual_excluded_count:>3d} transactions)\n")
+            f.write(f"{'GRAND TOTAL':<12}: ${annual_total + annual_excluded_total:>10,.2f} ({annual_count + annual_excluded_count:>3d} transactions)\n")
+
+        return path
+
+
+class TransactionsJsonlSink:
+    """Included transactions per month as JSON Lines, in report order"""
+
+    name = 'jsonl'
+
+    def month_files(self, month):
+        return [f"{REPORT_DIR}/{month['name']}/{month['name'].lower()}{JSONL_SUFFIX}"]
+
+    def write_month(self, month, month_data):
+        filename = self.month_files(month)[0]
+        write_jsonl(filename, month_data['transactions'])
+        return filename
+
+    def finish(self, summary_data):
+        return None
+
+
+class ColumnarSink:
+    """Included transactions per month in the memory-mappable columnar format (see report_archive)"""
+
+    name = 'columnar'
+
+    def month_files(self, month):
+        return [f"{REPORT_DIR}/{month['name']}/{month['name'].lower()}{COLUMNAR_SUFFIX}"]
+
+    def write_month(self, month, month_data):
+        filename = self.month_files(month)[0]
+        write_columnar(filename, month_data['transactions'])
+        return filename
+
+    def finish(self, summary_data):
+        return None
+
+
+class SummaryJsonSink:
+    """Annual summary as JSON for other tools to consume"""
+
+    def __init__(self, filename='annual_summary.json'):
+        self.name = filename
+        self.filename = filename
+
+    def month_files(self, month):
+        return []
+
+    def write_month(self, month, month_data):
+        return None
+
+    def finish(self, summary_data):
+        annual_total, annual_count, annual_excluded_total, annual_excluded_count = annual_totals(summary_data)
+        path = f"{REPORT_DIR}/{self.filename}"
+
+        with open(path, 'w') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'excluded_vendors': excluded_vendors,
+                'months': [{
+                    'month': summary['month'],
+                    'total': round(summary['total'], 2),
+                    'count': summary['count'],
+                    'excluded_total': round(summary['excluded_total'], 2),
+                    'excluded_count': summary['excluded_count'],
+                    'categories': {category: round(total, 2) for category, total in summary['categories'].items()}
+                } for summary in summary_data],
+                'total': round(annual_total, 2),
+                'count': annual_count,
+                'excluded_total': round(annual_excluded_total, 2),
+                'excluded_count': annual_excluded_count,
+                'categories': {category: round(total, 2) for category, total in annual_categories(summary_data).items()}
+            }, f, indent=2)
+
+        return path
+
+
+def sorted_sinks():
+    """The *_sorted.txt reports and annual_summary.txt"""
+    return [
+        MonthReportSink('sorted', 'FILTERED & SORTED BY AMOUNT'),
+        AnnualSummarySink('annual_summary.txt', f"{PERIOD_LABEL} ANNUAL EXPENSE SUMMARY")
+    ]
+
+def complete_sinks():
+    """The *_complete.txt reports and annual_summary_complete.txt"""
+    return [
+        MonthReportSink('complete', 'COMPLETE LIST (FILTERED & SORTED)'),
+        AnnualSummarySink('annual_summary_complete.txt', f"{PERIOD_LABEL} ANNUAL EXPENSE SUMMARY - COMPLETE DATA", width=60, notes=(
+            "Previous reports were limited to ~100 transactions per month.",
+            "These reports include ALL transactions by paging with STARTPOSITION."
+        ))
+    ]
+
+def json_sinks():
+    """Machine-readable per-month transactions and annual summary"""
+    return [TransactionsJsonlSink(), SummaryJsonSink()]
+
+def columnar_sinks():
+    """Per-month columnar files for report_archive.ReportArchive"""
+    return [ColumnarSink()]
+
+def archive_sinks():
+    """The typed per-month files written next to every text report"""
+    return [TransactionsJsonlSink(), ColumnarSink()]
+
+OUTPUT_FORMATS = {
+    'sorted': sorted_sinks,
+    'complete': complete_sinks,
+    'json': json_sinks,
+    'columnar': columnar_sinks,
+}
+
+def fetch_month(month, store=None):
+    """Fetch the raw data for one month config, from the local store if given"""
+    print(f"Processing {month['label']}...")
+    if store is not None:
+        return store.iter_month_data(month['start'], month['end'], descending=True)
+    # Pull the first page in the worker; later pages stream during processing
+    return get_month_data(month['start'], month['end']).prefetch()
+
+def empty_summary(month):
+    """Summary entry for a month without a report"""
+    return {
+        'month': month['name'],
+        'total': 0,
+        'count': 0,
+        'excluded_total': 0,
+        'excluded_count': 0,
+        'categories': {},
+        'files': []
+    }
+
+def record_fetch(metrics, month_name, stats):
+    """Copy the transfer counters of a fetch into the metrics"""
+    if stats:
+        metrics.record(month_name, 'fetch', seconds=stats['request_seconds'], bytes=stats['bytes'],
+                       json_bytes=stats.get('json_bytes', 0), requests=stats['requests'])
+        metrics.record(month_name, 'decode', seconds=stats['decode_seconds'])
+
+def generate_month(month, data, sinks, metrics=NULL_METRICS):
+    """Process one month and hand it to every sink, returning its summary entry"""
+    # Process the data as it streams in
+    month_data = process_month_data(data, month['name'], metrics)
+    record_fetch(metrics, month['name'], getattr(data, 'stats', None))
+
+    if month_data['count'] == 0 and month_data['excluded_count'] == 0:
+        print(f"  ✗ {month['name']}: No data available")
+        return empty_summary(month)
+
+    # Write the reports
+    os.makedirs(f"{REPORT_DIR}/{month['name']}", exist_ok=True)
+    files = []
+    for sink in sinks:
+        with metrics.stage(month['name'], f"write:{sink.name}"):
+            filename = sink.write_month(month, month_data)
+        if filename:
+            files.append(filename)
+
+    with metrics.stage(month['name'], 'categorize'):
+        categories = category_totals(month_data['transactions'])
+
+    print(f"  ✓ {month['name']}: ${month_data['total']:,.2f} ({month_data['count']} transactions)")
+    if month_data['excluded_total'] > 0:
+        print(f"    Excluded: ${month_data['excluded_total']:,.2f} ({month_data['excluded_count']} transactions)")
+
+    # Store summary info
+    return {
+        'month': month['name'],
+        'total': month_data['total'],
+        'count': month_data['count'],
+        'excluded_total': month_data['excluded_total'],
+        'excluded_count': month_data['excluded_count'],
+        'categories': categories,
+        'files': files
+    }
+
+def month_fingerprint(store, month):
+    """Fingerprint of everything a month's aggregates depend on: its stored data and the report rules"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([month['start'], month['end'], excluded_vendors, rules_fingerprint()]).encode('utf-8'))
+    digest.update(store.fingerprint(month['start'], month['end']).encode('utf-8'))
+    return digest.hexdigest()
+
+def reusable_snapshot(snapshots, fingerprint, month, sinks):
+    """A month's saved summary if its inputs are unchanged and every sink's files were written from them"""
+    summary = snapshots.get(month['name'], fingerprint)
+    if summary is None:
+        return None
+    if summary['count'] or summary['excluded_count']:
+        if not snapshots.files_current(month['name'], fingerprint, sink_files(sinks, month)):
+            return None
+    return summary
+
+def sink_files(sinks, month):
+    """Every file the sinks write for a month"""
+    return [path for sink in sinks for path in sink.month_files(month)]
+
+def main(sinks, workers=4, store=None, rebuild=False, metrics=None, batch=False, plan=True,
+         heading="ANNUAL SUMMARY (Filtered Totals)"):
+    """Fetch and process every month once, fanning the results out to sinks.
+
+    With a store, each month's aggregates are snapshotted with a fingerprint
+    of its stored data, and months whose fingerprint is unchanged are taken
+    from the snapshot instead of being re-read and re-processed. Pass a
+    PipelineMetrics to record per-month, per-stage timings.
+
+    Without a store, months are fetched through period_planner query windows:
+    dense months are split and sparse ones merged so each query fits in one
+    page (plan=False queries each month separately). With batch, the windows
+    are requested from the server's /batch endpoint in one round trip.
+    heading titles the console summary printed at the end.
+    """
+    metrics = metrics or NULL_METRICS
+    print(f"Generating monthly expense reports for {PERIOD_LABEL}...")
+    print("=" * 80)
+
+    summary_slots = [None] * len(months)
+    fingerprints = {}
+    snapshots = None
+
+    if store is not None:
+        # Only the delta since the last run is downloaded; months are then read from disk
+        try:
+            with metrics.stage(RUN, 'sync'):
+                synced = store.sync()
+            print(f"Synced {synced} changed transactions into {store.path}")
+        except QuickBooksQueryError as e:
+            print(f"  ✗ Sync failed, using stored data: {e}")
+        fetch = partial(fetch_month, store=store)
+        workers = 1
+
+        snapshots = MonthSnapshots() if rebuild else MonthSnapshots.load()
+        for index, month in enumerate(months):
+            with metrics.stage(month['name'], 'fingerprint'):
+                fingerprints[index] = month_fingerprint(store, month)
+            summary = reusable_snapshot(snapshots, fingerprints[index], month, sinks)
+            if summary is not None:
+                print(f"  = {month['name']}: unchanged, ${summary['total']:,.2f} ({summary['count']} transactions)")
+                summary_slots[index] = summary
+    else:
+        fetch = fetch_month
+
+    # Months without a reusable snapshot are fetched and processed
+    pending = [index for index, summary in enumerate(summary_slots) if summary is None]
+
+    batch_stats = {}
+    if plan and store is None:
+        for month in (months[i] for i in pending):
+            print(f"Processing {month['label']}...")
+        fetched = fetch_periods([months[i] for i in pending], 'TxnDate DESC', PURCHASE_FIELDS, workers, batch, batch_stats)
+    elif batch and store is None:
+        fetched = quickbooks_client.fetch_months_batched([months[i] for i in pending], 'TxnDate DESC', batch_stats,
+                                                         PURCHASE_FIELDS)
+    else:
+        fetched = quickbooks_client.fetch_months_concurrently([months[i] for i in pending], fetch, workers)
+
+    for position, month, data, error in fetched:
+        index = pending[position]
+        if error is None:
+            try:
+                summary_slots[index] = generate_month(month, data, sinks, metrics)
+                if snapshots is not None:
+                    snapshots.put(month['name'], fingerprints[index], summary_slots[index],
+                                  sink_files(sinks, month))
+                continue
+            except QuickBooksQueryError as e:
+                error = e
+        print(f"  ✗ {month['name']}: Query failed: {error}")
+        summary_slots[index] = empty_summary(month)
+
+    record_fetch(metrics, RUN, batch_stats)
+
+    if snapshots is not None:
+        snapshots.save()
+
+    # Restore calendar order regardless of completion order
+    summary_data = [summary for summary in summary_slots if summary is not None]
+
+    # Print summary report
+    print("\n" + "=" * 80)
+    print(heading)
+    print("=" * 80)
+
+    for summary in summary_data:
+        print(f"{summary['month']:<12}: ${summary['total']:>10,.2f} ({summary['count']:>3d} transactions)")
+
+    annual_total, annual_count, annual_excluded_total, annual_excluded_count = annual_totals(summary_data)
+    print("=" * 80)
+    print(f"{'TOTAL':<12}: ${annual_total:>10,.2f} ({annual_count:>3d} transactions)")
+    print(f"{'EXCLUDED':<12}: ${annual_excluded_total:>10,.2f} ({annual_excluded_count:>3d} transactions)")
+    print(f"{'GRAND TOTAL':<12}: ${annual_total + annual_excluded_total:>10,.2f} ({annual_count + annual_excluded_count:>3d} transactions)")
+
+    print()
+    for sink in sinks:
+        with metrics.stage(RUN, f"write:{sink.name}"):
+            path = sink.finish(summary_data)
+        if path:
+            print(f"Saved: {path}")
+    print("All monthly reports completed!")
+
+    return summary_data
+
+def build_sinks(formats):
+    """Sinks for the given output format names, in order"""
+    return [sink for name in formats for sink in OUTPUT_FORMATS[name]()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the monthly expense reports from a single fetch per month")
+    parser.add_argument('--format', dest='formats', action='append', choices=sorted(OUTPUT_FORMATS),
+                        help='Output format to write; repeat for several (default: all)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of month queries to keep in flight (1 = sequential)')
+    parser.add_argument('--from-store', action='store_true',
+                        help='Sync the local transaction store and build the reports from it, '
+                             'reusing the saved aggregates of unchanged months')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='With --from-store, ignore saved month snapshots and reprocess every month')
+    parser.add_argument('--batch', action='store_true',
+                        help="Fetch every query window in one request to the server's /batch endpoint")
+    parser.add_argument('--no-plan', action='store_true',
+                        help='Query each month separately instead of through planned query windows')
+    add_period_arguments(parser)
+    pipeline_metrics.add_arguments(parser)
+    args = parser.parse_args()
+
+    configure_period(args.start, args.end)
+    sinks = build_sinks(args.formats or list(OUTPUT_FORMATS))
+    metrics = pipeline_metrics.from_args(args)
+    if args.from_store:
+        with TransactionStore() as store:
+            main(sinks, workers=args.workers, store=store, rebuild=args.rebuild, metrics=metrics)
+    else:
+        main(sinks, workers=args.workers, metrics=metrics, batch=args.batch, plan=not args.no_plan)
+    pipeline_metrics.finish(metrics, args)
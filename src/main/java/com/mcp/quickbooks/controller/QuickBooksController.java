@@ -1,5 +1,8 @@
 package com.mcp.quickbooks.controller;
 
+import com.mcp.quickbooks.service.BatchQueryService;
+import com.mcp.quickbooks.service.EntityProjection;
+import com.mcp.quickbooks.service.PurchaseAggregationService;
 import com.mcp.quickbooks.service.QuickBooksService;
 import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.http.ResponseEntity;
@@ -7,6 +10,7 @@ import org.springframework.web.bind.annotation.*;
 
 import java.time.LocalDateTime;
 import java.util.HashMap;
+import java.util.List;
 import java.util.Map;
 
 @RestController
@@ -17,11 +21,24 @@ public class QuickBooksController {
     @Autowired
     private QuickBooksService quickBooksService;
 
+    @Autowired
+    private PurchaseAggregationService purchaseAggregationService;
+
+    @Autowired
+    private BatchQueryService batchQueryService;
+
+    @Autowired
+    private EntityProjection entityProjection;
+
     @PostMapping("/query")
-    public ResponseEntity<?> executeQuery(@RequestBody Map<String, String> request) {
+    public ResponseEntity<?> executeQuery(@RequestBody Map<String, Object> request) {
         try {
-            String query = request.get("query");
-            Object result = quickBooksService.executeQuery(query);
+            String query = (String) request.get("query");
+            // "cache": false (or "false") forces a fresh read from QuickBooks
+            boolean useCache = !"false".equalsIgnoreCase(String.valueOf(request.get("cache")));
+            // "fields": "totalAmt,txnDate,entityRef.name" or ["totalAmt", ...] returns only those properties
+            List<String> fields = EntityProjection.parseFields(request.get("fields"));
+            Object result = entityProjection.project(quickBooksService.executeQuery(query, useCache), fields);
             return ResponseEntity.ok(result);
         } catch (Exception e) {
             Map<String, String> error = new HashMap<>();
@@ -30,6 +47,30 @@ public class QuickBooksController {
         }
     }
 
+    @PostMapping("/batch")
+    public ResponseEntity<?> executeBatch(@RequestBody Map<String, Object> request) {
+        try {
+            Map<String, Object> result = batchQueryService.executeBatch(request);
+            return ResponseEntity.ok(result);
+        } catch (Exception e) {
+            Map<String, String> error = new HashMap<>();
+            error.put("error", "Failed to execute batch: " + e.getMessage());
+            return ResponseEntity.badRequest().body(error);
+        }
+    }
+
+    @PostMapping("/aggregate")
+    public ResponseEntity<?> aggregatePurchases(@RequestBody Map<String, Object> request) {
+        try {
+            Map<String, Object> result = purchaseAggregationService.aggregate(request);
+            return ResponseEntity.ok(result);
+        } catch (Exception e) {
+            Map<String, String> error = new HashMap<>();
+            error.put("error", "Failed to aggregate purchases: " + e.getMessage());
+            return ResponseEntity.badRequest().body(error);
+        }
+    }
+
     @PostMapping("/create")
     public ResponseEntity<?> createEntity(@RequestBody Map<String, Object> request) {
         try {
@@ -69,13 +110,27 @@ public class QuickBooksController {
         }
     }
 
+    @GetMapping("/cache/status")
+    public ResponseEntity<Map<String, Object>> getCacheStatus() {
+        return ResponseEntity.ok(quickBooksService.getCacheStats());
+    }
+
+    @PostMapping("/cache/clear")
+    public ResponseEntity<Map<String, Object>> clearCache() {
+        quickBooksService.clearQueryCache();
+        Map<String, Object> response = new HashMap<>();
+        response.put("message", "Query cache cleared");
+        response.put("currentTime", LocalDateTime.now().toString());
+        return ResponseEntity.ok(response);
+    }
+
     @PostMapping("/token/refresh")
     public ResponseEntity<Map<String, Object>> forceTokenRefresh() {
         Map<String, Object> response = new HashMap<>();
         try {
             // This will trigger a refresh by making a simple query
             String testQuery = "SELECT COUNT(*) FROM CompanyInfo";
-            quickBooksService.executeQuery(testQuery);
+            quickBooksService.executeQuery(testQuery, false);
             
             response.put("message", "Token refresh completed successfully");
             response.put("newExpiryTime", quickBooksService.getTokenExpiry() != null ? 
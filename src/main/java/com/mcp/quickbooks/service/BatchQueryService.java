@@ -0,0 +1,171 @@
+package com.mcp.quickbooks.service;
+
+import jakarta.annotation.PreDestroy;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Service;
+
+import java.util.ArrayList;
+import java.util.HashSet;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.TimeoutException;
+
+@Service
+public class BatchQueryService {
+
+    private static final int PAGE_SIZE = 1000;
+
+    @Autowired
+    private QuickBooksService quickBooksService;
+
+    @Autowired
+    private EntityProjection entityProjection;
+
+    // QuickBooks throttles concurrent requests per company, so keep this small
+    @Value("${quickbooks.batch.parallelism:4}")
+    private int parallelism;
+
+    @Value("${quickbooks.batch.maxQueries:50}")
+    private int maxQueries;
+
+    @Value("${quickbooks.batch.timeoutSeconds:300}")
+    private long timeoutSeconds;
+
+    private ExecutorService executor;
+
+    private static class BatchItem {
+        final String id;
+        final String query;
+        final boolean paginate;
+        final boolean useCache;
+        final List<String> fields;
+        final boolean count;
+
+        BatchItem(String id, String query, boolean paginate, boolean useCache, List<String> fields, boolean count) {
+            this.id = id;
+            this.query = query;
+            this.paginate = paginate;
+            this.useCache = useCache;
+            this.fields = fields;
+            this.count = count;
+        }
+    }
+
+    private synchronized ExecutorService executor() {
+        if (executor == null) {
+            executor = Executors.newFixedThreadPool(Math.max(1, parallelism));
+        }
+        return executor;
+    }
+
+    @PreDestroy
+    public synchronized void shutdown() {
+        if (executor != null) {
+            executor.shutdownNow();
+        }
+    }
+
+    // Runs every query of a batch with at most `parallelism` in flight and returns
+    // {"results": {id: entities}, "errors": {id: message}} in request order.
+    // With "paginate" a query's pages are all fetched and concatenated; with
+    // "count" a SELECT COUNT(*) query's result is {"totalCount": n}.
+    public Map<String, Object> executeBatch(Map<String, Object> request) {
+        List<BatchItem> items = parseItems(request);
+        long started = System.nanoTime();
+
+        Map<String, Future<Object>> futures = new LinkedHashMap<>();
+        for (BatchItem item : items) {
+            futures.put(item.id, executor().submit(() -> item.count
+                    ? Map.of("totalCount", quickBooksService.countQuery(item.query))
+                    : entityProjection.project(item.paginate
+                            ? quickBooksService.queryAllPages(item.query, PAGE_SIZE, item.useCache)
+                            : quickBooksService.executeQuery(item.query, item.useCache), item.fields)));
+        }
+
+        long deadline = started + TimeUnit.SECONDS.toNanos(timeoutSeconds);
+        Map<String, Object> results = new LinkedHashMap<>();
+        Map<String, String> errors = new LinkedHashMap<>();
+        for (Map.Entry<String, Future<Object>> entry : futures.entrySet()) {
+            try {
+                Object entities = entry.getValue().get(Math.max(0, deadline - System.nanoTime()), TimeUnit.NANOSECONDS);
+                results.put(entry.getKey(), entities != null ? entities : new ArrayList<>());
+            } catch (TimeoutException e) {
+                entry.getValue().cancel(true);
+                errors.put(entry.getKey(), "Timed out after " + timeoutSeconds + " seconds");
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                futures.values().forEach(future -> future.cancel(true));
+                throw new RuntimeException("Interrupted while running batch", e);
+            } catch (ExecutionException e) {
+                Throwable cause = e.getCause() != null ? e.getCause() : e;
+                errors.put(entry.getKey(), "Failed to execute query: " + cause.getMessage());
+            }
+        }
+
+        Map<String, Object> response = new LinkedHashMap<>();
+        response.put("results", results);
+        response.put("errors", errors);
+        response.put("elapsedMs", TimeUnit.NANOSECONDS.toMillis(System.nanoTime() - started));
+        return response;
+    }
+
+    // Queries are {"id", "query", "paginate", "cache", "fields", "count"} objects or bare query
+    // strings (keyed by position); top-level "paginate", "cache" and "fields" are the defaults
+    @SuppressWarnings("unchecked")
+    private List<BatchItem> parseItems(Map<String, Object> request) {
+        Object queries = request.get("queries");
+        if (!(queries instanceof List) || ((List<Object>) queries).isEmpty()) {
+            throw new IllegalArgumentException("queries must be a non-empty list");
+        }
+        List<Object> entries = (List<Object>) queries;
+        if (entries.size() > maxQueries) {
+            throw new IllegalArgumentException("A batch may hold at most " + maxQueries + " queries, got " + entries.size());
+        }
+        boolean paginate = flag(request.get("paginate"), false);
+        boolean useCache = flag(request.get("cache"), true);
+        List<String> fields = EntityProjection.parseFields(request.get("fields"));
+
+        List<BatchItem> items = new ArrayList<>();
+        Set<String> seen = new HashSet<>();
+        for (int i = 0; i < entries.size(); i++) {
+            Object entry = entries.get(i);
+            BatchItem item;
+            if (entry instanceof Map) {
+                Map<String, Object> options = (Map<String, Object>) entry;
+                Object query = options.get("query");
+                if (query == null) {
+                    throw new IllegalArgumentException("Batch entry " + i + " has no query");
+                }
+                Object id = options.get("id");
+                List<String> itemFields = options.containsKey("fields") ? EntityProjection.parseFields(options.get("fields")) : fields;
+                item = new BatchItem(id != null ? id.toString() : String.valueOf(i), query.toString(),
+                        flag(options.get("paginate"), paginate), flag(options.get("cache"), useCache), itemFields,
+                        flag(options.get("count"), false));
+            } else if (entry != null) {
+                item = new BatchItem(String.valueOf(i), entry.toString(), paginate, useCache, fields, false);
+            } else {
+                throw new IllegalArgumentException("Batch entry " + i + " is empty");
+            }
+            if (!seen.add(item.id)) {
+                throw new IllegalArgumentException("Duplicate batch id: " + item.id);
+            }
+            items.add(item);
+        }
+        return items;
+    }
+
+    private static boolean flag(Object value, boolean defaultValue) {
+        if (value == null) {
+            return defaultValue;
+        }
+        return value instanceof Boolean ? (Boolean) value : Boolean.parseBoolean(value.toString());
+    }
+}
@@ -0,0 +1,68 @@
+package com.mcp.quickbooks.service;
+
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.fasterxml.jackson.databind.node.ObjectNode;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.stereotype.Component;
+
+import java.util.ArrayList;
+import java.util.List;
+
+// Slims serialized entities down to the requested fields so clients that read
+// only a handful of properties do not download line items and metadata.
+// Fields use the JSON property names /query returns; dotted paths such as
+// "entityRef.name" select nested properties.
+@Component
+public class EntityProjection {
+
+    @Autowired
+    private ObjectMapper objectMapper;
+
+    // Accepts a list of field names or a comma-separated string; null means no projection
+    @SuppressWarnings("unchecked")
+    public static List<String> parseFields(Object value) {
+        if (value == null) {
+            return null;
+        }
+        List<String> fields = new ArrayList<>();
+        Iterable<Object> items = value instanceof List ? (List<Object>) value : List.of((Object[]) value.toString().split(","));
+        for (Object item : items) {
+            String field = String.valueOf(item).trim();
+            if (!field.isEmpty()) {
+                fields.add(field);
+            }
+        }
+        return fields.isEmpty() ? null : fields;
+    }
+
+    public Object project(List<?> entities, List<String> fields) {
+        if (fields == null || entities == null) {
+            return entities;
+        }
+        List<ObjectNode> projected = new ArrayList<>(entities.size());
+        for (Object entity : entities) {
+            JsonNode source = objectMapper.valueToTree(entity);
+            ObjectNode target = objectMapper.createObjectNode();
+            for (String field : fields) {
+                copyPath(source, target, field.split("\\."), 0);
+            }
+            projected.add(target);
+        }
+        return projected;
+    }
+
+    private static void copyPath(JsonNode source, ObjectNode target, String[] path, int depth) {
+        JsonNode value = source.get(path[depth]);
+        if (value == null || value.isNull()) {
+            return;
+        }
+        if (depth == path.length - 1) {
+            target.set(path[depth], value);
+        } else if (value.isObject()) {
+            JsonNode existing = target.get(path[depth]);
+            ObjectNode child = existing instanceof ObjectNode ? (ObjectNode) existing : target.putObject(path[depth]);
+            copyPath(value, child, path, depth + 1);
+        }
+    }
+}
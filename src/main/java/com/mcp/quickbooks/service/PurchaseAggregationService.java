@@ -0,0 +1,258 @@
+package com.mcp.quickbooks.service;
+
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.intuit.ipp.data.IEntity;
+import com.intuit.ipp.exception.FMSException;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.stereotype.Service;
+
+import java.math.BigDecimal;
+import java.math.RoundingMode;
+import java.util.ArrayList;
+import java.util.HashSet;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.TreeMap;
+import java.util.regex.Pattern;
+
+@Service
+public class PurchaseAggregationService {
+
+    // Keys a request may group by; each reads the entity in the JSON shape /query returns
+    public static final List<String> GROUP_KEYS = List.of("month", "date", "vendor", "category", "paymentType", "account");
+
+    public static final String DEFAULT_CATEGORY = "Other/Miscellaneous";
+    public static final String NO_VENDOR = "No Vendor Listed";
+
+    private static final int PAGE_SIZE = 1000;
+    private static final Pattern DATE_PATTERN = Pattern.compile("\\d{4}-\\d{2}-\\d{2}");
+
+    @Autowired
+    private QuickBooksService quickBooksService;
+
+    @Autowired
+    private ObjectMapper objectMapper;
+
+    // Sums the Purchases in a date range by the requested keys and returns only
+    // the aggregates, so clients no longer download every entity to total them
+    public Map<String, Object> aggregate(Map<String, Object> request) throws FMSException {
+        String startDate = requireDate(request, "startDate");
+        String endDate = requireDate(request, "endDate");
+
+        List<String> groupBy = stringList(request.get("groupBy"));
+        for (String key : groupBy) {
+            if (!GROUP_KEYS.contains(key)) {
+                throw new IllegalArgumentException("Unsupported groupBy key: " + key + " (expected one of " + GROUP_KEYS + ")");
+            }
+        }
+
+        String defaultCategory = request.get("defaultCategory") != null ? request.get("defaultCategory").toString() : DEFAULT_CATEGORY;
+        CategoryRules rules = CategoryRules.from(request.get("categories"), defaultCategory);
+        if (groupBy.contains("category") && rules == null) {
+            throw new IllegalArgumentException("Grouping by category requires the categories rules");
+        }
+
+        Aggregation aggregation = new Aggregation(groupBy, new HashSet<>(stringList(request.get("excludedVendors"))), rules);
+        String query = "SELECT * FROM Purchase WHERE TxnDate >= '" + startDate + "' AND TxnDate <= '" + endDate + "'";
+        quickBooksService.forEachPage(query, PAGE_SIZE, page -> {
+            for (IEntity entity : page) {
+                aggregation.add(objectMapper.valueToTree(entity));
+            }
+        });
+
+        Map<String, Object> response = aggregation.toResponse();
+        response.put("startDate", startDate);
+        response.put("endDate", endDate);
+        response.put("groupBy", groupBy);
+        return response;
+    }
+
+    private static String requireDate(Map<String, Object> request, String field) {
+        Object value = request.get(field);
+        if (value == null || !DATE_PATTERN.matcher(value.toString()).matches()) {
+            throw new IllegalArgumentException(field + " must be a date in YYYY-MM-DD format");
+        }
+        return value.toString();
+    }
+
+    @SuppressWarnings("unchecked")
+    private static List<String> stringList(Object value) {
+        List<String> values = new ArrayList<>();
+        if (value instanceof List) {
+            for (Object item : (List<Object>) value) {
+                values.add(String.valueOf(item));
+            }
+        } else if (value != null) {
+            values.add(value.toString());
+        }
+        return values;
+    }
+
+    private static String text(JsonNode node, String field) {
+        JsonNode value = node.path(field);
+        return value.isValueNode() ? value.asText("") : "";
+    }
+
+    // First-match-wins category rules in request order, matched against the
+    // upper-cased description like the Python CategorizationEngine
+    static class CategoryRules {
+        private final List<String> names = new ArrayList<>();
+        private final List<Pattern> patterns = new ArrayList<>();
+        private final String defaultCategory;
+
+        private CategoryRules(String defaultCategory) {
+            this.defaultCategory = defaultCategory;
+        }
+
+        @SuppressWarnings("unchecked")
+        static CategoryRules from(Object categories, String defaultCategory) {
+            if (!(categories instanceof Map)) {
+                return null;
+            }
+            CategoryRules rules = new CategoryRules(defaultCategory);
+            for (Map.Entry<String, Object> entry : ((Map<String, Object>) categories).entrySet()) {
+                if (!(entry.getValue() instanceof Map)) {
+                    continue;
+                }
+                Map<String, Object> definition = (Map<String, Object>) entry.getValue();
+                List<String> sources = new ArrayList<>();
+                for (String keyword : stringList(definition.get("keywords"))) {
+                    sources.add(Pattern.quote(keyword));
+                }
+                for (String pattern : stringList(definition.get("patterns"))) {
+                    sources.add("(?:" + pattern + ")");
+                }
+                if (!sources.isEmpty()) {
+                    rules.names.add(entry.getKey());
+                    rules.patterns.add(Pattern.compile(String.join("|", sources)));
+                }
+            }
+            return rules;
+        }
+
+        String categorize(String description) {
+            if (description.isEmpty()) {
+                return defaultCategory;
+            }
+            String upper = description.toUpperCase();
+            for (int i = 0; i < patterns.size(); i++) {
+                if (patterns.get(i).matcher(upper).find()) {
+                    return names.get(i);
+                }
+            }
+            return defaultCategory;
+        }
+    }
+
+    private static class Group {
+        BigDecimal total = BigDecimal.ZERO;
+        long count;
+        BigDecimal min;
+        BigDecimal max;
+
+        void add(BigDecimal amount) {
+            total = total.add(amount);
+            count++;
+            min = min == null || amount.compareTo(min) < 0 ? amount : min;
+            max = max == null || amount.compareTo(max) > 0 ? amount : max;
+        }
+    }
+
+    private static class Aggregation {
+        private final List<String> groupBy;
+        private final Set<String> excludedVendors;
+        private final CategoryRules rules;
+        private final Map<List<String>, Group> groups = new TreeMap<>(Aggregation::compareKeys);
+        private final Group included = new Group();
+        private final Group excluded = new Group();
+
+        Aggregation(List<String> groupBy, Set<String> excludedVendors, CategoryRules rules) {
+            this.groupBy = groupBy;
+            this.excludedVendors = excludedVendors;
+            this.rules = rules;
+        }
+
+        void add(JsonNode purchase) {
+            BigDecimal amount = purchase.path("totalAmt").isNumber() ? purchase.path("totalAmt").decimalValue() : BigDecimal.ZERO;
+            String vendor = text(purchase.path("entityRef"), "name");
+            if (excludedVendors.contains(vendor)) {
+                excluded.add(amount);
+                return;
+            }
+            included.add(amount);
+            if (groupBy.isEmpty()) {
+                return;
+            }
+
+            String date = text(purchase, "txnDate");
+            date = date.length() >= 10 ? date.substring(0, 10) : "N/A";
+            List<String> key = new ArrayList<>(groupBy.size());
+            for (String field : groupBy) {
+                switch (field) {
+                    case "month":
+                        key.add(date.length() == 10 ? date.substring(0, 7) : date);
+                        break;
+                    case "date":
+                        key.add(date);
+                        break;
+                    case "vendor":
+                        key.add(vendor.isEmpty() ? NO_VENDOR : vendor);
+                        break;
+                    case "category":
+                        String description = text(purchase, "privateNote");
+                        key.add(rules.categorize(description.isEmpty() ? text(purchase, "memo") : description));
+                        break;
+                    case "paymentType":
+                        key.add(text(purchase, "paymentType"));
+                        break;
+                    default:
+                        key.add(text(purchase.path("accountRef"), "name"));
+                }
+            }
+            groups.computeIfAbsent(key, k -> new Group()).add(amount);
+        }
+
+        private static int compareKeys(List<String> a, List<String> b) {
+            for (int i = 0; i < a.size(); i++) {
+                int result = a.get(i).compareTo(b.get(i));
+                if (result != 0) {
+                    return result;
+                }
+            }
+            return 0;
+        }
+
+        private static BigDecimal money(BigDecimal value) {
+            return value == null ? BigDecimal.ZERO : value.setScale(2, RoundingMode.HALF_UP);
+        }
+
+        Map<String, Object> toResponse() {
+            List<Map<String, Object>> rows = new ArrayList<>();
+            for (Map.Entry<List<String>, Group> entry : groups.entrySet()) {
+                Map<String, Object> key = new LinkedHashMap<>();
+                for (int i = 0; i < groupBy.size(); i++) {
+                    key.put(groupBy.get(i), entry.getKey().get(i));
+                }
+                Group group = entry.getValue();
+                Map<String, Object> row = new LinkedHashMap<>();
+                row.put("key", key);
+                row.put("total", money(group.total));
+                row.put("count", group.count);
+                row.put("min", money(group.min));
+                row.put("max", money(group.max));
+                rows.add(row);
+            }
+
+            Map<String, Object> response = new LinkedHashMap<>();
+            response.put("total", money(included.total));
+            response.put("count", included.count);
+            response.put("excludedTotal", money(excluded.total));
+            response.put("excludedCount", excluded.count);
+            response.put("groups", rows);
+            return response;
+        }
+    }
+}
@@ -0,0 +1,169 @@
+package com.mcp.quickbooks.service;
+
+import com.intuit.ipp.data.IEntity;
+import com.intuit.ipp.exception.FMSException;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.atomic.AtomicLong;
+
+// Query results kept for a short time, keyed by the whitespace-normalized
+// query text. Least recently used entries are evicted beyond maxEntries, and
+// concurrent requests for the same uncached query share one QuickBooks call.
+// clear() bumps a generation, so loads started before it never store their
+// (possibly stale) results or hand them to later requests.
+@Component
+public class QueryCache {
+
+    public interface Loader {
+        List<? extends IEntity> load() throws FMSException;
+    }
+
+    private static class Entry {
+        final List<IEntity> entities;
+        final long expiresAt;
+
+        Entry(List<IEntity> entities, long expiresAt) {
+            this.entities = entities;
+            this.expiresAt = expiresAt;
+        }
+    }
+
+    @Value("${quickbooks.cache.ttlSeconds:300}")
+    private long ttlSeconds;
+
+    @Value("${quickbooks.cache.maxEntries:256}")
+    private int maxEntries;
+
+    // Access-ordered, so iteration starts at the least recently used entry
+    private final LinkedHashMap<String, Entry> entries = new LinkedHashMap<>(16, 0.75f, true);
+    private final ConcurrentHashMap<String, CompletableFuture<List<IEntity>>> inFlight = new ConcurrentHashMap<>();
+
+    // Guarded by entries; incremented by every clear()
+    private long generation;
+
+    private final AtomicLong hits = new AtomicLong();
+    private final AtomicLong misses = new AtomicLong();
+    private final AtomicLong coalesced = new AtomicLong();
+    private final AtomicLong evictions = new AtomicLong();
+    private final AtomicLong expirations = new AtomicLong();
+
+    public static String normalize(String query) {
+        return query == null ? "" : query.trim().replaceAll("\\s+", " ");
+    }
+
+    public boolean isEnabled() {
+        return ttlSeconds > 0 && maxEntries > 0;
+    }
+
+    public List<? extends IEntity> get(String query, Loader loader) throws FMSException {
+        if (!isEnabled()) {
+            return loader.load();
+        }
+        String key = normalize(query);
+        long loadGeneration;
+        synchronized (entries) {
+            loadGeneration = generation;
+            Entry entry = entries.get(key);
+            if (entry != null) {
+                if (entry.expiresAt > System.currentTimeMillis()) {
+                    hits.incrementAndGet();
+                    return entry.entities;
+                }
+                entries.remove(key);
+                expirations.incrementAndGet();
+            }
+        }
+
+        CompletableFuture<List<IEntity>> pending = new CompletableFuture<>();
+        CompletableFuture<List<IEntity>> existing = inFlight.putIfAbsent(key, pending);
+        if (existing != null) {
+            coalesced.incrementAndGet();
+            return await(existing);
+        }
+
+        misses.incrementAndGet();
+        try {
+            List<? extends IEntity> loaded = loader.load();
+            List<IEntity> entities = Collections.unmodifiableList(loaded == null ? new ArrayList<>() : new ArrayList<>(loaded));
+            put(key, entities, loadGeneration);
+            pending.complete(entities);
+            return entities;
+        } catch (FMSException | RuntimeException e) {
+            pending.completeExceptionally(e);
+            throw e;
+        } finally {
+            inFlight.remove(key, pending);
+        }
+    }
+
+    private void put(String key, List<IEntity> entities, long loadGeneration) {
+        synchronized (entries) {
+            if (loadGeneration != generation) {
+                return;
+            }
+            entries.put(key, new Entry(entities, System.currentTimeMillis() + ttlSeconds * 1000));
+            Iterator<Map.Entry<String, Entry>> oldest = entries.entrySet().iterator();
+            while (entries.size() > maxEntries && oldest.hasNext()) {
+                oldest.next();
+                oldest.remove();
+                evictions.incrementAndGet();
+            }
+        }
+    }
+
+    private static List<IEntity> await(CompletableFuture<List<IEntity>> future) throws FMSException {
+        try {
+            return future.get();
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            throw new RuntimeException("Interrupted while waiting for a shared query", e);
+        } catch (ExecutionException e) {
+            Throwable cause = e.getCause();
+            if (cause instanceof FMSException) {
+                throw (FMSException) cause;
+            }
+            if (cause instanceof RuntimeException) {
+                throw (RuntimeException) cause;
+            }
+            throw new RuntimeException(cause);
+        }
+    }
+
+    public void clear() {
+        synchronized (entries) {
+            generation++;
+            entries.clear();
+            // Later requests must not join loads that started before the clear
+            inFlight.clear();
+        }
+    }
+
+    public Map<String, Object> stats() {
+        Map<String, Object> stats = new LinkedHashMap<>();
+        long hitCount = hits.get() + coalesced.get();
+        long lookups = hitCount + misses.get();
+        stats.put("enabled", isEnabled());
+        synchronized (entries) {
+            stats.put("size", entries.size());
+        }
+        stats.put("maxEntries", maxEntries);
+        stats.put("ttlSeconds", ttlSeconds);
+        stats.put("hits", hits.get());
+        stats.put("coalesced", coalesced.get());
+        stats.put("misses", misses.get());
+        stats.put("hitRate", lookups > 0 ? (double) hitCount / lookups : 0.0);
+        stats.put("evictions", evictions.get());
+        stats.put("expirations", expirations.get());
+        return stats;
+    }
+}
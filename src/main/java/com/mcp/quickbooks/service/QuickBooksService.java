@@ -7,6 +7,7 @@ import com.intuit.ipp.exception.FMSException;
 import com.intuit.ipp.security.OAuth2Authorizer;
 import com.intuit.ipp.services.DataService;
 import com.intuit.ipp.services.QueryResult;
+import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.beans.factory.annotation.Value;
 import org.springframework.stereotype.Service;
 import org.springframework.web.client.RestTemplate;
@@ -15,9 +16,13 @@ import org.springframework.util.LinkedMultiValueMap;
 import org.springframework.util.MultiValueMap;
 
 import java.time.LocalDateTime;
+import java.util.ArrayList;
 import java.util.List;
 import java.util.Map;
 import java.util.Base64;
+import java.util.LinkedHashMap;
+import java.util.Objects;
+import java.util.function.Consumer;
 
 @Service
 public class QuickBooksService {
@@ -43,6 +48,17 @@ public class QuickBooksService {
     private LocalDateTime tokenExpiry;
     private final RestTemplate restTemplate = new RestTemplate();
 
+    @Autowired
+    private QueryCache queryCache;
+
+    // Cache key prefix for whole paged walks; no QuickBooks query starts with it
+    private static final String ALL_PAGES_KEY = "ALL PAGES ";
+
+    // DataService built for the current access token; rebuilt when a refresh changes it
+    private DataService dataService;
+    private String dataServiceToken;
+    private long dataServiceGeneration;
+
     private synchronized void refreshTokenIfNeeded() {
         try {
             // Check if we need to refresh (if token expires within 5 minutes)
@@ -112,16 +128,34 @@ public class QuickBooksService {
         // Automatically refresh token if needed
         refreshTokenIfNeeded();
         
-        OAuth2Authorizer oauth = new OAuth2Authorizer(accessToken);
-        Context context = new Context(oauth, ServiceType.QBO, realmId);
-        return new DataService(context);
+        synchronized (this) {
+            if (dataService == null || !Objects.equals(accessToken, dataServiceToken)) {
+                OAuth2Authorizer oauth = new OAuth2Authorizer(accessToken);
+                Context context = new Context(oauth, ServiceType.QBO, realmId);
+                dataService = new DataService(context);
+                dataServiceToken = accessToken;
+                dataServiceGeneration++;
+            }
+            return dataService;
+        }
     }
 
     public Object executeQuery(String query) throws FMSException {
+        return executeQuery(query, true);
+    }
+
+    // Identical queries within the cache TTL are answered without calling QuickBooks
+    public List<? extends IEntity> executeQuery(String query, boolean useCache) throws FMSException {
+        if (!useCache) {
+            return runQuery(query).getEntities();
+        }
+        return queryCache.get(query, () -> runQuery(query).getEntities());
+    }
+
+    private QueryResult runQuery(String query) throws FMSException {
         try {
             DataService service = getDataService();
-            QueryResult queryResult = service.executeQuery(query);
-            return queryResult.getEntities();
+            return service.executeQuery(query);
         } catch (FMSException e) {
             // Check if this is an authentication error
             if (e.getMessage() != null && e.getMessage().contains("401")) {
@@ -131,13 +165,52 @@ public class QuickBooksService {
                 
                 // Retry the query with the new token
                 DataService service = getDataService();
-                QueryResult queryResult = service.executeQuery(query);
-                return queryResult.getEntities();
+                return service.executeQuery(query);
             }
             throw e;
         }
     }
 
+    // Number of entities a SELECT COUNT(*) query matches
+    public int countQuery(String query) throws FMSException {
+        Integer totalCount = runQuery(query).getTotalCount();
+        return totalCount != null ? totalCount : 0;
+    }
+
+    // Every entity a query matches, collected across all pages. The whole walk is
+    // cached under one key, so a cached result never mixes pages of different ages.
+    public List<? extends IEntity> queryAllPages(String query, int pageSize, boolean useCache) throws FMSException {
+        if (!useCache) {
+            return collectPages(query, pageSize);
+        }
+        return queryCache.get(ALL_PAGES_KEY + pageSize + " " + query, () -> collectPages(query, pageSize));
+    }
+
+    private List<IEntity> collectPages(String query, int pageSize) throws FMSException {
+        List<IEntity> entities = new ArrayList<>();
+        forEachPage(query, pageSize, entities::addAll);
+        return entities;
+    }
+
+    // Runs a query page by page with STARTPOSITION/MAXRESULTS, handing each page
+    // to the consumer so callers never hold more than one page of entities.
+    // Pages always come from QuickBooks: pages cached one by one could be of
+    // different ages and duplicate or skip rows between them.
+    public void forEachPage(String query, int pageSize, Consumer<List<? extends IEntity>> consumer) throws FMSException {
+        int startPosition = 1;
+        while (true) {
+            List<? extends IEntity> page = runQuery(query + " STARTPOSITION " + startPosition + " MAXRESULTS " + pageSize).getEntities();
+            if (page == null || page.isEmpty()) {
+                return;
+            }
+            consumer.accept(page);
+            if (page.size() < pageSize) {
+                return;
+            }
+            startPosition += pageSize;
+        }
+    }
+
     public Object createEntity(String entityType, Map<String, Object> entityData) throws FMSException {
         try {
             DataService service = getDataService();
@@ -163,6 +236,10 @@ public class QuickBooksService {
                 return createEntity(entityType, entityData);
             }
             throw e;
+        } finally {
+            // Cached query results may no longer match once an entity is added; clearing
+            // afterwards also drops anything a concurrent query cached while it was added
+            queryCache.clear();
         }
     }
 
@@ -224,4 +301,17 @@ public class QuickBooksService {
     public LocalDateTime getTokenExpiry() {
         return tokenExpiry;
     }
+
+    // Query cache counters plus how many DataService instances have been built
+    public Map<String, Object> getCacheStats() {
+        Map<String, Object> stats = new LinkedHashMap<>(queryCache.stats());
+        synchronized (this) {
+            stats.put("dataServiceGeneration", dataServiceGeneration);
+        }
+        return stats;
+    }
+
+    public void clearQueryCache() {
+        queryCache.clear();
+    }
 }
\ No newline at end of file
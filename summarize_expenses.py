@@ -0,0 +1,59 @@
+import argparse
+import json
+import sys
+
+from categorize_expenses import DEFAULT_CATEGORY, EXPENSE_CATEGORIES
+import quickbooks_client
+from quickbooks_client import QuickBooksQueryError
+from report_pipeline import excluded_vendors
+
+GROUP_KEYS = ['month', 'date', 'vendor', 'category', 'paymentType', 'account']
+
+
+def summarize(start_date, end_date, group_by=('month',), exclude=True):
+    """Server-side totals for a date range; category rules are sent when grouping by category"""
+    categories = EXPENSE_CATEGORIES if 'category' in group_by else None
+    return quickbooks_client.aggregate_purchases(start_date, end_date, group_by,
+                                                 excluded_vendors if exclude else (), categories, DEFAULT_CATEGORY)
+
+
+def print_summary(result, by_total=False):
+    group_by = result['groupBy']
+    groups = result['groups']
+    if by_total:
+        groups = sorted(groups, key=lambda group: group['total'], reverse=True)
+
+    print(f"\n📊 EXPENSES {result['startDate']} → {result['endDate']}")
+    print("=" * 80)
+    print(f"Total (filtered): ${result['total']:,.2f} ({result['count']} transactions)")
+    print(f"Excluded: ${result['excludedTotal']:,.2f} ({result['excludedCount']} transactions)")
+    if not group_by:
+        return
+    print("=" * 80)
+    for group in groups:
+        label = ' | '.join(str(group['key'][field]) for field in group_by)
+        share = group['total'] / result['total'] * 100 if result['total'] else 0
+        print(f"{label[:48]:<48} ${group['total']:>13,.2f} {share:>5.1f}% {group['count']:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print Purchase totals computed by the server's /aggregate endpoint")
+    parser.add_argument('--start', default='2025-01-01', help='First TxnDate (YYYY-MM-DD)')
+    parser.add_argument('--end', default='2025-12-31', help='Last TxnDate (YYYY-MM-DD)')
+    parser.add_argument('--group-by', dest='group_by', action='append', choices=GROUP_KEYS,
+                        help='Group key; repeat for several (default: month)')
+    parser.add_argument('--include-excluded', action='store_true',
+                        help='Count the excluded vendors in the totals too')
+    parser.add_argument('--by-total', action='store_true', help='Order groups by total instead of by key')
+    parser.add_argument('--json', action='store_true', help='Print the raw response as JSON')
+    args = parser.parse_args()
+
+    try:
+        result = summarize(args.start, args.end, args.group_by or ['month'], exclude=not args.include_excluded)
+    except QuickBooksQueryError as e:
+        print(f"Aggregation failed: {e}")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_summary(result, args.by_total)
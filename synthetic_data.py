@@ -0,0 +1,87 @@
+import random
+from datetime import date, timedelta
+
+# Card merchants as (name, location, state, typical amount range)
+CARD_MERCHANTS = [
+    ('HIGHLEVEL INC.', 'GOHIGHLEVEL.C', 'TX', (97, 5000)),
+    ('EXTENDLY FOR HIGHL', 'GETEXTENDLY.C', 'CA', (500, 3500)),
+    ('Google GSUITE_cour', '650-2530000', 'CA', (6, 300)),
+    ('OPENAI *CHATGPT SUBSCR', 'OPENAI.COM', 'CA', (20, 200)),
+    ('ADOBE  *ADOBE', '408-536-6000', 'CA', (20, 90)),
+    ('CHARGEFLOW.IO', 'CHARGEFLOW.IO', 'DE', (50, 800)),
+    ('ONLINEJOBSPH', '888-2225000', 'UT', (69, 350)),
+    ('www.fiverr.com', 'New York', 'NY', (15, 1500)),
+    ('DADGUMMARKETING', '541-9142512', 'WY', (500, 7000)),
+    ('FACEBK *ADS', 'fb.me/ads', 'CA', (100, 4000)),
+    ('SILICON STONKS', 'SILICONSTONKS', 'UT', (100, 2000)),
+    ('Printful Inc.', 'Charlotte', 'NC', (20, 400)),
+    ('PAYPAL *RENTALPROP', '402-935-7733', 'CA', (50, 1500)),
+    ('PAYPAL *ACADEMYVIS', '402-935-7733', 'CA', (50, 1500)),
+]
+
+# Vendors attached to some transactions; the first four are excluded by the reports
+VENDORS = ['Stockton Walbeck', 'Dakota Walbeck', 'Parker Walbeck', 'Canyon Smith',
+           'HighLevel', 'Google', 'OpenAI', 'Wise Inc', 'PayPal']
+
+
+def _card_description(rng, day, merchant, location, state):
+    kind = rng.choice(['RECURRING PAYMENT', 'PURCHASE'])
+    return (f"{kind:<40}AUTHORIZED ON   {day:%m/%d} {merchant:<24}{location:<14}{state}  "
+            f"SXXXXXXXX{rng.randrange(10 ** 7):07d}   CARD {rng.randrange(10 ** 4):04d}")
+
+
+def _description(rng, day):
+    """A bank description in one of the shapes QuickBooks imports from the bank feed, with an amount"""
+    roll = rng.random()
+    if roll < 0.45:
+        merchant, location, state, (low, high) = rng.choice(CARD_MERCHANTS)
+        return _card_description(rng, day, merchant, location, state), round(rng.uniform(low, high), 2)
+    if roll < 0.75:
+        return ("BUSINESS TO BUSINESS ACH Wise Inc         WISE       240517 First half paym Course Creator Pro Inc",
+                round(rng.uniform(200, 8000), 2))
+    if roll < 0.85:
+        return (f"MONEY TRANSFER                          AUTHORIZED ON   {day:%m/%d} PAYPAL *{rng.choice(['erikdevint', 'janedoe', 'affil8'])}"
+                f"        Visa Direct   CA  SXXXXXXXX{rng.randrange(10 ** 7):07d}   CARD {rng.randrange(10 ** 4):04d}",
+                round(rng.uniform(20, 2500), 2))
+    if roll < 0.90:
+        return (f"Payoneer Inc.    {rng.randrange(10 ** 6):06d}                  XXXXX{rng.randrange(10 ** 4):04d} "
+                f"Payoneer ID: {rng.randrange(10 ** 9):09d} Pay To: Contractor Pay", round(rng.uniform(300, 4000), 2))
+    if roll < 0.95:
+        return (f"BUSINESS TO BUSINESS ACH IRS              USATAXPYMT {day:%m%d%y} XXXXXXXX{rng.randrange(10 ** 7):07d} CEO COURSE CREATOR 360",
+                round(rng.uniform(1000, 60000), 2))
+    return '', round(rng.uniform(5, 12000), 2)
+
+
+def generate_purchases(count, start=date(2025, 1, 1), end=date(2025, 12, 31), seed=0):
+    """Yield `count` synthetic Purchase entities in the JSON shape the API returns.
+
+    Dates are spread uniformly over start..end and output is deterministic
+    for a given seed, so runs are reproducible.
+    """
+    rng = random.Random(seed)
+    days = (end - start).days + 1
+    for index in range(count):
+        day = start + timedelta(days=rng.randrange(days))
+        description, amount = _description(rng, day)
+        updated = day + timedelta(days=rng.randrange(3))
+        item = {
+            'id': str(index + 1),
+            'syncToken': '0',
+            'metaData': {
+                'createTime': f"{day.isoformat()}T09:00:00.000+00:00",
+                'lastUpdatedTime': f"{updated.isoformat()}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00.000+00:00"
+            },
+            'txnDate': f"{day.isoformat()}T07:00:00.000+00:00",
+            'totalAmt': amount,
+            'paymentType': 'Check' if rng.random() < 0.1 else 'CreditCard',
+            'accountRef': {'value': '35', 'name': 'Checking'},
+        }
+        # Descriptions land in privateNote, occasionally only in memo
+        if description and rng.random() < 0.05:
+            item['memo'] = description
+        elif description:
+            item['privateNote'] = description
+        if rng.random() < 0.3:
+            vendor = rng.choice(VENDORS)
+            item['entityRef'] = {'value': str(VENDORS.index(vendor) + 1), 'name': vendor, 'type': 'Vendor'}
+        yield item
@@ -0,0 +1,26 @@
+import pytest
+
+from description_index import DescriptionIndex
+from transactions import Transaction
+
+DESCRIPTIONS = [
+    'PAYPAL *HIGHLEVEL 4029357733',
+    'RECURRING PAYMENT AUTHORIZED ON 06/01 OPENAI CHATGPT SUBSCR',
+    'PURCHASE AUTHORIZED ON 06/03 GOOGLE *GSUITE_SOFTWARE',
+    'BUSINESS TO BUSINESS ACH WISE INC',
+    'Software subscription - paypal',
+    '',
+]
+
+
+@pytest.fixture
+def index():
+    return DescriptionIndex(Transaction(str(i), '2025-06-01', 10.0 + i, description, None)
+                            for i, description in enumerate(DESCRIPTIONS * 2))
+
+
+@pytest.mark.parametrize('keyword', ['paypal', 'SOFTWARE', 'PAY', 'ON 06', 'AUTHORIZED ON', ' ON ', 'S TO B',
+                                     '*', 'INC', 'NC', 'GSUITE_SOFT', 'ZOOM', 'N 06/0'])
+def test_lookups_match_a_substring_scan(index, keyword):
+    expected = [p for p, txn in enumerate(index.transactions) if keyword.upper() in txn.description.upper()]
+    assert index.positions(keyword) == expected
@@ -0,0 +1,21 @@
+import pytest
+
+from json_stream import iter_json_array
+
+
+def export(tmp_path, text):
+    path = tmp_path / 'export.json'
+    path.write_text(text)
+    return str(path)
+
+
+def test_elements_are_read_across_chunks(tmp_path):
+    path = export(tmp_path, ' [ {"id": "1", "lines": [1, 2]} ,\n"x", 3.5 ] ')
+    assert list(iter_json_array(path, chunk_size=2)) == [{'id': '1', 'lines': [1, 2]}, 'x', 3.5]
+    assert list(iter_json_array(export(tmp_path, '[ ]'))) == []
+
+
+@pytest.mark.parametrize('text', ['[1 2]', '[1,]', '[1,,2]', '[,1]', '[1}', '[1'])
+def test_malformed_arrays_are_rejected(tmp_path, text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(export(tmp_path, text), chunk_size=2))
@@ -0,0 +1,50 @@
+import pytest
+
+import quickbooks_client
+import report_pipeline
+from period_planner import month_periods
+from quickbooks_standin import SyntheticSource, StandInServer
+from transaction_store import TransactionStore
+
+
+def purchase(id, amount, updated):
+    return {'id': str(id), 'txnDate': '2025-01-15', 'totalAmt': amount, 'privateNote': 'OFFICE SUPPLIES',
+            'entityRef': {'name': 'Staples'}, 'metaData': {'lastUpdatedTime': updated}}
+
+
+@pytest.fixture
+def served(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(report_pipeline, 'months', month_periods('2025-01-01', '2025-01-31'))
+    source = SyntheticSource([purchase(1, 12.5, '2025-01-15T10:00:00Z')])
+    with StandInServer(source, port=0) as server:
+        monkeypatch.setattr(quickbooks_client, '_default_client', quickbooks_client.QuickBooksClient(server.url))
+        yield source
+
+
+def month_report(sinks):
+    path, = sinks[0].month_files(report_pipeline.months[0])
+    with open(path) as f:
+        return f.read()
+
+
+def test_sinks_written_before_a_change_are_regenerated(served, tmp_path):
+    with TransactionStore(str(tmp_path / 'store.db')) as store:
+        report_pipeline.main(report_pipeline.complete_sinks(), store=store)
+        assert '$    12.50' in month_report(report_pipeline.complete_sinks())
+
+        # The sorted run sees the new purchase first and refreshes the shared snapshot
+        served.add([purchase(2, 99.0, '2025-02-01T09:00:00Z')])
+        report_pipeline.main(report_pipeline.sorted_sinks(), store=store)
+        assert '$    99.00' in month_report(report_pipeline.sorted_sinks())
+
+        # The complete report was written before the change, so it must not be reused
+        report_pipeline.main(report_pipeline.complete_sinks(), store=store)
+        assert '$    99.00' in month_report(report_pipeline.complete_sinks())
+
+
+def test_unchanged_months_are_reused(served, tmp_path, capsys):
+    with TransactionStore(str(tmp_path / 'store.db')) as store:
+        report_pipeline.main(report_pipeline.sorted_sinks(), store=store)
+        report_pipeline.main(report_pipeline.sorted_sinks(), store=store)
+    assert 'January: unchanged' in capsys.readouterr().out
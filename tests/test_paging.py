@@ -0,0 +1,92 @@
+import pytest
+
+from quickbooks_client import PagedQuery, QuickBooksClient, purchase_query
+from quickbooks_standin import SyntheticSource, StandInServer
+from synthetic_data import generate_purchases
+
+
+@pytest.fixture
+def capped_server():
+    """Stand-in whose pages hold at most 500 entities, below the client's PAGE_SIZE"""
+    source = SyntheticSource(generate_purchases(6000, seed=1), page_limit=500)
+    with StandInServer(source, port=0) as server:
+        yield server
+
+
+def walk(server, total=None, page_limit=None):
+    client = QuickBooksClient(server.url, page_limit=page_limit)
+    try:
+        paged = PagedQuery(client, purchase_query('2025-01-01', '2025-12-31', 'TxnDate'), total=total)
+        return list(paged), paged.stats['requests'], client.page_limit
+    finally:
+        client.close()
+
+
+def test_counted_walk_detects_pages_capped_below_maxresults(capped_server):
+    items, requests, page_limit = walk(capped_server, total=6000)
+
+    assert len(items) == 6000
+    assert len({item['id'] for item in items}) == 6000
+    assert [item['txnDate'] for item in items] == sorted(item['txnDate'] for item in items)
+    # 12 pages of 500, then an empty page since the last one was full
+    assert requests == 13
+    assert page_limit == 500
+
+
+def test_configured_page_limit_pages_past_the_cap(capped_server):
+    items, requests, _ = walk(capped_server, page_limit=500)
+
+    assert len(items) == 6000
+    assert requests == 13
+
+
+def test_short_page_ends_the_walk():
+    with StandInServer(SyntheticSource(generate_purchases(5500, seed=1)), port=0) as server:
+        items, requests, page_limit = walk(server)
+
+    assert len(items) == 5500
+    # Five full pages and a short one; no empty page to confirm the end
+    assert requests == 6
+    assert page_limit is None
+
+
+def test_paging_stops_on_empty_first_page(capped_server):
+    client = QuickBooksClient(capped_server.url)
+    try:
+        paged = PagedQuery(client, purchase_query('2030-01-01', '2030-12-31'))
+        assert list(paged) == []
+    finally:
+        client.close()
+    assert paged.stats['requests'] == 1
+
+
+def test_paginated_batch_follows_capped_pages(capped_server):
+    client = QuickBooksClient(capped_server.url)
+    try:
+        results, errors = client.batch_query({'year': purchase_query('2025-01-01', '2025-12-31')}, paginate=True)
+    finally:
+        client.close()
+
+    assert errors == {}
+    assert len(results['year']) == 6000
+    assert len({item['id'] for item in results['year']}) == 6000
+
+
+def test_paged_walks_bypass_the_server_cache(capped_server, monkeypatch):
+    client = QuickBooksClient(capped_server.url)
+    payloads = []
+    send = client.request
+
+    def recording_request(method, path, payload=None, stats=None):
+        payloads.append(payload)
+        return send(method, path, payload, stats)
+
+    monkeypatch.setattr(client, 'request', recording_request)
+    try:
+        list(PagedQuery(client, purchase_query('2025-01-01', '2025-01-31')))
+        client.query(purchase_query('2025-01-01', '2025-01-31'))
+    finally:
+        client.close()
+
+    assert all(payload['cache'] is False for payload in payloads[:-1])
+    assert 'cache' not in payloads[-1]
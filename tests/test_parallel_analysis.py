@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+import pytest
+
+import parallel_analysis
+from advanced_sorting_tools import analyze_spending_patterns, rule_patterns
+from categorize_expenses import analyze_expenses_by_category
+from synthetic_data import generate_purchases
+from transactions import parse_purchases
+
+
+@pytest.fixture(scope='module')
+def purchases():
+    items = list(generate_purchases(3000, seed=6))
+    # Equal largest amounts in one category on both sides of every shard boundary, to test top-3 ties
+    for index in (5, 900, 1100, 2100, 2900):
+        items[index].update({'totalAmt': 99999.99, 'privateNote': 'HIGHLEVEL SUBSCRIPTION TIE'})
+        items[index].pop('entityRef', None)
+    return items
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    monkeypatch.setattr(parallel_analysis, 'MIN_PARALLEL_ROWS', 10)
+    return 3
+
+
+def summarize_categories(result):
+    categories, excluded_total, excluded_count = result
+    return ([(category, data['total'], data['count'], [t.id for t in data['transactions']],
+              [t.id for t in data['top'].results()]) for category, data in categories.items()],
+            excluded_total, excluded_count)
+
+
+def ordered(result):
+    """Nested dicts as lists of items, so comparisons also check key order"""
+    return {key: list(value.items()) for key, value in result.items()}
+
+
+def test_category_analysis_is_identical_in_a_pool(purchases, pooled):
+    serial = summarize_categories(analyze_expenses_by_category(purchases, 'Test'))
+    parallel = summarize_categories(analyze_expenses_by_category(purchases, 'Test', workers=pooled))
+
+    assert parallel == serial
+    ties = [top for category, _, _, _, top in serial[0] if category == 'Software & SaaS']
+    assert ties == [['6', '901', '1101']]
+
+
+def test_spending_patterns_are_identical_in_a_pool(purchases, pooled):
+    transactions = list(parse_purchases(purchases))
+    assert ordered(analyze_spending_patterns(transactions, pooled)) == ordered(analyze_spending_patterns(transactions))
+
+
+def test_rule_patterns_are_identical_in_a_pool(purchases, pooled):
+    transactions = list(parse_purchases(purchases))
+    assert ordered(rule_patterns(transactions, pooled)) == ordered(rule_patterns(transactions))
+
+
+def test_cent_totals_agree_with_float_sums_to_the_cent(purchases):
+    transactions = list(parse_purchases(purchases))
+    vendors = defaultdict(float)
+    for txn in transactions:
+        vendors[txn.display_vendor()] += txn.amount
+
+    patterns = analyze_spending_patterns(transactions)
+
+    assert list(patterns['vendors']) == sorted(vendors, key=vendors.get, reverse=True)
+    assert patterns['vendors'] == {vendor: round(total, 2) for vendor, total in vendors.items()}
+
+
+def test_shards_are_contiguous_and_cover_every_row():
+    assert parallel_analysis.shard_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert parallel_analysis.shard_bounds(2, 4) == [(0, 1), (1, 2)]
+    assert parallel_analysis.shard_bounds(0, 4) == [(0, 0)]
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+
+import quickbooks_client
+from period_planner import PeriodStream, fetch_periods, merge_windows, month_periods, plan_windows, split_window
+from quickbooks_standin import SyntheticSource, StandInServer
+from synthetic_data import generate_purchases
+
+CAP = 200
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """Busy 2025 plus a sparse 2024, served to the shared client"""
+    items = list(generate_purchases(3000, seed=2))
+    for offset, item in enumerate(generate_purchases(150, start=date(2024, 1, 1), end=date(2024, 12, 31), seed=3)):
+        item['id'] = str(10000 + offset)
+        items.append(item)
+    with StandInServer(SyntheticSource(items), port=0) as server:
+        client = quickbooks_client.QuickBooksClient(server.url)
+        monkeypatch.setattr(quickbooks_client, '_default_client', client)
+        yield server
+        client.close()
+
+
+def test_split_window_covers_every_day_once():
+    assert split_window(('2025-01-01', '2025-01-31'), 3) == (
+        ('2025-01-01', '2025-01-10'), ('2025-01-11', '2025-01-20'), ('2025-01-21', '2025-01-31'))
+    assert split_window(('2025-01-01', '2025-01-02'), 5) == (('2025-01-01', '2025-01-01'), ('2025-01-02', '2025-01-02'))
+
+
+def test_merge_windows_joins_only_adjacent_windows_that_fit():
+    windows = [('2025-01-01', '2025-01-31'), ('2025-02-01', '2025-02-28'), ('2025-03-01', '2025-03-31'),
+               ('2025-05-01', '2025-05-31')]
+    counts = dict(zip(windows, [10, 20, 990, 5]))
+    assert merge_windows(windows, counts, 1000) == [
+        ('2025-01-01', '2025-02-28', 30), ('2025-03-01', '2025-03-31', 990), ('2025-05-01', '2025-05-31', 5)]
+
+
+def test_plan_windows_fit_the_cap(served):
+    windows = plan_windows([(month['start'], month['end']) for month in month_periods('2024-01-01', '2025-12-31')], CAP)
+    assert all(expected < CAP for _, _, expected in windows)
+    assert sum(expected for _, _, expected in windows) == 3150
+    # The sparse year shares windows across months, the busy one splits them
+    assert len([window for window in windows if window[0] < '2025']) < 12
+    assert len([window for window in windows if window[0] >= '2025']) > 12
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_planned_fetch_matches_per_month_queries(served, batch):
+    months = month_periods('2024-01-01', '2025-12-31')
+    stats = {}
+    fetched = {index: data for index, _, data, error in
+               fetch_periods(months, 'TxnDate DESC', max_workers=3, batch=batch, stats=stats, cap=CAP)
+               if error is None}
+
+    assert sorted(fetched) == list(range(len(months)))
+    for index, month in enumerate(months):
+        expected = quickbooks_client.get_month_data(month['start'], month['end'], 'TxnDate DESC')
+        assert isinstance(fetched[index], PeriodStream)
+        assert [item['id'] for item in fetched[index]] == [item['id'] for item in expected], month['label']
+    assert stats['requests'] >= 1
+
+
+def test_streamed_months_keep_their_own_transfer_stats(served):
+    months = month_periods('2025-01-01', '2025-12-31')
+    stats = {}
+    requests = 0
+    for _, month, data, error in fetch_periods(months, 'TxnDate DESC', stats=stats, cap=CAP):
+        assert error is None
+        list(data)
+        # Every planned window fits one page, and its short page ends the walk
+        assert data.stats['requests'] == len(data.sources), month['label']
+        requests += data.stats['requests']
+    # Busy months never share a window, so nothing lands in the run-level counters
+    assert stats == {}
+    assert requests > 12
@@ -0,0 +1,62 @@
+from datetime import date
+
+import pytest
+
+import quickbooks_client
+import recurring_expenses
+from quickbooks_standin import SyntheticSource, StandInServer
+from recurring_expenses import RecurringDetector, detect_recurring
+from transaction_store import TransactionStore
+from transactions import Transaction
+
+
+def monthly(vendor, amount, months, day=15, id_prefix=None):
+    return [Transaction(f"{id_prefix}{month}" if id_prefix else None, f"2025-{month:02d}-{day:02d}", amount,
+                        f"{vendor} SUBSCRIPTION", vendor, vendor)
+            for month in months]
+
+
+def test_transactions_without_ids_are_not_deduplicated():
+    transactions = sorted(monthly('Netflix', 15.99, range(1, 7)) + monthly('Spotify', 9.99, range(1, 7)),
+                          key=lambda txn: txn.date)
+    detector = RecurringDetector()
+
+    assert detector.extend(transactions) == 12
+    assert {r['vendor']: r['count'] for r in detect_recurring(transactions)} == {'Netflix': 6, 'Spotify': 6}
+
+
+def test_same_day_ids_are_skipped_once_fed():
+    transactions = monthly('Netflix', 15.99, range(1, 4), id_prefix='n')
+    detector = RecurringDetector()
+    detector.extend(transactions)
+
+    assert detector.add(transactions[-1]) is False
+    assert detector.vendors['Netflix'].count == 3
+
+
+def purchase(id, txn_date, updated, amount=15.99):
+    return {'id': str(id), 'txnDate': txn_date, 'totalAmt': amount, 'privateNote': 'NETFLIX.COM SUBSCRIPTION',
+            'entityRef': {'name': 'Netflix'}, 'metaData': {'lastUpdatedTime': updated}}
+
+
+@pytest.fixture
+def served(monkeypatch):
+    items = [purchase(month, f"2025-{month:02d}-15", f"2025-{month:02d}-15T10:00:00Z") for month in (1, 2, 3, 5, 6)]
+    source = SyntheticSource(items)
+    with StandInServer(source, port=0) as server:
+        monkeypatch.setattr(quickbooks_client, '_default_client', quickbooks_client.QuickBooksClient(server.url))
+        yield source
+
+
+def test_backdated_purchases_are_fed_on_the_next_run(served, tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    with TransactionStore(str(tmp_path / 'store.db')) as store:
+        first = recurring_expenses.main(store, state_path, as_of=date(2025, 6, 20))
+        assert [(r['vendor'], r['count']) for r in first] == [('Netflix', 5)]
+
+        # April's charge is entered late, after the run that already moved past it
+        served.add([purchase(4, '2025-04-15', '2025-06-30T09:00:00Z')])
+        second = recurring_expenses.main(store, state_path, as_of=date(2025, 6, 20))
+
+    assert [(r['vendor'], r['cadence'], r['count']) for r in second] == [('Netflix', 'monthly', 6)]
+    assert second[0]['average_interval'] == pytest.approx((date(2025, 6, 15) - date(2025, 1, 15)).days / 5)
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+import quickbooks_client
+import report_pipeline
+from period_planner import month_periods
+from quickbooks_standin import ReplaySource, SyntheticSource, StandInServer
+from synthetic_data import generate_purchases
+
+
+@pytest.fixture
+def quarter(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(report_pipeline, 'months', month_periods('2025-01-01', '2025-03-31'))
+
+
+def run_pipeline(monkeypatch, source, record_dir=None, batch=False):
+    """Run the default planned pipeline against source; returns every report file's contents"""
+    with StandInServer(source, port=0) as server:
+        client = quickbooks_client.QuickBooksClient(server.url, record_dir=record_dir)
+        monkeypatch.setattr(quickbooks_client, '_default_client', client)
+        try:
+            report_pipeline.main(report_pipeline.sorted_sinks(), batch=batch)
+        finally:
+            client.close()
+    reports = {}
+    for root, _, names in os.walk(report_pipeline.REPORT_DIR):
+        for name in names:
+            with open(os.path.join(root, name)) as f:
+                reports[name] = f.read()
+    return reports
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_recorded_pipeline_replays_without_a_fallback(quarter, monkeypatch, tmp_path, batch):
+    fixtures = str(tmp_path / 'fixtures')
+    recorded = run_pipeline(monkeypatch, SyntheticSource(generate_purchases(3000, seed=7), page_limit=500),
+                            record_dir=fixtures, batch=batch)
+    replayed = run_pipeline(monkeypatch, ReplaySource(fixtures), batch=batch)
+
+    assert len(recorded) == 4
+    assert replayed == recorded
+
+
+def test_recorded_aggregate_replays(tmp_path):
+    fixtures = str(tmp_path / 'fixtures')
+    responses = []
+    for source in (SyntheticSource(generate_purchases(500, seed=8)), None):
+        with StandInServer(source or ReplaySource(fixtures), port=0) as server:
+            client = quickbooks_client.QuickBooksClient(server.url, record_dir=fixtures if source else None)
+            try:
+                responses.append(client.aggregate('2025-01-01', '2025-06-30', ('month', 'vendor'), ['Canyon Smith']))
+            finally:
+                client.close()
+
+    assert responses[0]['count'] > 0
+    assert responses[1] == responses[0]
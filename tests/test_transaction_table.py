@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+import advanced_sorting_tools
+from advanced_sorting_tools import generate_sorting_report, process_transactions
+from categorize_expenses import analyze_expenses_by_category
+from synthetic_data import generate_purchases
+from transaction_table import TransactionTable
+
+
+def summarize(result):
+    categories, excluded_total, excluded_count = result
+    return ([(category, data['total'], data['count'], [t.id for t in data['transactions']],
+              [t.id for t in data['top'].results()]) for category, data in categories.items()],
+            excluded_total, excluded_count)
+
+
+def test_category_analysis_on_a_table_matches_raw_purchases():
+    purchases = list(generate_purchases(5000, seed=4))
+    # Some excluded vendors, so the exclusion mask has work to do
+    for item in purchases[::50]:
+        item['entityRef'] = {'name': 'Canyon Smith'}
+
+    from_table = analyze_expenses_by_category(TransactionTable.from_purchases(purchases), 'Test')
+    from_purchases = analyze_expenses_by_category(purchases, 'Test')
+
+    assert summarize(from_table) == summarize(from_purchases)
+    assert from_table[2] >= 100
+
+
+def test_process_transactions_filters_a_table():
+    purchases = list(generate_purchases(500, seed=5))
+    purchases[0]['entityRef'] = {'name': 'Dakota Walbeck'}
+
+    from_table = process_transactions(TransactionTable.from_purchases(purchases))
+    from_purchases = process_transactions(purchases)
+
+    assert [(t.id, t.normalized_vendor) for t in from_table] == [(t.id, t.normalized_vendor) for t in from_purchases]
+    assert purchases[0]['id'] not in {t.id for t in from_table}
+
+
+def test_sorting_report_on_a_table_matches_raw_purchases(monkeypatch, capsys):
+    purchases = list(generate_purchases(2000, seed=6))
+    for item in purchases[::40]:
+        item['entityRef'] = {'name': 'Parker Walbeck'}
+
+    def report(data):
+        monkeypatch.setattr(advanced_sorting_tools, 'get_month_data', lambda start, end: data)
+        result = generate_sorting_report('June', '2025-06-01', '2025-06-30')
+        return result, capsys.readouterr().out
+
+    from_table, table_output = report(TransactionTable.from_purchases(purchases))
+    from_purchases, purchases_output = report(purchases)
+
+    assert table_output == purchases_output
+    assert [t.id for t in from_table['large_transactions']] == [t.id for t in from_purchases['large_transactions']]
+    assert from_table['recurring'].keys() == from_purchases['recurring'].keys()
+    assert from_table['patterns'] == from_purchases['patterns']
+
+
+def test_grouping_by_category_needs_categories():
+    table = TransactionTable.from_purchases(generate_purchases(10))
+    with pytest.raises(ValueError, match='categorize'):
+        table.group_sum('category')
@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import quickbooks_client
+
+# Local SQLite copy of QuickBooks Purchase entities
+STORE_PATH = os.environ.get('QUICKBOOKS_STORE_PATH', 'quickbooks_store.db')
+
+# Rows are written to SQLite in batches of this size during a sync
+SYNC_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS purchases (
+    id TEXT PRIMARY KEY,
+    txn_date TEXT NOT NULL,
+    last_updated TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS purchases_txn_date ON purchases (txn_date);
+CREATE TABLE IF NOT EXISTS sync_state (
+    entity TEXT PRIMARY KEY,
+    last_updated TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+def normalize_timestamp(value):
+    """Convert a serialized QuickBooks timestamp to a sortable UTC ISO string"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        # Jackson may serialize java.util.Date as epoch milliseconds
+        parsed = datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    else:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def last_updated_of(item):
+    """MetaData.LastUpdatedTime of a serialized entity, normalized"""
+    meta = item.get('metaData') or item.get('MetaData') or {}
+    return normalize_timestamp(meta.get('lastUpdatedTime') or meta.get('LastUpdatedTime'))
+
+
+class TransactionStore:
+    """On-disk store of Purchase entities keyed by transaction Id"""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def watermark(self):
+        """Latest LastUpdatedTime already synced, or None before the first sync"""
+        row = self.conn.execute(
+            "SELECT last_updated FROM sync_state WHERE entity = 'Purchase'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def _upsert(self, items):
+        rows = []
+        for item in items:
+            date = item.get('txnDate') or ''
+            rows.append((str(item.get('id')), date[:10], last_updated_of(item), json.dumps(item)))
+        self.conn.executemany(
+            "INSERT INTO purchases (id, txn_date, last_updated, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET txn_date = excluded.txn_date, "
+            "last_updated = excluded.last_updated, data = excluded.data",
+            rows
+        )
+
+    def sync(self, full=False):
+        """Pull Purchases changed since the last sync and return how many were stored.
+
+        The query endpoint does not report deletions, so a full resync also
+        drops local rows that no longer exist in QuickBooks.
+        """
+        since = None if full else self.watermark()
+        query = "SELECT * FROM Purchase"
+        if since:
+            # >= so entities sharing the watermark second are never missed; upserts are idempotent
+            query += f" WHERE MetaData.LastUpdatedTime >= '{since}'"
+        query += " ORDER BY MetaData.LastUpdatedTime"
+
+        newest = since
+        seen_ids = set() if full else None
+        batch = []
+        synced = 0
+        with self.conn:
+            # Paged walks are never served from the server's cache, so a repeated sync sees new rows
+            for item in quickbooks_client.iter_query(query):
+                batch.append(item)
+                updated = last_updated_of(item)
+                if updated and (newest is None or updated > newest):
+                    newest = updated
+                if seen_ids is not None:
+                    seen_ids.add(str(item.get('id')))
+                if len(batch) >= SYNC_BATCH_SIZE:
+                    self._upsert(batch)
+                    synced += len(batch)
+                    batch = []
+            if batch:
+                self._upsert(batch)
+                synced += len(batch)
+
+            if seen_ids is not None:
+                stale = [(row[0],) for row in self.conn.execute("SELECT id FROM purchases")
+                         if row[0] not in seen_ids]
+                self.conn.executemany("DELETE FROM purchases WHERE id = ?", stale)
+
+            if newest:
+                self.conn.execute(
+                    "INSERT INTO sync_state (entity, last_updated, synced_at) VALUES ('Purchase', ?, ?) "
+                    "ON CONFLICT(entity) DO UPDATE SET last_updated = excluded.last_updated, "
+                    "synced_at = excluded.synced_at",
+                    (newest, datetime.now(timezone.utc).replace(microsecond=0).isoformat())
+                )
+        return synced
+
+    def iter_month_data(self, start_date, end_date, descending=False):
+        """Yield stored Purchase entities for a date range, ordered by TxnDate"""
+        order = 'DESC' if descending else 'ASC'
+        cursor = self.conn.execute(
+            f"SELECT data FROM purchases WHERE txn_date >= ? AND txn_date <= ? ORDER BY txn_date {order}, id",
+            (start_date, end_date)
+        )
+        for (data,) in cursor:
+            yield json.loads(data)
+
+    def get_month_data(self, start_date, end_date, descending=False):
+        """Stored Purchase entities for a date range as a list"""
+        return list(self.iter_month_data(start_date, end_date, descending))
+
+    def fingerprint(self, start_date, end_date):
+        """Content hash of the stored entities in a date range; changes whenever any of them does"""
+        digest = hashlib.sha256()
+        cursor = self.conn.execute(
+            "SELECT id, data FROM purchases WHERE txn_date >= ? AND txn_date <= ? ORDER BY id",
+            (start_date, end_date)
+        )
+        for id, data in cursor:
+            digest.update(f"{id}\0{data}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def count_changed(self, before_date, updated_after):
+        """Stored Purchases dated before a day whose LastUpdatedTime is after a timestamp"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM purchases WHERE txn_date < ? AND last_updated > ?",
+            (before_date, updated_after)
+        ).fetchone()[0]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM purchases").fetchone()[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync QuickBooks Purchases into the local store")
+    parser.add_argument('--full', action='store_true', help='Re-download everything and drop deleted rows')
+    parser.add_argument('--path', default=STORE_PATH, help='SQLite store path')
+    args = parser.parse_args()
+
+    with TransactionStore(args.path) as store:
+        previous = store.watermark()
+        print(f"Syncing Purchases {'(full)' if args.full or not previous else f'changed since {previous}'}...")
+        synced = store.sync(full=args.full)
+        print(f"  ✓ {synced} transactions updated, {store.count()} stored")
@@ -0,0 +1,230 @@
+import numpy as np
+
+from transactions import NO_VENDOR, Transaction, parse_purchases
+
+
+class StringPool:
+    """Interns strings to dense integer codes"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, values):
+        """Codes for a list of strings (-1 for strings not in the pool)"""
+        return np.array([self.codes.get(value, -1) for value in values], dtype=np.int32)
+
+
+class TransactionTable:
+    """Columnar, array-backed set of transactions.
+
+    Amounts are integer cents, dates are datetime64[D] (NaT when missing) and
+    vendors, descriptions and categories are codes into shared string pools,
+    so filters, group-bys and sorts run as NumPy operations instead of loops
+    over one dict per transaction.
+    """
+
+    def __init__(self, amount_cents, dates, vendor_codes, description_codes,
+                 vendors, descriptions, category_codes=None, categories=None, ids=None):
+        self.ids = ids
+        self.amount_cents = amount_cents
+        self.dates = dates
+        self.vendor_codes = vendor_codes
+        self.description_codes = description_codes
+        self.vendors = vendors
+        self.descriptions = descriptions
+        self.category_codes = category_codes
+        self.categories = categories
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """Build from Transaction records"""
+        vendors = StringPool()
+        descriptions = StringPool()
+        ids = []
+        amounts = []
+        dates = []
+        vendor_codes = []
+        description_codes = []
+        for txn in transactions:
+            ids.append(txn.id)
+            amounts.append(round(txn.amount * 100))
+            dates.append(txn.date if txn.date and txn.date != 'N/A' else 'NaT')
+            vendor_codes.append(vendors.code(txn.vendor))
+            description_codes.append(descriptions.code(txn.description))
+        return cls(
+            np.array(amounts, dtype=np.int64),
+            np.array(dates, dtype='datetime64[D]'),
+            np.array(vendor_codes, dtype=np.int32),
+            np.array(description_codes, dtype=np.int32),
+            vendors,
+            descriptions,
+            ids=np.array(ids, dtype=object),
+        )
+
+    @classmethod
+    def from_purchases(cls, items):
+        """Build from raw Purchase JSON entities"""
+        return cls.from_transactions(parse_purchases(items))
+
+    @classmethod
+    def concat(cls, tables):
+        """One table holding the rows of several, with their string pools merged"""
+        vendors = StringPool()
+        descriptions = StringPool()
+        vendor_codes = []
+        description_codes = []
+        for table in tables:
+            # Re-code each table's rows through the merged pools
+            vendor_map = np.array([vendors.code(v) for v in table.vendors.values], dtype=np.int32)
+            description_map = np.array([descriptions.code(d) for d in table.descriptions.values], dtype=np.int32)
+            vendor_codes.append(vendor_map[table.vendor_codes] if len(vendor_map) else table.vendor_codes)
+            description_codes.append(description_map[table.description_codes] if len(description_map) else table.description_codes)
+        return cls(
+            np.concatenate([t.amount_cents for t in tables] or [np.zeros(0, dtype=np.int64)]),
+            np.concatenate([t.dates for t in tables] or [np.zeros(0, dtype='datetime64[D]')]),
+            np.concatenate(vendor_codes or [np.zeros(0, dtype=np.int32)]),
+            np.concatenate(description_codes or [np.zeros(0, dtype=np.int32)]),
+            vendors,
+            descriptions,
+            ids=np.concatenate([t.ids if t.ids is not None else np.full(len(t), None, dtype=object) for t in tables]
+                               or [np.zeros(0, dtype=object)]),
+        )
+
+    def __len__(self):
+        return len(self.amount_cents)
+
+    def take(self, selector):
+        """New table with the rows picked by a boolean mask or index array"""
+        return TransactionTable(
+            self.amount_cents[selector],
+            self.dates[selector],
+            self.vendor_codes[selector],
+            self.description_codes[selector],
+            self.vendors,
+            self.descriptions,
+            self.category_codes[selector] if self.category_codes is not None else None,
+            self.categories,
+            self.ids[selector] if self.ids is not None else None,
+        )
+
+    # Masks
+
+    def vendor_mask(self, vendor_names):
+        """Boolean mask of rows whose vendor is one of vendor_names"""
+        codes = self.vendors.lookup(list(vendor_names))
+        return np.isin(self.vendor_codes, codes[codes >= 0])
+
+    def amount_mask(self, minimum):
+        return self.amount_cents >= round(minimum * 100)
+
+    def description_mask(self, keyword):
+        """Rows whose description contains keyword (case-insensitive); each distinct description is checked once"""
+        keyword = keyword.upper()
+        matches = np.fromiter((keyword in d.upper() for d in self.descriptions.values),
+                              dtype=bool, count=len(self.descriptions.values))
+        return matches[self.description_codes]
+
+    # Aggregates
+
+    def total(self):
+        return int(self.amount_cents.sum()) / 100
+
+    def categorize(self, categorize_many):
+        """Assign category codes by categorizing each distinct description once"""
+        categories = StringPool()
+        per_description = [categories.code(category)
+                           for category in categorize_many(self.descriptions.values)]
+        self.categories = categories
+        self.category_codes = np.array(per_description, dtype=np.int32)[self.description_codes] \
+            if per_description else np.zeros(0, dtype=np.int32)
+        return self
+
+    def group_sum(self, by):
+        """{key: (total, count)} grouped by 'vendor', 'category', 'date' or 'month'"""
+        if by == 'category' and self.category_codes is None:
+            raise ValueError("Table has no categories yet; call categorize() before grouping by category")
+        if by in ('vendor', 'category'):
+            codes = self.vendor_codes if by == 'vendor' else self.category_codes
+            names = (self.vendors if by == 'vendor' else self.categories).values
+            totals = np.bincount(codes, weights=self.amount_cents, minlength=len(names))
+            counts = np.bincount(codes, minlength=len(names))
+            return {names[i]: (int(totals[i]) / 100, int(counts[i])) for i in np.flatnonzero(counts)}
+
+        unit = 'D' if by == 'date' else 'M'
+        valid = ~np.isnat(self.dates)
+        keys, inverse = np.unique(self.dates[valid].astype(f'datetime64[{unit}]'), return_inverse=True)
+        totals = np.bincount(inverse, weights=self.amount_cents[valid], minlength=len(keys))
+        counts = np.bincount(inverse, minlength=len(keys))
+        return {str(key): (int(totals[i]) / 100, int(counts[i])) for i, key in enumerate(keys)}
+
+    # Ordering
+
+    def sort_by_amount(self, descending=True):
+        """Row order by amount; ties keep their input order like list.sort"""
+        keys = -self.amount_cents if descending else self.amount_cents
+        return np.argsort(keys, kind='stable')
+
+    def top_k(self, k, descending=True):
+        """Row indices of the k largest (or smallest) amounts, in order"""
+        if k >= len(self):
+            return self.sort_by_amount(descending)
+        keys = -self.amount_cents if descending else self.amount_cents
+        if k <= 0:
+            return np.zeros(0, dtype=np.intp)
+        # Everything strictly better than the k-th key, then the earliest ties, as a stable sort would pick
+        kth = np.partition(keys, k - 1)[k - 1]
+        better = np.flatnonzero(keys < kth)
+        ties = np.flatnonzero(keys == kth)[:k - len(better)]
+        candidates = np.concatenate([better, ties])
+        candidates.sort()
+        return candidates[np.argsort(keys[candidates], kind='stable')]
+
+    # Conversion
+
+    def to_transactions(self, indices=None):
+        """Transaction records for the given rows (all rows by default)"""
+        if indices is None:
+            indices = np.arange(len(self))
+        records = []
+        for i in indices:
+            date = self.dates[i]
+            records.append(Transaction(
+                self.ids[i] if self.ids is not None else None,
+                'N/A' if np.isnat(date) else str(date),
+                int(self.amount_cents[i]) / 100,
+                self.descriptions.values[self.description_codes[i]],
+                self.vendors.values[self.vendor_codes[i]]
+            ))
+        return records
+
+
+def month_summary(table, excluded_vendors):
+    """Same result as the report scripts' process_month_data, computed on a table"""
+    excluded = table.vendor_mask(excluded_vendors)
+    included = table.take(~excluded)
+    return {
+        'transactions': included.to_transactions(included.sort_by_amount()),
+        'total': included.total(),
+        'count': len(included),
+        'excluded_total': int(table.amount_cents[excluded].sum()) / 100,
+        'excluded_count': int(excluded.sum())
+    }
+
+
+def spending_patterns(table):
+    """Same result as advanced_sorting_tools.analyze_spending_patterns, computed on a table"""
+    vendors = table.group_sum('vendor')
+    return {
+        'monthly': {month: total for month, (total, _) in table.group_sum('month').items()},
+        'daily': {day: total for day, (total, _) in table.group_sum('date').items()},
+        'vendors': dict(sorted(((vendor or NO_VENDOR, total) for vendor, (total, _) in vendors.items()),
+                               key=lambda x: x[1], reverse=True))
+    }
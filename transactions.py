@@ -0,0 +1,60 @@
+import sys
+
+NO_DESCRIPTION = 'No Description Available'
+NO_VENDOR = 'No Vendor Listed'
+
+# The Purchase properties parse_purchase reads; queries can ask the server for only these
+PURCHASE_FIELDS = ('id', 'txnDate', 'totalAmt', 'privateNote', 'memo', 'entityRef.name')
+
+
+class Transaction:
+    """Compact record of the Purchase fields the reports use.
+
+    Vendor and description strings are interned, so the recurring values
+    shared by thousands of transactions are stored once.
+    """
+
+    __slots__ = ('id', 'date', 'amount', 'description', 'vendor', 'normalized_vendor')
+
+    def __init__(self, id, date, amount, description, vendor, normalized_vendor=None):
+        self.id = id
+        self.date = date
+        self.amount = amount
+        self.description = description
+        self.vendor = vendor
+        self.normalized_vendor = normalized_vendor
+
+    def __repr__(self):
+        return f"Transaction({self.id!r}, {self.date!r}, {self.amount!r}, {self.description!r}, {self.vendor!r})"
+
+    def display_description(self, limit=None):
+        """Description for reports, with the standard placeholder when missing"""
+        description = self.description or NO_DESCRIPTION
+        return description[:limit] if limit is not None else description
+
+    def display_vendor(self, placeholder=NO_VENDOR):
+        return self.vendor or placeholder
+
+
+def parse_purchase(item):
+    """Turn one raw Purchase JSON entity into a Transaction.
+
+    The description is the bank text from privateNote, falling back to memo
+    when privateNote is missing or empty; a missing vendor is ''.
+    """
+    date = item.get('txnDate') or 'N/A'
+    description = item.get('privateNote') or item.get('memo') or ''
+    vendor = (item.get('entityRef') or {}).get('name') or ''
+    return Transaction(
+        item.get('id'),
+        date[:10] if date != 'N/A' else 'N/A',
+        float(item.get('totalAmt') or 0),
+        sys.intern(description),
+        sys.intern(vendor)
+    )
+
+
+def parse_purchases(items):
+    """Lazily parse an iterable of raw Purchase entities"""
+    for item in items:
+        yield parse_purchase(item)
@@ -0,0 +1,187 @@
+import os
+import re
+
+# The keyword maps are read from the rules document so it stays the single source of truth
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vendor-normalization-rules.md')
+
+UNKNOWN_VENDOR = 'Unknown Vendor'
+
+# Pattern-based rules (same regexes as normalizeVendorName in public/index.html)
+ACH_PATTERN = re.compile(r'BUSINESS TO BUSINESS ACH\s+([^0-9\s]+)')
+RECURRING_PATTERNS = [
+    re.compile(r'RECURRING PAYMENT.*?ON\s+\d{2}/\d{2}\s+([^0-9]+?)(?:\s+[A-Z]{2,}|$)'),
+    re.compile(r'AUTHORIZED ON\s+\d{2}/\d{2}\s+([^0-9]+?)(?:\s+[A-Z]{2,}|$)'),
+]
+PURCHASE_PATTERN = re.compile(r'AUTHORIZED ON\s+\d{2}/\d{2}\s+([^0-9]+?)(?:\s+[A-Z]{2,}|$)')
+PAYPAL_PATTERN = re.compile(r'PAYPAL \*([^X\s]+)')
+COMPANY_SUFFIX = re.compile(r'\s+(INC\.?|LLC|CORP\.?).*$')
+TRAILING_DOMAIN = re.compile(r'\s+[A-Z]{2,3}\.[A-Z]{2,}.*$')
+TRAILING_PHONE = re.compile(r'\s+\d{3}-\d{3}-\d{4}.*$')
+
+# Cleanup rules
+PREFIXES = [
+    re.compile(r'^RECURRING PAYMENT\s*'),
+    re.compile(r'^AUTHORIZED ON\s*'),
+    re.compile(r'^PURCHASE\s*'),
+    re.compile(r'^BUSINESS TO BUSINESS ACH\s*'),
+    re.compile(r'^DNH\*\s*'),
+]
+CLEANUP_PATTERNS = [
+    re.compile(r'S[X]+\d+'),                                    # card numbers
+    re.compile(r'\d{6,}'),                                      # reference ids
+    re.compile(r'\d{3}-\d{3}-\d{4}'),                           # phone numbers
+    re.compile(r'(https?://[^\s]+|[a-z]+\.[a-z]{2,})', re.I),   # URLs and domains
+    re.compile(r'\b[A-Z]{2}\s+.*$'),                            # state codes and trailing info
+    COMPANY_SUFFIX,
+]
+WHITESPACE = re.compile(r'\s+')
+
+# Case normalization
+WORD_START = re.compile(r'\b\w', re.ASCII)
+SPECIAL_CASES = {
+    'Ai': 'AI',
+    'Api': 'API',
+    'Crm': 'CRM',
+    'Sms': 'SMS',
+    'Io': 'IO',
+    'Github': 'GitHub',
+    'Paypal': 'PayPal',
+    'Godaddy': 'GoDaddy',
+    'Gohighlevel': 'GoHighLevel',
+    'Openai': 'OpenAI',
+}
+SPECIAL_CASE_PATTERN = re.compile(r'\b(' + '|'.join(SPECIAL_CASES) + r')\b')
+
+_MAP_BLOCK = re.compile(r'const\s+(\w+VendorMap)\s*=\s*\{(.*?)\};', re.S)
+_MAP_ENTRY = re.compile(r'"([^"]+)"\s*:\s*"([^"]+)"')
+
+
+def load_keyword_maps(path=RULES_PATH):
+    """Parse the keyword → vendor maps from vendor-normalization-rules.md, in document order"""
+    with open(path, 'r') as f:
+        text = f.read()
+    keyword_maps = [(name, _MAP_ENTRY.findall(body)) for name, body in _MAP_BLOCK.findall(text)]
+    if not keyword_maps:
+        raise ValueError(f"No vendor keyword maps found in {path}")
+    return keyword_maps
+
+
+def apply_pattern_rules(description):
+    """Extract a vendor from structured bank descriptions, or None"""
+    if 'BUSINESS TO BUSINESS ACH' in description:
+        if 'WISE' in description:
+            return 'Wise'
+        match = ACH_PATTERN.search(description)
+        if match:
+            return match.group(1).strip()
+
+    if 'PAYONEER INC' in description:
+        return 'Payoneer'
+
+    if 'RECURRING PAYMENT' in description:
+        for pattern in RECURRING_PATTERNS:
+            match = pattern.search(description)
+            if match:
+                vendor = match.group(1).strip()
+                vendor = COMPANY_SUFFIX.sub('', vendor)
+                vendor = TRAILING_DOMAIN.sub('', vendor)
+                return TRAILING_PHONE.sub('', vendor)
+
+    if 'PURCHASE' in description and 'AUTHORIZED ON' in description:
+        match = PURCHASE_PATTERN.search(description)
+        if match:
+            return TRAILING_DOMAIN.sub('', match.group(1).strip())
+
+    if 'PAYPAL *' in description:
+        match = PAYPAL_PATTERN.search(description)
+        if match:
+            return match.group(1).strip()
+
+    return None
+
+
+def apply_cleanup_rules(text):
+    for prefix in PREFIXES:
+        text = prefix.sub('', text)
+    for pattern in CLEANUP_PATTERNS:
+        text = pattern.sub('', text)
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def apply_case_normalization(text):
+    if not text:
+        return text
+    text = WORD_START.sub(lambda m: m.group().upper(), text.lower())
+    return SPECIAL_CASE_PATTERN.sub(lambda m: SPECIAL_CASES[m.group()], text)
+
+
+class VendorNormalizer:
+    """Vendor normalization rules compiled once for batch use.
+
+    The keyword maps are flattened into one (keyword, vendor) list in
+    document order, so the first substring hit is the keyword the
+    dashboard's nested loops would have found.
+    """
+
+    def __init__(self, keyword_maps=None):
+        if keyword_maps is None:
+            keyword_maps = load_keyword_maps()
+        self.keywords = [(keyword, vendor_name) for _, entries in keyword_maps for keyword, vendor_name in entries]
+
+    def map_keyword(self, text):
+        """Vendor name for the first matching keyword, or None"""
+        for keyword, vendor_name in self.keywords:
+            if keyword in text:
+                return vendor_name
+        return None
+
+    def normalize(self, description, existing_vendor=None):
+        """Clean vendor name for one bank description"""
+        if not description:
+            return existing_vendor or UNKNOWN_VENDOR
+
+        description_upper = description.upper()
+        extracted = apply_pattern_rules(description_upper)
+        if extracted is None:
+            extracted = existing_vendor.upper() if existing_vendor else description_upper
+
+        # Keyword maps already hold the display name, so they skip cleanup and casing
+        mapped = self.map_keyword(extracted)
+        if mapped is not None:
+            return mapped
+
+        normalized = apply_case_normalization(apply_cleanup_rules(extracted))
+        return normalized or existing_vendor or UNKNOWN_VENDOR
+
+    def normalize_many(self, descriptions, existing_vendors=None):
+        """Clean vendor names for a batch, normalizing each distinct input once"""
+        if existing_vendors is None:
+            existing_vendors = [None] * len(descriptions)
+        seen = {}
+        results = []
+        for description, existing_vendor in zip(descriptions, existing_vendors):
+            key = (description, existing_vendor)
+            vendor = seen.get(key)
+            if vendor is None:
+                vendor = seen[key] = self.normalize(description, existing_vendor)
+            results.append(vendor)
+        return results
+
+
+_normalizer = None
+
+
+def get_normalizer():
+    """Shared normalizer built from the rules document on first use"""
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = VendorNormalizer()
+    return _normalizer
+
+
+def normalize_vendor_name(description, existing_vendor=None):
+    return get_normalizer().normalize(description, existing_vendor)
+
+
+def normalize_vendor_names(descriptions, existing_vendors=None):
+    return get_normalizer().normalize_many(descriptions, existing_vendors)